@@ -4,14 +4,130 @@ Handles all API endpoints to stay under Vercel's 12 function limit
 
 IMPORTANT: Handler modules are in /lib/handlers/ (project root).
 Vercel runs from project root, so 'from lib.handlers...' imports work directly.
+
+Routing is table-driven: add new actions to ACTIONS below. Handler classes are
+imported lazily on first hit and memoized; GET ?action=router_timings reports
+the cold-import cost per action and the shared HTTP pool counters for the
+current instance.
+
+Every request runs inside a timing context (lib/_timing.py): responses carry a
+Server-Timing header and a [TIMING] log line breaks the request down into
+app time and Supabase / Storage / HTTP round trips.
 """
 
 from http.server import BaseHTTPRequestHandler
+from importlib import import_module
 from urllib.parse import urlparse, parse_qs
+import time
+from typing import Dict, Optional, Tuple
+
+from lib._timing import finish_request, server_timing_hook, start_request
+from lib.handlers._crud_helpers import add_response_hook, send_json
+
+
+# action -> (handler module, allowed methods). OPTIONS is always routed to the
+# handler's do_OPTIONS; any other verb not listed here gets a 405.
+ACTIONS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'pendaftar_create': ('lib.handlers.pendaftar_create', ('POST',)),
+    'pendaftar_list': ('lib.handlers.pendaftar_list', ('GET',)),
+    'pendaftar_stats': ('lib.handlers.pendaftar_stats', ('GET',)),
+    'pendaftar_counters_rebuild': ('lib.handlers.pendaftar_stats', ('POST',)),
+    'pendaftar_cek_status': ('lib.handlers.pendaftar_cek_status', ('GET',)),
+    'pendaftar_status': ('lib.handlers.pendaftar_status', ('PATCH',)),
+    'pendaftar_update_files': ('lib.handlers.pendaftar_update_files', ('POST',)),
+    'pendaftar_files_list': ('lib.handlers.pendaftar_files_list', ('GET',)),
+    'pendaftar_download_zip': ('lib.handlers.pendaftar_download_zip', ('GET',)),
+    'export_pendaftar_xlsx': ('lib.handlers.export_pendaftar_xlsx', ('GET',)),
+    'export_pendaftar_stream': ('lib.handlers.export_pendaftar_stream', ('GET',)),
+    'get_gelombang_list': ('lib.handlers.gelombang_list', ('GET',)),
+    'update_gelombang': ('lib.handlers.gelombang_update', ('POST',)),
+    'set_gelombang_active': ('lib.handlers.gelombang_set_active', ('POST',)),
+    'gelombang_active': ('lib.handlers.gelombang_active', ('GET',)),
+    'upload_file': ('lib.handlers.upload_file', ('POST',)),
+    'pembayaran_list': ('lib.handlers.pembayaran_list', ('GET',)),
+    'pembayaran_submit': ('lib.handlers.pembayaran_submit', ('POST',)),
+    'pembayaran_verify': ('lib.handlers.pembayaran_verify', ('POST',)),
+    'supa_proxy': ('lib.handlers.supa_proxy', ('GET', 'POST')),
+    'hero_carousel_list': ('lib.handlers.hero_carousel_list', ('GET',)),
+    'hero_images_list': ('lib.handlers.hero_images_list', ('GET',)),
+    'hero_images_upload': ('lib.handlers.hero_images_upload', ('POST',)),
+    'hero_images_delete': ('lib.handlers.hero_images_delete', ('DELETE',)),
+    'hero_images_update_order': ('lib.handlers.hero_images_update_order', ('PUT',)),
+    'why_section_list': ('lib.handlers.why_section_list', ('GET',)),
+    'why_section_update': ('lib.handlers.why_section_update', ('POST',)),
+    'locales': ('lib.handlers.locales', ('GET',)),
+    'sections_upsert': ('lib.handlers.sections_upsert', ('POST',)),
+    'alur_steps': ('lib.handlers.alur_steps', ('GET', 'POST', 'PUT', 'DELETE')),
+    'syarat_items': ('lib.handlers.syarat_items', ('GET', 'POST', 'PUT', 'DELETE')),
+    'biaya_items': ('lib.handlers.biaya_items', ('GET', 'POST', 'PUT', 'DELETE')),
+    'brosur_items': ('lib.handlers.brosur_items', ('GET', 'POST', 'PUT', 'DELETE')),
+    'brosur_upload': ('lib.handlers.brosur_upload', ('POST',)),
+    'kontak_items': ('lib.handlers.kontak_items', ('GET', 'POST', 'PUT', 'DELETE')),
+    'kontak_settings': ('lib.handlers.kontak_settings', ('GET', 'POST')),
+    'maintenance_status': ('lib.handlers.maintenance_status', ('GET', 'POST')),
+    'berita_items': ('lib.handlers.berita_items', ('GET', 'POST', 'PUT', 'DELETE')),
+    'admin_faq_upload': ('lib.handlers.admin_faq', ('POST',)),
+    'chat_search': ('lib.handlers.public_chat', ('POST',)),
+    'payment_settings': ('lib.handlers.payment_settings', ('GET', 'POST')),
+    'admin_users': ('lib.handlers.admin_users', ('GET', 'POST', 'DELETE')),
+    'verify-turnstile-session': ('lib.handlers.turnstile_session', ('POST',)),
+}
+
+add_response_hook(server_timing_hook)
+
+# Resolved handler classes, memoized after the first import on this instance.
+_HANDLER_CACHE: Dict[str, type] = {}
+# action -> seconds spent importing its handler module on this instance.
+_IMPORT_TIMINGS: Dict[str, float] = {}
+
+
+def _resolve_handler(action: str) -> Optional[type]:
+    """Return the handler class for `action`, importing it on first use."""
+    cached = _HANDLER_CACHE.get(action)
+    if cached is not None:
+        return cached
+
+    entry = ACTIONS.get(action)
+    if entry is None:
+        return None
+
+    started = time.perf_counter()
+    module = import_module(entry[0])
+    _IMPORT_TIMINGS[action] = time.perf_counter() - started
+
+    handler_cls = module.handler
+    _HANDLER_CACHE[action] = handler_cls
+    return handler_cls
+
+
+def import_timings() -> Dict[str, Dict[str, object]]:
+    """
+    Cold-import cost per action on this instance (ms), slowest first.
+    Actions that have not been hit yet are reported with `imported: False`.
+    """
+    table = {}
+    for action, (module_path, _) in ACTIONS.items():
+        seconds = _IMPORT_TIMINGS.get(action)
+        table[action] = {
+            "module": module_path,
+            "imported": seconds is not None,
+            "import_ms": round(seconds * 1000, 2) if seconds is not None else None,
+        }
+    return dict(
+        sorted(table.items(), key=lambda item: -(item[1]["import_ms"] or 0))
+    )
 
 
 class handler(BaseHTTPRequestHandler):
     def _route_request(self):
+        # Request-scoped timing: Server-Timing header + one [TIMING] log line
+        timing, token = start_request(self.command, self.path)
+        try:
+            self._dispatch(timing)
+        finally:
+            finish_request(timing, token)
+
+    def _dispatch(self, timing):
         """Route request to appropriate handler based on path or action parameter"""
         try:
             parsed = urlparse(self.path)
@@ -32,305 +148,42 @@ class handler(BaseHTTPRequestHandler):
                 action = ''
             
             print(f"Routing: {self.command} {path} -> action: {action}")
+            timing.action = action
             
-            # Route to appropriate handler
-            if action == 'pendaftar_create':
-                from lib.handlers.pendaftar_create import handler as PendaftarCreateHandler
-                PendaftarCreateHandler.do_POST(self) if self.command == 'POST' else PendaftarCreateHandler.do_OPTIONS(self)
-                
-            elif action == 'pendaftar_list':
-                from lib.handlers.pendaftar_list import handler as PendaftarListHandler
-                PendaftarListHandler.do_GET(self) if self.command == 'GET' else PendaftarListHandler.do_OPTIONS(self)
-                
-            elif action == 'pendaftar_stats':
-                from lib.handlers.pendaftar_stats import handler as PendaftarStatsHandler
-                PendaftarStatsHandler.do_GET(self) if self.command == 'GET' else PendaftarStatsHandler.do_OPTIONS(self)
-
-            elif action == 'pendaftar_cek_status':
-                from lib.handlers.pendaftar_cek_status import handler as CekStatusHandler
-                CekStatusHandler.do_GET(self) if self.command == 'GET' else CekStatusHandler.do_OPTIONS(self)
-                
-            elif action == 'pendaftar_status':
-                from lib.handlers.pendaftar_status import handler as StatusHandler
-                # Use unbound method call pattern (consistent with other handlers)
-                if self.command == 'PATCH':
-                    StatusHandler.do_PATCH(self)
-                else:
-                    StatusHandler.do_OPTIONS(self)
-                
-            elif action == 'pendaftar_update_files':
-                from lib.handlers.pendaftar_update_files import handler as UpdateFilesHandler
-                UpdateFilesHandler.do_POST(self) if self.command == 'POST' else UpdateFilesHandler.do_OPTIONS(self)
-                
-            elif action == 'pendaftar_files_list':
-                from lib.handlers.pendaftar_files_list import handler as FilesListHandler
-                FilesListHandler.do_GET(self) if self.command == 'GET' else FilesListHandler.do_OPTIONS(self)
-                
-            elif action == 'pendaftar_download_zip':
-                from lib.handlers.pendaftar_download_zip import handler as DownloadZipHandler
-                DownloadZipHandler.do_GET(self) if self.command == 'GET' else DownloadZipHandler.do_OPTIONS(self)
-                
-            elif action == 'export_pendaftar_xlsx':
-                from lib.handlers.export_pendaftar_xlsx import handler as ExportXLSXHandler
-                ExportXLSXHandler.do_GET(self) if self.command == 'GET' else ExportXLSXHandler.do_OPTIONS(self)
-                
-            elif action == 'get_gelombang_list':
-                from lib.handlers.gelombang_list import handler as GelombangListHandler
-                GelombangListHandler.do_GET(self) if self.command == 'GET' else GelombangListHandler.do_OPTIONS(self)
-                
-            elif action == 'update_gelombang':
-                from lib.handlers.gelombang_update import handler as GelombangUpdateHandler
-                GelombangUpdateHandler.do_POST(self) if self.command == 'POST' else GelombangUpdateHandler.do_OPTIONS(self)
-                
-            elif action == 'set_gelombang_active':
-                from lib.handlers.gelombang_set_active import handler as GelombangSetActiveHandler
-                GelombangSetActiveHandler.do_POST(self) if self.command == 'POST' else GelombangSetActiveHandler.do_OPTIONS(self)
-                
-            elif action == 'gelombang_active':
-                from lib.handlers.gelombang_active import handler as GelombangActiveHandler
-                GelombangActiveHandler.do_GET(self) if self.command == 'GET' else GelombangActiveHandler.do_OPTIONS(self)
-                
-            elif action == 'upload_file':
-                from lib.handlers.upload_file import handler as UploadHandler
-                UploadHandler.do_POST(self) if self.command == 'POST' else UploadHandler.do_OPTIONS(self)
-                
-            elif action == 'pembayaran_list':
-                from lib.handlers.pembayaran_list import handler as PembayaranListHandler
-                PembayaranListHandler.do_GET(self) if self.command == 'GET' else PembayaranListHandler.do_OPTIONS(self)
-                
-            elif action == 'pembayaran_submit':
-                from lib.handlers.pembayaran_submit import handler as PembayaranSubmitHandler
-                PembayaranSubmitHandler.do_POST(self) if self.command == 'POST' else PembayaranSubmitHandler.do_OPTIONS(self)
-                
-            elif action == 'pembayaran_verify':
-                from lib.handlers.pembayaran_verify import handler as PembayaranVerifyHandler
-                PembayaranVerifyHandler.do_POST(self) if self.command == 'POST' else PembayaranVerifyHandler.do_OPTIONS(self)
-                
-            elif action == 'supa_proxy':
-                from lib.handlers.supa_proxy import handler as SupaProxyHandler
-                if self.command == 'POST':
-                    SupaProxyHandler.do_POST(self)
-                elif self.command == 'GET':
-                    SupaProxyHandler.do_GET(self)
-                else:
-                    SupaProxyHandler.do_OPTIONS(self)
-            
-            elif action == 'hero_carousel_list':
-                from lib.handlers.hero_carousel_list import handler as HeroCarouselListHandler
-                HeroCarouselListHandler.do_GET(self) if self.command == 'GET' else HeroCarouselListHandler.do_OPTIONS(self)
-            
-            elif action == 'hero_images_list':
-                from lib.handlers.hero_images_list import handler as HeroImagesListHandler
-                HeroImagesListHandler.do_GET(self) if self.command == 'GET' else HeroImagesListHandler.do_OPTIONS(self)
-            
-            elif action == 'hero_images_upload':
-                from lib.handlers.hero_images_upload import handler as HeroImagesUploadHandler
-                HeroImagesUploadHandler.do_POST(self) if self.command == 'POST' else HeroImagesUploadHandler.do_OPTIONS(self)
-            
-            elif action == 'hero_images_delete':
-                from lib.handlers.hero_images_delete import handler as HeroImagesDeleteHandler
-                HeroImagesDeleteHandler.do_DELETE(self) if self.command == 'DELETE' else HeroImagesDeleteHandler.do_OPTIONS(self)
-            
-            elif action == 'hero_images_update_order':
-                from lib.handlers.hero_images_update_order import handler as HeroImagesUpdateOrderHandler
-                HeroImagesUpdateOrderHandler.do_PUT(self) if self.command == 'PUT' else HeroImagesUpdateOrderHandler.do_OPTIONS(self)
-            
-            elif action == 'why_section_list':
-                from lib.handlers.why_section_list import handler as WhySectionListHandler
-                if self.command == 'GET':
-                    WhySectionListHandler.do_GET(self)
-                else:
-                    WhySectionListHandler.do_OPTIONS(self)
-            
-            elif action == 'why_section_update':
-                from lib.handlers.why_section_update import handler as WhySectionUpdateHandler
-                if self.command == 'POST':
-                    WhySectionUpdateHandler.do_POST(self)
-                else:
-                    WhySectionUpdateHandler.do_OPTIONS(self)
-
-            elif action == 'locales':
-                from lib.handlers.locales import handler as LocalesHandler
-                if self.command == 'GET':
-                    LocalesHandler.do_GET(self)
-                else:
-                    LocalesHandler.do_OPTIONS(self)
-
-            elif action == 'sections_upsert':
-                from lib.handlers.sections_upsert import handler as SectionsUpsertHandler
-                if self.command == 'POST':
-                    SectionsUpsertHandler.do_POST(self)
-                else:
-                    SectionsUpsertHandler.do_OPTIONS(self)
-
-            elif action == 'alur_steps':
-                from lib.handlers.alur_steps import handler as AlurStepsHandler
-                if self.command == 'GET':
-                    AlurStepsHandler.do_GET(self)
-                elif self.command == 'POST':
-                    AlurStepsHandler.do_POST(self)
-                elif self.command == 'PUT':
-                    AlurStepsHandler.do_PUT(self)
-                elif self.command == 'DELETE':
-                    AlurStepsHandler.do_DELETE(self)
-                else:
-                    AlurStepsHandler.do_OPTIONS(self)
-
-            elif action == 'syarat_items':
-                from lib.handlers.syarat_items import handler as SyaratItemsHandler
-                if self.command == 'GET':
-                    SyaratItemsHandler.do_GET(self)
-                elif self.command == 'POST':
-                    SyaratItemsHandler.do_POST(self)
-                elif self.command == 'PUT':
-                    SyaratItemsHandler.do_PUT(self)
-                elif self.command == 'DELETE':
-                    SyaratItemsHandler.do_DELETE(self)
-                else:
-                    SyaratItemsHandler.do_OPTIONS(self)
-
-            elif action == 'biaya_items':
-                from lib.handlers.biaya_items import handler as BiayaItemsHandler
-                if self.command == 'GET':
-                    BiayaItemsHandler.do_GET(self)
-                elif self.command == 'POST':
-                    BiayaItemsHandler.do_POST(self)
-                elif self.command == 'PUT':
-                    BiayaItemsHandler.do_PUT(self)
-                elif self.command == 'DELETE':
-                    BiayaItemsHandler.do_DELETE(self)
-                else:
-                    BiayaItemsHandler.do_OPTIONS(self)
-
-            elif action == 'brosur_items':
-                from lib.handlers.brosur_items import handler as BrosurItemsHandler
-                if self.command == 'GET':
-                    BrosurItemsHandler.do_GET(self)
-                elif self.command == 'POST':
-                    BrosurItemsHandler.do_POST(self)
-                elif self.command == 'PUT':
-                    BrosurItemsHandler.do_PUT(self)
-                elif self.command == 'DELETE':
-                    BrosurItemsHandler.do_DELETE(self)
-                else:
-                    BrosurItemsHandler.do_OPTIONS(self)
-
-            elif action == 'brosur_upload':
-                from lib.handlers.brosur_upload import handler as BrosurUploadHandler
-                if self.command == 'POST':
-                    BrosurUploadHandler.do_POST(self)
-                else:
-                    BrosurUploadHandler.do_OPTIONS(self)
-
-            elif action == 'kontak_items':
-                from lib.handlers.kontak_items import handler as KontakItemsHandler
-                if self.command == 'GET':
-                    KontakItemsHandler.do_GET(self)
-                elif self.command == 'POST':
-                    KontakItemsHandler.do_POST(self)
-                elif self.command == 'PUT':
-                    KontakItemsHandler.do_PUT(self)
-                elif self.command == 'DELETE':
-                    KontakItemsHandler.do_DELETE(self)
-                else:
-                    KontakItemsHandler.do_OPTIONS(self)
-
-            elif action == 'kontak_settings':
-                from lib.handlers.kontak_settings import handler as KontakSettingsHandler
-                if self.command == 'GET':
-                    KontakSettingsHandler.do_GET(self)
-                elif self.command == 'POST':
-                    KontakSettingsHandler.do_POST(self)
-                else:
-                    KontakSettingsHandler.do_OPTIONS(self)
-
-            elif action == 'maintenance_status':
-                from lib.handlers.maintenance_status import handler as MaintenanceStatusHandler
-                if self.command == 'GET':
-                    MaintenanceStatusHandler.do_GET(self)
-                elif self.command == 'POST':
-                    MaintenanceStatusHandler.do_POST(self)
-                else:
-                    MaintenanceStatusHandler.do_OPTIONS(self)
-
-            elif action == 'berita_items':
-                from lib.handlers.berita_items import handler as BeritaItemsHandler
-                if self.command == 'GET':
-                    BeritaItemsHandler.do_GET(self)
-                elif self.command == 'POST':
-                    BeritaItemsHandler.do_POST(self)
-                elif self.command == 'PUT':
-                    BeritaItemsHandler.do_PUT(self)
-                elif self.command == 'DELETE':
-                    BeritaItemsHandler.do_DELETE(self)
-                else:
-                    BeritaItemsHandler.do_OPTIONS(self)
-
-            elif action == 'admin_faq_upload':
-                from lib.handlers.admin_faq import handler as AdminFaqHandler
-                if self.command == 'POST':
-                    AdminFaqHandler.do_POST(self)
-                else:
-                    AdminFaqHandler.do_OPTIONS(self)
-
-            elif action == 'chat_search':
-                from lib.handlers.public_chat import handler as PublicChatHandler
-                if self.command == 'POST':
-                    PublicChatHandler.do_POST(self)
-                else:
-                    PublicChatHandler.do_OPTIONS(self)
-
-            elif action == 'payment_settings':
-                from lib.handlers.payment_settings import handler as PaymentSettingsHandler
-                if self.command == 'GET':
-                    PaymentSettingsHandler.do_GET(self)
-                elif self.command == 'POST':
-                    PaymentSettingsHandler.do_POST(self)
-                else:
-                    PaymentSettingsHandler.do_OPTIONS(self)
-
-            elif action == 'admin_users':
-                from lib.handlers.admin_users import handler as AdminUsersHandler
-                if self.command == 'GET':
-                    AdminUsersHandler.do_GET(self)
-                elif self.command == 'POST':
-                    AdminUsersHandler.do_POST(self)
-                elif self.command == 'DELETE':
-                    AdminUsersHandler.do_DELETE(self)
-                else:
-                    AdminUsersHandler.do_OPTIONS(self)
-
-            elif action == 'verify-turnstile-session':
-                from lib.handlers.turnstile_session import handler as TurnstileSessionHandler
-                if self.command == 'POST':
-                    TurnstileSessionHandler.do_POST(self)
-                else:
-                    TurnstileSessionHandler.do_OPTIONS(self)
-
-
-
-                    
-            else:
+            if action == 'router_timings' and self.command == 'GET':
+                # Cold-import cost per action, to spot slow first hits
+                from lib._http import http_stats
+                send_json(self, 200, {
+                    "ok": True,
+                    "data": import_timings(),
+                    "http": http_stats(),
+                }, {'Cache-Control': 'no-store'})
+                return
+
+            handler_cls = _resolve_handler(action)
+            if handler_cls is None:
                 # Default response for unknown actions
-                self.send_response(404)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(
-                    f'{{"ok": false, "error": "Unknown action: {action}"}}'.encode()
+                send_json(self, 404, {"ok": False, "error": f"Unknown action: {action}"})
+                return
+
+            allowed = ACTIONS[action][1]
+            if self.command == 'OPTIONS':
+                handler_cls.do_OPTIONS(self)
+            elif self.command in allowed:
+                getattr(handler_cls, f"do_{self.command}")(self)
+            else:
+                send_json(
+                    self,
+                    405,
+                    {"ok": False, "error": f"Method {self.command} not allowed for action: {action}"},
+                    {'Allow': ', '.join(allowed + ('OPTIONS',))},
                 )
-                
+
         except Exception as e:
             print(f"Router error: {e}")
             import traceback
             traceback.print_exc()
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(
-                f'{{"ok": false, "error": "Router error: {str(e)}"}}'.encode()
-            )
+            send_json(self, 500, {"ok": False, "error": f"Router error: {str(e)}"})
     
     def do_GET(self):
         self._route_request()
@@ -0,0 +1,10 @@
+"""
+Local benchmark suite (not deployed; see .vercelignore).
+
+Mounts api/index.handler on a ThreadingHTTPServer with an in-process
+Supabase stand-in (bench/fake_supabase.py) seeded with pendaftar /
+pembayaran volumes, then drives the hot actions and reports throughput,
+p50/p95/p99 latency, the app-side share from Server-Timing and peak RSS.
+
+    python -m bench --help
+"""
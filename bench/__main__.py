@@ -0,0 +1,92 @@
+"""
+Usage (from the project root):
+    python -m bench                                   # all scenarios, 20k rows
+    python -m bench pendaftar_list pendaftar_cek_status --rows 100000 --db-ms 25
+    python -m bench --save bench_baseline.json
+    python -m bench --compare bench_baseline.json --tolerance 0.2
+    EXPORT_CACHE=1 python -m bench export_pendaftar_xlsx   # export cache hits
+"""
+import argparse
+import json
+import sys
+import time
+
+from bench import runner, sql_functions
+from bench.fake_supabase import FakeSupabase, LatencyModel
+from bench.scenarios import SCENARIOS
+from bench.seed import seed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench",
+        description="Benchmark the API router against an in-process Supabase stand-in.",
+    )
+    parser.add_argument("scenarios", nargs="*", help=f"default: all ({', '.join(SCENARIOS)})")
+    parser.add_argument("--rows", type=int, default=20000, help="pendaftar rows to seed (default 20000)")
+    parser.add_argument("--payment-ratio", type=float, default=0.7, help="share of applicants with a pembayaran row")
+    parser.add_argument("--file-kb", type=int, default=150, help="size of each stored applicant file")
+    parser.add_argument("--db-ms", type=float, default=15.0, help="PostgREST round-trip latency")
+    parser.add_argument("--row-us", type=float, default=2.0, help="extra PostgREST latency per returned row")
+    parser.add_argument("--storage-ms", type=float, default=30.0, help="Storage round-trip latency")
+    parser.add_argument("--storage-mb-s", type=float, default=50.0, help="Storage transfer rate (0 = unlimited)")
+    parser.add_argument("--max-rows", type=int, default=1000, help="PostgREST max-rows cap")
+    parser.add_argument("--requests", type=int, default=None, help="requests per scenario (default per scenario)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--accept-encoding", default="gzip", help='sent by the client ("" to disable)')
+    parser.add_argument("--save", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare p95 against a saved run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 regression for --compare")
+    parser.add_argument("--no-rpc", action="store_true", help="leave the sql/ functions uninstalled (fallback paths)")
+    parser.add_argument("--verbose", action="store_true", help="keep handler output")
+    args = parser.parse_args(argv)
+
+    selected = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in selected if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)}")
+
+    latency = LatencyModel(args.db_ms, args.row_us, args.storage_ms, args.storage_mb_s)
+    db = FakeSupabase(latency=latency, max_rows=args.max_rows, base_url=runner.BENCH_SUPABASE_URL)
+    started = time.perf_counter()
+    sizes = seed(db, args.rows, payment_ratio=args.payment_ratio, file_kb=args.file_kb)
+    if not args.no_rpc:
+        sql_functions.install(db)
+    print(f"Seeded {sizes} in {time.perf_counter() - started:.1f}s, rss {runner.current_rss_mb():.0f} MB")
+
+    runner.install_fake(db)
+    server = runner.start_server()
+    port = server.server_address[1]
+
+    results = []
+    try:
+        for name in selected:
+            scenario = SCENARIOS[name]
+            requests = args.requests or scenario.default_requests
+            print(f"→ {name}: {requests} requests, concurrency {args.concurrency}", flush=True)
+            with runner.quiet(not args.verbose):
+                results.append(
+                    runner.run_scenario(port, scenario, args.rows, requests, args.concurrency, args.accept_encoding)
+                )
+    finally:
+        server.shutdown()
+
+    print()
+    print(runner.format_table(results))
+
+    if args.save:
+        with open(args.save, "w") as fp:
+            json.dump({"config": vars(args), "results": results}, fp, indent=2)
+        print(f"\nSaved to {args.save}")
+
+    if args.compare:
+        print()
+        regressions = runner.compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"\np95 regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,587 @@
+"""
+In-process stand-in for the parts of supabase-py the handlers use.
+
+FakeSupabase mimics `Client.table()/rpc()/storage` closely enough for the
+hot read paths: select (with "alias:table(cols)" embeds), the usual filters,
+order, range/limit, count="exact", single/maybe_single, insert/update/
+upsert/delete, and a Storage bucket API (list/download/upload/remove/
+create_signed_url/get_public_url).
+
+Each call sleeps for the configured upstream latency and is recorded in the
+request's Server-Timing breakdown (lib/_timing.py), like the real client.
+Rows go through a JSON round trip on the way out, so handlers get fresh
+objects and pay the same decode cost as with a real PostgREST response.
+PostgREST's max-rows cap (1000 on Supabase by default) is applied to every
+select that doesn't set its own range.
+"""
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from lib._timing import record_upstream
+
+
+class LatencyModel:
+    """Fixed round-trip latency plus a per-row / per-byte transfer cost."""
+
+    def __init__(self, db_ms: float = 0.0, row_us: float = 0.0, storage_ms: float = 0.0, storage_mb_s: float = 0.0):
+        self.db_ms = db_ms
+        self.row_us = row_us
+        self.storage_ms = storage_ms
+        self.storage_mb_s = storage_mb_s
+
+    def db(self, rows: int) -> float:
+        return self.db_ms / 1000 + rows * self.row_us / 1_000_000
+
+    def storage(self, size: int = 0) -> float:
+        transfer = size / (self.storage_mb_s * 1024 * 1024) if self.storage_mb_s > 0 else 0.0
+        return self.storage_ms / 1000 + transfer
+
+
+class FakeResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class FakeAPIError(Exception):
+    """Raised where postgrest-py would raise APIError."""
+
+    def __init__(self, message: str, code: str = "PGRST000"):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split a select string on commas that are not inside parentheses."""
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+_EMBED_RE = re.compile(r"^(?:(\w+):)?(\w+)\((.*)\)$", re.S)
+
+
+def _coerce(row_value: Any, value: Any) -> Tuple[Any, Any]:
+    """Compare like Postgres would: numbers as numbers, everything else as text."""
+    if isinstance(row_value, bool) or isinstance(value, bool):
+        return str(row_value).lower(), str(value).lower()
+    if isinstance(row_value, (int, float)) and not isinstance(value, (int, float)):
+        try:
+            return row_value, float(value)
+        except (TypeError, ValueError):
+            return str(row_value), str(value)
+    if isinstance(row_value, (int, float)):
+        return row_value, value
+    return str(row_value), str(value)
+
+
+def _like(pattern: str, insensitive: bool) -> "re.Pattern":
+    regex = "^" + ".*".join(re.escape(part) for part in pattern.replace("*", "%").split("%")) + "$"
+    return re.compile(regex, re.I | re.S if insensitive else re.S)
+
+
+def _compare(op: str, row_value: Any, value: Any) -> bool:
+    if op == "is":
+        if value in (None, "null"):
+            return row_value is None
+        return str(row_value).lower() == str(value).lower()
+    if row_value is None:
+        return False
+    if op == "in":
+        return any(_compare("eq", row_value, v) for v in value)
+    if op in ("like", "ilike"):
+        return bool(_like(str(value), op == "ilike").match(str(row_value)))
+    left, right = _coerce(row_value, value)
+    try:
+        return {
+            "eq": left == right,
+            "neq": left != right,
+            "gt": left > right,
+            "gte": left >= right,
+            "lt": left < right,
+            "lte": left <= right,
+        }[op]
+    except TypeError:
+        return False
+
+
+def _parse_or(expression: str) -> List[Tuple[str, str, Any]]:
+    """'nisn.eq.1,nikcalon.eq.2' → [(col, op, value), ...] (flat groups only)."""
+    conditions = []
+    for part in _split_top_level(expression):
+        column, op, value = part.split(".", 2)
+        if op == "in":
+            value = [v.strip().strip('"') for v in value.strip("()").split(",")]
+        elif value.startswith('"') and value.endswith('"'):
+            value = value[1:-1]
+        conditions.append((column, op, value))
+    return conditions
+
+
+class FakeQuery:
+    def __init__(self, db: "FakeSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._count: Optional[str] = None
+        self._head = False
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self._eq: List[Tuple[str, Any]] = []
+        self._orders: List[Tuple[str, bool]] = []
+        self._range: Optional[Tuple[int, int]] = None
+        self._single: Optional[str] = None
+        # Embedded-resource modifiers, keyed by the embedded table
+        self._embed_orders: Dict[str, List[Tuple[str, bool]]] = {}
+        self._embed_limits: Dict[str, int] = {}
+
+    # -- verbs ----------------------------------------------------------
+    def select(self, *columns: str, count: Optional[str] = None, head: bool = False):
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        self._head = head
+        return self
+
+    def insert(self, rows, **_kwargs):
+        self._op, self._payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: str = "", **_kwargs):
+        self._op, self._payload, self._on_conflict = "upsert", rows, on_conflict or None
+        return self
+
+    def update(self, values, **_kwargs):
+        self._op, self._payload = "update", values
+        return self
+
+    def delete(self, **_kwargs):
+        self._op = "delete"
+        return self
+
+    # -- filters --------------------------------------------------------
+    def _filter(self, column: str, op: str, value: Any):
+        self._filters.append(lambda row: _compare(op, row.get(column), value))
+        if op == "eq":
+            self._eq.append((column, value))
+        return self
+
+    def eq(self, column, value): return self._filter(column, "eq", value)
+    def neq(self, column, value): return self._filter(column, "neq", value)
+    def gt(self, column, value): return self._filter(column, "gt", value)
+    def gte(self, column, value): return self._filter(column, "gte", value)
+    def lt(self, column, value): return self._filter(column, "lt", value)
+    def lte(self, column, value): return self._filter(column, "lte", value)
+    def like(self, column, pattern): return self._filter(column, "like", pattern)
+    def ilike(self, column, pattern): return self._filter(column, "ilike", pattern)
+    def is_(self, column, value): return self._filter(column, "is", value)
+    def in_(self, column, values): return self._filter(column, "in", list(values))
+
+    def or_(self, filters: str, reference_table: Optional[str] = None):
+        conditions = _parse_or(filters)
+        self._filters.append(
+            lambda row: any(_compare(op, row.get(column), value) for column, op, value in conditions)
+        )
+        return self
+
+    def filter(self, column: str, operator: str, criteria: Any):
+        if operator == "in":
+            criteria = [v.strip().strip('"') for v in str(criteria).strip("()").split(",")]
+        return self._filter(column, operator, criteria)
+
+    # -- modifiers ------------------------------------------------------
+    def order(self, column: str, desc: bool = False, nullsfirst: bool = False, foreign_table: Optional[str] = None):
+        if foreign_table:
+            self._embed_orders.setdefault(foreign_table, []).append((column, desc))
+            return self
+        self._orders.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int):
+        self._range = (start, end)
+        return self
+
+    def limit(self, size: int, foreign_table: Optional[str] = None):
+        if foreign_table:
+            self._embed_limits[foreign_table] = size
+            return self
+        start = self._range[0] if self._range else 0
+        self._range = (start, start + size - 1)
+        return self
+
+    def offset(self, size: int):
+        end = self._range[1] if self._range else None
+        self._range = (size, end if end is not None else size + self._db.max_rows - 1)
+        return self
+
+    def single(self):
+        self._single = "single"
+        return self
+
+    def maybe_single(self):
+        self._single = "maybe"
+        return self
+
+    # -- execution ------------------------------------------------------
+    def execute(self) -> FakeResponse:
+        started = time.perf_counter()
+        try:
+            data, count = self._run()
+            rows = len(data) if isinstance(data, list) else int(data is not None)
+            delay = self._db.latency.db(rows)
+            if delay > 0:
+                time.sleep(delay)
+            data = json.loads(json.dumps(data, default=str))
+            if self._single:
+                if isinstance(data, list) and len(data) == 1:
+                    data = data[0]
+                elif self._single == "maybe" and not data:
+                    return None
+                else:
+                    raise FakeAPIError("JSON object requested, multiple (or no) rows returned", "PGRST116")
+            return FakeResponse(data, count)
+        finally:
+            record_upstream("db", time.perf_counter() - started)
+
+    def _matching(self) -> List[Dict[str, Any]]:
+        return [row for row in self._candidates() if all(check(row) for check in self._filters)]
+
+    def _candidates(self) -> List[Dict[str, Any]]:
+        """Rows that can match: an index lookup for the first eq() filter, else the table."""
+        if self._eq:
+            column, value = self._eq[0]
+            return self._db.index(self._table, column).get(str(value), [])
+        return self._db.rows(self._table)
+
+    def _sort(self, rows: List[Dict[str, Any]]) -> None:
+        # Postgres order: NULLs last ascending, first descending
+        for column, desc in reversed(self._orders):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column) if row.get(column) is not None else ""), reverse=desc)
+
+    def _run(self) -> Tuple[Any, Optional[int]]:
+        if self._op != "select":
+            return self._db.write(self._table, self._op, self._payload, self._matching, self._on_conflict), None
+
+        start, end = self._range if self._range else (0, None)
+        end = start + self._db.max_rows - 1 if end is None else min(end, start + self._db.max_rows - 1)
+
+        if self._eq or not self._orders:
+            rows = self._matching()
+            self._sort(rows)
+            count = len(rows) if self._count else None
+            rows = rows[start:end + 1]
+        else:
+            # Unindexed, ordered scan: walk a cached ordering and stop at the
+            # page end unless an exact count was asked for
+            rows, count = [], 0
+            for row in self._db.ordered(self._table, tuple(self._orders), self._sort):
+                if all(check(row) for check in self._filters):
+                    if start <= count <= end:
+                        rows.append(row)
+                    count += 1
+                    if count > end and not self._count:
+                        break
+            count = count if self._count else None
+
+        if self._head:
+            return [], count
+        return [self._project(row) for row in rows], count
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for item in _split_top_level(self._columns):
+            embed = _EMBED_RE.match(item)
+            if embed:
+                alias, table, columns = embed.groups()
+                out[alias or table] = self._embed(row, table, columns)
+            elif item == "*":
+                out.update(row)
+            else:
+                # "alias:column" renames, like PostgREST
+                alias, _, name = item.rpartition(":")
+                out[(alias or name).strip()] = row.get(name.strip())
+        return out
+
+    def _embed(self, parent: Dict[str, Any], table: str, columns: str) -> List[Dict[str, Any]]:
+        """
+        One-to-many embed through a relation registered with relate(), else
+        a "<parent singular>_id" foreign key.
+        """
+        parent_column, child_column = self._db.relations.get(
+            (self._table, table), ("id", self._table.rstrip("s") + "_id")
+        )
+        value = parent.get(parent_column)
+        children = list(self._db.index(table, child_column).get(str(value), [])) if value is not None else []
+        child_query = FakeQuery(self._db, table)
+        child_query._columns = columns
+        child_query._orders = self._embed_orders.get(table, [])
+        child_query._sort(children)
+        if table in self._embed_limits:
+            children = children[:self._embed_limits[table]]
+        return [child_query._project(child) for child in children]
+
+
+class FakeRpc:
+    def __init__(self, db: "FakeSupabase", name: str, params: Dict[str, Any]):
+        self._db = db
+        self._name = name
+        self._params = params or {}
+
+    def execute(self) -> FakeResponse:
+        started = time.perf_counter()
+        try:
+            fn = self._db.rpc_functions.get(self._name)
+            if fn is None:
+                raise FakeAPIError(f"Could not find the function public.{self._name}", "PGRST202")
+            data = fn(self._db, **self._params)
+            delay = self._db.latency.db(len(data) if isinstance(data, list) else 1)
+            if delay > 0:
+                time.sleep(delay)
+            return FakeResponse(json.loads(json.dumps(data, default=str)))
+        finally:
+            record_upstream("db", time.perf_counter() - started)
+
+
+class FakeBucket:
+    def __init__(self, storage: "FakeStorage", bucket: str):
+        self._storage = storage
+        self._bucket = bucket
+
+    def _call(self, size: int = 0) -> float:
+        delay = self._storage.db.latency.storage(size)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def _timed(self, fn: Callable[[], Any], size_of: Callable[[Any], int] = lambda _: 0) -> Any:
+        started = time.perf_counter()
+        try:
+            result = fn()
+            self._call(size_of(result))
+            return result
+        finally:
+            record_upstream("storage", time.perf_counter() - started)
+
+    def list(self, path: Optional[str] = None, options: Optional[Dict[str, Any]] = None):
+        return self._timed(lambda: self._storage.listing(self._bucket, path or ""))
+
+    def download(self, path: str) -> bytes:
+        def fetch():
+            data = self._storage.read(self._bucket, path)
+            if data is None:
+                raise FakeAPIError(f"Object not found: {path}", "404")
+            return data
+        return self._timed(fetch, len)
+
+    def upload(self, path: str, file: Any, file_options: Optional[Dict[str, Any]] = None):
+        if isinstance(file, (bytes, bytearray)):
+            data = file
+        elif hasattr(file, "read"):
+            data = file.read()
+        else:
+            with open(file, "rb") as handle:
+                data = handle.read()
+        return self._timed(lambda: self._storage.write(self._bucket, path, bytes(data)) or FakeResponse({"Key": f"{self._bucket}/{path}"}))
+
+    def remove(self, paths: List[str]):
+        return self._timed(lambda: [{"name": path} for path in paths if self._storage.delete(self._bucket, path)])
+
+    def create_signed_url(self, path: str, expires_in: int, options: Optional[Dict[str, Any]] = None):
+        def sign():
+            # Like Storage, only existing objects can be signed
+            if not self._storage.exists(self._bucket, path):
+                raise FakeAPIError(f"Object not found: {path}", "404")
+            url = f"{self._storage.base_url}/object/sign/{self._bucket}/{path}?token=bench&expires={expires_in}"
+            if options and options.get("download"):
+                url += f"&download={options['download']}"
+            return {"signedURL": url, "signedUrl": url}
+        return self._timed(sign)
+
+    def get_public_url(self, path: str, options: Optional[Dict[str, Any]] = None) -> str:
+        return f"{self._storage.base_url}/object/public/{self._bucket}/{path}"
+
+
+class FakeStorage:
+    """
+    Buckets of in-memory objects. A bucket can also get a `generator` that
+    lists and serves objects on demand (the seeded pendaftar-files bucket
+    does, so 100k applicants don't need their files held in memory).
+    """
+
+    def __init__(self, db: "FakeSupabase", base_url: str):
+        self.db = db
+        self.base_url = base_url
+        self._objects: Dict[str, Dict[str, bytes]] = {}
+        self._written: Dict[str, Dict[str, str]] = {}
+        self._generators: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def from_(self, bucket: str) -> FakeBucket:
+        return FakeBucket(self, bucket)
+
+    def set_generator(self, bucket: str, generator: Any) -> None:
+        """generator.listing(path) → [names], generator.read(path) → bytes | None."""
+        self._generators[bucket] = generator
+
+    def listing(self, bucket: str, path: str) -> List[Dict[str, Any]]:
+        prefix = path.rstrip("/") + "/" if path else ""
+        names: Dict[str, str] = {}
+        generator = self._generators.get(bucket)
+        if generator is not None:
+            names.update((name, "2025-01-01T00:00:00Z") for name in generator.listing(path))
+        with self._lock:
+            for key in self._objects.get(bucket, {}):
+                if key.startswith(prefix) and "/" not in key[len(prefix):]:
+                    names[key[len(prefix):]] = self._written[bucket][key]
+        return [
+            {"name": name, "id": f"{bucket}/{prefix}{name}", "updated_at": written,
+             "created_at": written, "metadata": {}}
+            for name, written in sorted(names.items())
+        ]
+
+    def read(self, bucket: str, path: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._objects.get(bucket, {}).get(path)
+        if data is None and bucket in self._generators:
+            data = self._generators[bucket].read(path)
+        return data
+
+    def exists(self, bucket: str, path: str) -> bool:
+        with self._lock:
+            if path in self._objects.get(bucket, {}):
+                return True
+        generator = self._generators.get(bucket)
+        return generator is not None and generator.read(path) is not None
+
+    def write(self, bucket: str, path: str, data: bytes) -> None:
+        with self._lock:
+            self._objects.setdefault(bucket, {})[path] = data
+            self._written.setdefault(bucket, {})[path] = datetime.now(timezone.utc).isoformat()
+
+    def delete(self, bucket: str, path: str) -> bool:
+        with self._lock:
+            self._written.get(bucket, {}).pop(path, None)
+            return self._objects.get(bucket, {}).pop(path, None) is not None
+
+
+class FakeSupabase:
+    def __init__(self, latency: Optional[LatencyModel] = None, max_rows: int = 1000, base_url: str = "http://supabase.bench"):
+        self.latency = latency or LatencyModel()
+        self.max_rows = max_rows
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.primary_keys: Dict[str, str] = {}
+        self.rpc_functions: Dict[str, Callable[..., Any]] = {}
+        # (parent table, child table) → (parent column, child column)
+        self.relations: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self.storage = FakeStorage(self, base_url + "/storage/v1")
+        self._lock = threading.Lock()
+        self._sequences: Dict[str, int] = {}
+        # Lookup structures standing in for the real table's indexes;
+        # dropped on every write to the table
+        self._indexes: Dict[Tuple[str, str], Dict[str, List[Dict[str, Any]]]] = {}
+        self._orderings: Dict[Tuple[str, Tuple[Tuple[str, bool], ...]], List[Dict[str, Any]]] = {}
+
+    # -- supabase-py surface -------------------------------------------
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> FakeRpc:
+        return FakeRpc(self, fn, params or {})
+
+    # -- seeding / inspection ------------------------------------------
+    def load(self, table: str, rows: List[Dict[str, Any]], primary_key: str = "id") -> None:
+        self._invalidate(table)
+        self.tables[table] = rows
+        self.primary_keys[table] = primary_key
+        ids = [row.get(primary_key) for row in rows if isinstance(row.get(primary_key), int)]
+        self._sequences[table] = max(ids) if ids else 0
+
+    def relate(self, parent: str, child: str, parent_column: str, child_column: str) -> None:
+        """Foreign key child.child_column → parent.parent_column, for embeds."""
+        self.relations[(parent, child)] = (parent_column, child_column)
+
+    def register_rpc(self, name: str, fn: Callable[..., Any]) -> None:
+        """fn(db, **params) → JSON-able result, standing in for a SQL function."""
+        self.rpc_functions[name] = fn
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        return self.tables.get(table, [])
+
+    def index(self, table: str, column: str) -> Dict[str, List[Dict[str, Any]]]:
+        index = self._indexes.get((table, column))
+        if index is None:
+            index = {}
+            for row in self.rows(table):
+                index.setdefault(str(row.get(column)), []).append(row)
+            self._indexes[(table, column)] = index
+        return index
+
+    def ordered(self, table: str, orders: Tuple[Tuple[str, bool], ...], sort: Callable[[List[Dict[str, Any]]], None]) -> List[Dict[str, Any]]:
+        ordering = self._orderings.get((table, orders))
+        if ordering is None:
+            ordering = list(self.rows(table))
+            sort(ordering)
+            self._orderings[(table, orders)] = ordering
+        return ordering
+
+    def _invalidate(self, table: str) -> None:
+        for key in [key for key in self._indexes if key[0] == table]:
+            del self._indexes[key]
+        for key in [key for key in self._orderings if key[0] == table]:
+            del self._orderings[key]
+
+    def write(self, table: str, op: str, payload: Any, matching: Callable[[], List[Dict[str, Any]]], on_conflict: Optional[str]):
+        with self._lock:
+            try:
+                return self._write(table, op, payload, matching, on_conflict)
+            finally:
+                self._invalidate(table)
+
+    def _write(self, table: str, op: str, payload: Any, matching: Callable[[], List[Dict[str, Any]]], on_conflict: Optional[str]):
+        rows = self.tables.setdefault(table, [])
+        if op == "update":
+            targets = matching()
+            for row in targets:
+                row.update(payload)
+            return targets
+        if op == "delete":
+            targets = matching()
+            target_ids = {id(row) for row in targets}
+            self.tables[table] = [row for row in rows if id(row) not in target_ids]
+            return targets
+        new_rows = payload if isinstance(payload, list) else [payload]
+        key = on_conflict or self.primary_keys.get(table, "id")
+        written = []
+        for new_row in new_rows:
+            existing = None
+            if op == "upsert" and new_row.get(key) is not None:
+                existing = next((row for row in rows if row.get(key) == new_row.get(key)), None)
+            if existing is not None:
+                existing.update(new_row)
+                written.append(existing)
+                continue
+            row = dict(new_row)
+            if row.get("id") is None and self.primary_keys.get(table, "id") == "id":
+                self._sequences[table] = self._sequences.get(table, 0) + 1
+                row["id"] = self._sequences[table]
+            rows.append(row)
+            written.append(row)
+        return written
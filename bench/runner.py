@@ -0,0 +1,204 @@
+"""
+Runs scenarios against api/index.handler mounted on a local
+ThreadingHTTPServer, with FakeSupabase behind lib._supabase.supabase_client.
+"""
+import contextlib
+import http.client
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench.fake_supabase import FakeSupabase
+from bench.scenarios import Scenario
+
+BENCH_SUPABASE_URL = "http://supabase.bench"
+BENCH_KEY = "bench-key"
+
+# Export scenarios measure building the export; with the cache on, every
+# request after the first is a hit. EXPORT_CACHE=1 measures the hits instead.
+# Set before lib._export_cache is imported (it reads the flag once).
+os.environ.setdefault("EXPORT_CACHE", "0")
+
+
+def install_fake(db: FakeSupabase) -> None:
+    """Make supabase_client() return db, for both the anon and service-role key."""
+    from lib import _supabase
+
+    os.environ["SUPABASE_URL"] = BENCH_SUPABASE_URL
+    os.environ["SUPABASE_ANON_KEY"] = BENCH_KEY + "-anon"
+    os.environ["SUPABASE_SERVICE_ROLE_KEY"] = BENCH_KEY + "-service"
+    for key in (BENCH_KEY + "-anon", BENCH_KEY + "-service"):
+        _supabase._CLIENT_CACHE[(BENCH_SUPABASE_URL, key)] = db
+
+
+def start_server() -> ThreadingHTTPServer:
+    import api.index as router
+
+    class BenchHandler(router.handler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BenchHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as fp:
+            for line in fp:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class RssSampler:
+    """Peak resident set size while the block runs (sampled every 20 ms)."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self.peak_mb = current_rss_mb()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+
+def _server_timing_app_ms(header: Optional[str]) -> Optional[float]:
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name == "app" and "dur=" in params:
+            return float(params.split("dur=")[1].split(";")[0])
+    return None
+
+
+def fetch(port: int, path: str, accept_encoding: str) -> Tuple[int, float, int, Optional[float]]:
+    """One request; returns (status, latency_s, body_bytes, app_ms)."""
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+    try:
+        headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        return response.status, time.perf_counter() - started, len(body), _server_timing_app_ms(response.getheader("Server-Timing"))
+    finally:
+        conn.close()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def run_scenario(
+    port: int,
+    scenario: Scenario,
+    rows: int,
+    requests: int,
+    concurrency: int,
+    accept_encoding: str = "gzip",
+    seed_value: int = 7,
+) -> Dict[str, Any]:
+    rng = random.Random(seed_value)
+    paths = [scenario.path(rng, rows) for _ in range(requests)]
+
+    # First hit pays the handler's cold import; reported on its own
+    first_status, first_latency, _, _ = fetch(port, paths[0], accept_encoding)
+
+    results: List[Tuple[int, float, int, Optional[float]]] = []
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda p: fetch(port, p, accept_encoding), paths))
+        wall = time.perf_counter() - started
+
+    latencies = [latency * 1000 for _, latency, _, _ in results]
+    app_times = [app for _, _, _, app in results if app is not None]
+    errors = sum(1 for status, _, _, _ in results if status >= 400)
+    return {
+        "scenario": scenario.action,
+        "requests": len(results),
+        "concurrency": concurrency,
+        "errors": errors,
+        "first_status": first_status,
+        "first_ms": round(first_latency * 1000, 1),
+        "throughput_rps": round(len(results) / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "app_p50_ms": round(percentile(app_times, 50), 1) if app_times else None,
+        "avg_body_kb": round(sum(size for _, _, size, _ in results) / max(len(results), 1) / 1024, 1),
+        "peak_rss_mb": round(rss.peak_mb, 1),
+    }
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool):
+    """Silence handler prints (they dominate the profile otherwise)."""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), warnings.catch_warnings():
+        # zipfile warns on same-name applicants sharing a folder
+        warnings.simplefilter("ignore", UserWarning)
+        yield
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    columns = [
+        ("scenario", "{:<24}"), ("requests", "{:>8}"), ("errors", "{:>6}"), ("first_ms", "{:>9}"),
+        ("throughput_rps", "{:>9}"), ("p50_ms", "{:>8}"), ("p95_ms", "{:>8}"), ("p99_ms", "{:>8}"),
+        ("app_p50_ms", "{:>10}"), ("avg_body_kb", "{:>11}"), ("peak_rss_mb", "{:>11}"),
+    ]
+    header = " ".join(fmt.format(name.replace("throughput_", "")) for name, fmt in columns)
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(" ".join(fmt.format("-" if result[name] is None else result[name]) for name, fmt in columns))
+    return "\n".join(lines)
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> List[str]:
+    """Scenarios whose p95 got worse than the baseline by more than tolerance."""
+    with open(baseline_path) as fp:
+        baseline = {entry["scenario"]: entry for entry in json.load(fp)["results"]}
+    regressions = []
+    for result in results:
+        before = baseline.get(result["scenario"])
+        if not before or not before["p95_ms"]:
+            continue
+        change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+        print(f"{result['scenario']:<24} p95 {before['p95_ms']:>8} → {result['p95_ms']:>8} ms ({change:+.0%})")
+        if change > tolerance:
+            regressions.append(result["scenario"])
+    return regressions
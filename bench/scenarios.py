@@ -0,0 +1,57 @@
+"""
+Scenarios for the hot actions. Each one builds request paths from the
+seeded data, so lookups hit real rows (with a share of misses where the
+action has a not-found path).
+"""
+import random
+from typing import Callable, Dict, NamedTuple
+
+from bench.seed import nisn_for
+
+
+class Scenario(NamedTuple):
+    action: str
+    description: str
+    # (rng, seeded row count) → request path
+    path: Callable[[random.Random, int], str]
+    # Heavy scenarios default to fewer requests
+    default_requests: int = 200
+
+
+def _pendaftar_list(rng: random.Random, rows: int) -> str:
+    page_size = 50
+    # Admins mostly look at the first pages, sometimes search or filter
+    page = 1 + min(int(rng.expovariate(0.3)), max(rows // page_size - 1, 0))
+    path = f"/api/pendaftar_list?page={page}&pageSize={page_size}"
+    roll = rng.random()
+    if roll < 0.2:
+        path += "&status=" + rng.choice(["PENDING", "DITERIMA", "REVISI"])
+    elif roll < 0.3:
+        path += "&q=" + rng.choice(["ahmad", "siti", "rahman", "putri"])
+    return path
+
+
+def _cek_status(rng: random.Random, rows: int) -> str:
+    if rng.random() < 0.1:
+        return "/api/pendaftar_cek_status?nisn=9999999999"
+    return f"/api/pendaftar_cek_status?nisn={nisn_for(rng.randrange(rows))}"
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "pendaftar_list": Scenario("pendaftar_list", "admin table, paged", _pendaftar_list),
+    "pendaftar_stats": Scenario("pendaftar_stats", "dashboard aggregates", lambda rng, rows: "/api/pendaftar_stats", 50),
+    "pendaftar_cek_status": Scenario("pendaftar_cek_status", "public status lookup by NISN", _cek_status, 500),
+    "export_pendaftar_xlsx": Scenario("export_pendaftar_xlsx", "full xlsx export", lambda rng, rows: "/api/export_pendaftar_xlsx", 10),
+    "pendaftar_download_zip": Scenario(
+        "pendaftar_download_zip",
+        "zip of uploaded files (50 applicants)",
+        lambda rng, rows: "/api/pendaftar_download_zip?only=all&limit=50",
+        5,
+    ),
+    "locales": Scenario(
+        "locales",
+        "merged locale dictionary",
+        lambda rng, rows: "/api/index?action=locales&lang=" + rng.choice(["id", "en"]),
+        500,
+    ),
+}
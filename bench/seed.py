@@ -0,0 +1,190 @@
+"""
+Deterministic seed data for the benchmark stand-in: pendaftar, pembayaran,
+sections/section_translations and the pendaftar-files Storage bucket.
+Same seed → same rows, so runs are comparable.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from bench.fake_supabase import FakeSupabase
+
+FIRST_NAMES = [
+    "Ahmad", "Muhammad", "Abdullah", "Fatimah", "Aisyah", "Siti", "Nur", "Zainab",
+    "Umar", "Ali", "Hasan", "Husain", "Khadijah", "Maryam", "Yusuf", "Ibrahim",
+    "Rizki", "Dewi", "Putri", "Fajar", "Hafidz", "Salsabila", "Naila", "Farhan",
+]
+LAST_NAMES = [
+    "Hidayat", "Rahman", "Saputra", "Wijaya", "Nugroho", "Santoso", "Maulana",
+    "Ramadhan", "Kurniawan", "Pratama", "Azzahra", "Fauziah", "Hakim", "Syahputra",
+]
+PROVINCES = [
+    "Jawa Timur", "Jawa Tengah", "Jawa Barat", "DKI Jakarta", "Banten",
+    "DI Yogyakarta", "Sumatera Utara", "Sulawesi Selatan", "Kalimantan Timur", "Bali",
+    "Nusa Tenggara Barat", "Lampung",
+]
+CITIES = ["Surabaya", "Malang", "Kediri", "Semarang", "Bandung", "Bogor", "Jakarta Selatan", "Serang", "Medan"]
+PROGRAMS = ["Pondok Pesantren Al Ikhsan Beji", "Tahfidz", "Hanya Sekolah"]
+LEVELS = ["MTs", "MA", "Kuliah"]
+JOBS = ["Petani", "Wiraswasta", "PNS", "Guru", "Pedagang", "Karyawan Swasta", "Ibu Rumah Tangga", "Buruh"]
+# Roughly what the admin dashboard sees mid-season
+STATUS_WEIGHTS = {"PENDING": 55, "REVISI": 10, "DITERIMA": 30, "DITOLAK": 5}
+PAYMENT_STATUS_WEIGHTS = {"PENDING": 40, "VERIFIED": 55, "REJECTED": 5}
+FILE_KINDS = ["ijazah", "kk", "akta", "foto", "bpjs"]
+SECTION_SLUGS = [
+    "hero", "about", "why", "alur", "syarat", "biaya", "brosur", "kontak",
+    "faq", "berita", "prestasi", "galeri", "testimoni", "program", "fasilitas",
+]
+
+_BASE_TIME = datetime(2025, 1, 6, tzinfo=timezone.utc)
+
+
+def _weighted(rng: random.Random, weights: Dict[str, int]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def nisn_for(index: int) -> str:
+    return f"{31_000_00000 + index:010d}"
+
+
+def nik_for(index: int) -> str:
+    return f"35{7800_0000_0000 + index:014d}"
+
+
+def pendaftar_rows(count: int, rng: random.Random, files_base_url: str) -> List[Dict[str, Any]]:
+    rows = []
+    for i in range(count):
+        nisn = nisn_for(i)
+        gender = rng.choice("LP")
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        created = _BASE_TIME + timedelta(minutes=int(i * 90 * 24 * 60 / max(count, 1)), seconds=rng.randint(0, 59))
+        status = _weighted(rng, STATUS_WEIGHTS)
+        province = rng.choice(PROVINCES)
+        row = {
+            "id": i + 1,
+            "nisn": nisn,
+            "nikcalon": nik_for(i),
+            "namalengkap": name,
+            "tempatlahir": rng.choice(CITIES),
+            "provinsitempatlahir": province,
+            "tanggallahir": f"{rng.randint(2007, 2013)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "jeniskelamin": gender,
+            "emailcalon": f"{name.split()[0].lower()}{i}@example.com",
+            "telepon_orang_tua": f"08{rng.randint(10**9, 10**10 - 1)}",
+            "alamatjalan": f"Jl. {rng.choice(LAST_NAMES)} No. {rng.randint(1, 200)} RT {rng.randint(1, 9):02d}/RW {rng.randint(1, 9):02d}",
+            "desa": f"Desa {rng.choice(LAST_NAMES)}",
+            "kecamatan": f"Kec. {rng.choice(LAST_NAMES)}",
+            "kotakabupaten": rng.choice(CITIES),
+            "kabkota": rng.choice(CITIES),
+            "provinsi": province,
+            "ijazahformalterakhir": rng.choice(["SD/MI", "SMP/MTs", "SMA/MA"]),
+            "sekolahdomisili": rng.choice(["Ya", "Tidak"]),
+            "rencanatingkat": rng.choice(LEVELS),
+            "rencanaprogram": rng.choice(PROGRAMS),
+            "rencanakelas": rng.choice(["7", "8", "10", "11", "-"]),
+            "namaayah": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "nikayah": f"35{rng.randint(10**13, 10**14 - 1)}",
+            "statusayah": "Hidup",
+            "pekerjaanayah": rng.choice(JOBS),
+            "namaibu": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "nikibu": f"35{rng.randint(10**13, 10**14 - 1)}",
+            "statusibu": "Hidup",
+            "pekerjaanibu": rng.choice(JOBS),
+            "statusberkas": status,
+            "alasan": "Berkas kurang jelas" if status == "REVISI" else None,
+            "deskripsistatus": None,
+            "verifiedby": "admin@bench" if status in ("DITERIMA", "DITOLAK") else None,
+            "verifiedat": (created + timedelta(days=2)).isoformat() if status in ("DITERIMA", "DITOLAK") else None,
+            "createdat": created.isoformat(),
+            "updatedat": (created + timedelta(hours=rng.randint(0, 96))).isoformat(),
+            "gelombang": f"Gelombang {1 + i * 3 // max(count, 1)}",
+        }
+        for kind in FILE_KINDS:
+            row[f"file_{kind}"] = f"{files_base_url}/{nisn}/{kind}.{'jpg' if kind == 'foto' else 'pdf'}"
+        rows.append(row)
+    return rows
+
+
+def pembayaran_rows(pendaftar: List[Dict[str, Any]], ratio: float, rng: random.Random, files_base_url: str) -> List[Dict[str, Any]]:
+    rows = []
+    for applicant in pendaftar:
+        if rng.random() >= ratio:
+            continue
+        uploaded = datetime.fromisoformat(applicant["createdat"]) + timedelta(days=rng.randint(0, 5))
+        status = _weighted(rng, PAYMENT_STATUS_WEIGHTS)
+        rows.append({
+            "id": len(rows) + 1,
+            "nisn": applicant["nisn"],
+            "nik": applicant["nikcalon"],
+            "nama_lengkap": applicant["namalengkap"],
+            "jumlah": 500000.0,
+            "metode_pembayaran": "Transfer Bank BRI",
+            "bukti_pembayaran": f"{files_base_url}/{applicant['nisn']}/bukti.jpg",
+            "status_pembayaran": status,
+            "catatan_admin": None,
+            "verified_by": "admin@bench" if status != "PENDING" else None,
+            "tanggal_verifikasi": (uploaded + timedelta(days=1)).isoformat() if status != "PENDING" else None,
+            "tanggal_upload": uploaded.isoformat(),
+            "created_at": uploaded.isoformat(),
+            "updated_at": (uploaded + timedelta(hours=rng.randint(0, 48))).isoformat(),
+        })
+    return rows
+
+
+def section_rows(rng: random.Random):
+    sections, translations = [], []
+    for index, slug in enumerate(SECTION_SLUGS):
+        section_id = f"00000000-0000-4000-8000-{index:012d}"
+        sections.append({"id": section_id, "slug": slug, "updated_at": _BASE_TIME.isoformat()})
+        for locale in ("id", "en"):
+            translations.append({
+                "section_id": section_id,
+                "locale": locale,
+                "title": f"{slug.title()} ({locale})",
+                "body": " ".join(rng.choice(LAST_NAMES) for _ in range(60)),
+                "updated_at": _BASE_TIME.isoformat(),
+            })
+    return sections, translations
+
+
+class ApplicantFiles:
+    """
+    Generates the pendaftar-files bucket on demand: every seeded NISN has
+    one object per FILE_KINDS entry, all served from one shared blob.
+    """
+
+    def __init__(self, nisns, file_kb: int, rng: random.Random):
+        self._nisns = set(nisns)
+        # Incompressible, like real JPEG/PDF uploads
+        self._blob = rng.randbytes(file_kb * 1024)
+
+    def _names(self):
+        return [f"{kind}.{'jpg' if kind == 'foto' else 'pdf'}" for kind in FILE_KINDS]
+
+    def listing(self, path: str) -> List[str]:
+        return self._names() if path.strip("/") in self._nisns else []
+
+    def read(self, path: str) -> Optional[bytes]:
+        nisn, _, name = path.partition("/")
+        if nisn in self._nisns and name in self._names():
+            return self._blob
+        return None
+
+
+def seed(db: FakeSupabase, rows: int, payment_ratio: float = 0.7, file_kb: int = 150, seed_value: int = 2025) -> Dict[str, int]:
+    """Fill db with `rows` applicants and their related data; returns table sizes."""
+    rng = random.Random(seed_value)
+    files_base = db.storage.base_url + "/object/public/pendaftar-files"
+
+    pendaftar = pendaftar_rows(rows, rng, files_base)
+    pembayaran = pembayaran_rows(pendaftar, payment_ratio, rng, files_base)
+    sections, translations = section_rows(rng)
+
+    db.load("pendaftar", pendaftar)
+    db.load("pembayaran", pembayaran)
+    # fk_pembayaran_nisn
+    db.relate("pendaftar", "pembayaran", "nisn", "nisn")
+    db.load("sections", sections)
+    db.load("section_translations", translations, primary_key="section_id")
+    db.storage.set_generator("pendaftar-files", ApplicantFiles((row["nisn"] for row in pendaftar), file_kb, rng))
+    return {name: len(table) for name, table in db.tables.items()}
@@ -0,0 +1,118 @@
+"""
+Python stand-ins for the SQL functions in sql/, registered on FakeSupabase
+so the handlers take their RPC path during a bench run.
+"""
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence
+
+from bench.fake_supabase import FakeSupabase
+
+COUNTER_DIMENSIONS = ("gelombang", "statusberkas", "jeniskelamin", "rencanatingkat", "rencanaprogram", "provinsi")
+
+
+def pendaftar_stats(db: FakeSupabase, p_gelombang: Optional[str] = None) -> Dict[str, Any]:
+    # Same shape as public.pendaftar_stats(); the handler's fallback
+    # aggregation is the reference implementation
+    from lib.handlers.pendaftar_stats import aggregate_rows
+
+    rows = db.rows("pendaftar")
+    if p_gelombang:
+        rows = [row for row in rows if row.get("gelombang") == p_gelombang]
+    return aggregate_rows(rows)
+
+
+def pendaftar_counters_rebuild(db: FakeSupabase, p_dry_run: bool = False) -> Dict[str, Any]:
+    # The fake has no counters table to drift
+    groups = {
+        tuple(row.get(column) or "" for column in COUNTER_DIMENSIONS)
+        for row in db.rows("pendaftar")
+    }
+    return {"ok": True, "dry_run": p_dry_run, "drift_groups": 0, "groups": len(groups), "total": len(db.rows("pendaftar"))}
+
+
+def _ranked(rows: List[Dict[str, Any]], query: str, text_columns: Sequence[str], key_columns: Sequence[str], limit: int) -> List[Dict[str, Any]]:
+    # Rough stand-in for the pg_trgm ranking in sql/search.sql
+    needle = query.strip().lower()
+    matches = []
+    for row in rows:
+        if any(str(row.get(column) or "").startswith(needle) for column in key_columns):
+            rank = 1.0
+        else:
+            texts = [str(row.get(column) or "").lower() for column in text_columns]
+            if not any(needle in text for text in texts):
+                continue
+            rank = max(SequenceMatcher(None, needle, text).ratio() for text in texts)
+        matches.append(dict(row, search_rank=round(rank, 4)))
+    matches.sort(key=lambda row: (-row["search_rank"], -(row.get("id") or 0)))
+    return matches[:max(1, min(limit, 100))]
+
+
+def search_pendaftar(db: FakeSupabase, p_query: str, p_limit: int = 20, p_status: Optional[str] = None) -> List[Dict[str, Any]]:
+    rows = db.rows("pendaftar")
+    if p_status:
+        rows = [row for row in rows if row.get("statusberkas") == p_status]
+    return _ranked(rows, p_query, ("namalengkap", "sekolahdomisili"), ("nisn", "nikcalon"), p_limit)
+
+
+def search_pembayaran(db: FakeSupabase, p_query: str, p_limit: int = 20) -> List[Dict[str, Any]]:
+    return _ranked(db.rows("pembayaran"), p_query, ("nama_lengkap",), ("nisn", "nik"), p_limit)
+
+
+def pembayaran_summary(db: FakeSupabase, p_query: Optional[str] = None) -> Dict[str, int]:
+    q = (p_query or "").strip()
+    rows = db.rows("pembayaran")
+    if q.isdigit() and len(q) == 10:
+        rows = [row for row in rows if row.get("nisn") == q]
+    elif q.isdigit() and len(q) == 16:
+        rows = [row for row in rows if row.get("nik") == q]
+    elif q:
+        needle = q.lower()
+        rows = [
+            row for row in rows
+            if any(needle in str(row.get(column) or "").lower() for column in ("nama_lengkap", "nisn", "nik"))
+        ]
+    statuses = [row.get("status_pembayaran") or "PENDING" for row in rows]
+    return {
+        "pending": statuses.count("PENDING"),
+        "verified": statuses.count("VERIFIED"),
+        "rejected": statuses.count("REJECTED"),
+        "total": len(statuses),
+    }
+
+
+def pembayaran_verify_batch(db: FakeSupabase, p_items: List[Dict[str, Any]], p_verified_by: str = "admin") -> Dict[str, Any]:
+    # Writes the fake tables directly: one round trip, like the SQL function
+    decisions = {
+        int(item["id"]): item for item in p_items or []
+        if str(item.get("status") or "").upper() in ("VERIFIED", "REJECTED")
+    }
+    updated, verified = [], set()
+    for row in db.rows("pembayaran"):
+        item = decisions.get(row.get("id"))
+        if item is None:
+            continue
+        status = str(item["status"]).upper()
+        db.write("pembayaran", "update", {
+            "status_pembayaran": status,
+            "verified_by": p_verified_by,
+            "catatan_admin": item.get("catatan") or "",
+            "tanggal_verifikasi": "now()",
+            "updated_at": "now()",
+        }, lambda row=row: [row], None)
+        updated.append(row["id"])
+        if status == "VERIFIED":
+            verified.add(row.get("nisn"))
+    accepted = [row for row in db.rows("pendaftar") if row.get("nisn") in verified]
+    db.write("pendaftar", "update", {
+        "statusberkas": "DITERIMA", "verifiedby": p_verified_by, "verifiedat": "now()", "updatedat": "now()",
+    }, lambda: accepted, None)
+    return {"updated": sorted(updated), "pendaftar_updated": [row.get("nisn") for row in accepted]}
+
+
+def install(db: FakeSupabase) -> None:
+    db.register_rpc("pendaftar_stats", pendaftar_stats)
+    db.register_rpc("pendaftar_counters_rebuild", pendaftar_counters_rebuild)
+    db.register_rpc("search_pendaftar", search_pendaftar)
+    db.register_rpc("search_pembayaran", search_pembayaran)
+    db.register_rpc("pembayaran_summary", pembayaran_summary)
+    db.register_rpc("pembayaran_verify_batch", pembayaran_verify_batch)
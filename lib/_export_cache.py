@@ -0,0 +1,166 @@
+"""
+Content-addressed cache for generated exports (XLSX, ZIP) in the
+temp-downloads bucket.
+
+An export is keyed by a fingerprint of everything its bytes depend on:
+the export kind and format, its filters / options, and the state of the
+matching rows (count + max(updatedat), read in one PostgREST round trip;
+sql/pendaftar_updatedat.sql keeps updatedat current on every write):
+
+    key, state = fingerprint(supa, "xlsx", {"filters": ..., "layout": ...}, apply=...)
+    hit = lookup(supa, key, "xlsx", download_name="pendaftar.xlsx")
+    if hit is None:
+        ...build...
+        hit = store(supa, key, "xlsx", data, XLSX_CONTENT_TYPE, meta={...}, download_name=...)
+    hit.url  # signed URL, EXPORT_CACHE_URL_TTL seconds
+
+`data` may also be a binary file opened for reading (a spooled archive),
+which Storage reads from disk instead of from one bytes object.
+
+Each artifact sits at exports/cache/<key>.<ext> next to a <key>.json
+sidecar holding the metadata the handler reports. Entries older than
+EXPORT_CACHE_MAX_AGE_HOURS are pruned (best effort) when a new one is
+stored. EXPORT_CACHE=0 turns the cache off: handlers skip fingerprint()
+and store(), and prune() still clears what an earlier run left behind.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, BinaryIO, Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+EXPORT_CACHE_ENABLED = os.getenv("EXPORT_CACHE", "1") != "0"
+EXPORT_CACHE_BUCKET = "temp-downloads"
+EXPORT_CACHE_PREFIX = "exports/cache"
+EXPORT_CACHE_URL_TTL = 3600
+EXPORT_CACHE_MAX_AGE_HOURS = int(os.getenv("EXPORT_CACHE_MAX_AGE_HOURS", "24"))
+PRUNE_BATCH = 20
+
+
+class CachedExport(NamedTuple):
+    key: str
+    path: str
+    url: str
+    meta: Dict[str, Any]
+
+
+def fingerprint(
+    supa,
+    kind: str,
+    inputs: Dict[str, Any],
+    apply: Optional[Callable[[Any], Any]] = None,
+    table: str = "pendaftar",
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Cache key for an export of `kind` over the rows `apply(query)` selects.
+    Returns (key, state) where state is {"count", "max_updatedat"}.
+    Raises ValueError when a matching row has no updatedat: edits would
+    not change the key, so such exports must not be cached.
+    """
+    query = supa.table(table).select("updatedat", count="exact")
+    if apply is not None:
+        query = apply(query)
+    result = query.order("updatedat", desc=True).limit(1).execute()
+    rows = result.data or []
+    state = {
+        "count": result.count if result.count is not None else len(rows),
+        "max_updatedat": rows[0].get("updatedat") if rows else None,
+    }
+    # DESC sorts NULLs first, so one NULL updatedat hides the real maximum
+    # (sql/pendaftar_updatedat.sql backfills the column)
+    if rows and state["max_updatedat"] is None:
+        raise ValueError("pendaftar.updatedat is NULL for some rows; run sql/pendaftar_updatedat.sql")
+    source = json.dumps({"kind": kind, "inputs": inputs, "state": state}, sort_keys=True, default=str)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:40], state
+
+
+def _paths(key: str, ext: str) -> Tuple[str, str]:
+    return f"{EXPORT_CACHE_PREFIX}/{key}.{ext}", f"{EXPORT_CACHE_PREFIX}/{key}.json"
+
+
+def _signed_url(bucket, path: str, download_name: Optional[str]) -> str:
+    options = {"download": download_name} if download_name else {}
+    result = bucket.create_signed_url(path, EXPORT_CACHE_URL_TTL, options)
+    if isinstance(result, dict):
+        url = result.get("signedURL") or result.get("signedUrl")
+    else:
+        url = getattr(result, "signed_url", None)
+    if not url:
+        raise ValueError(f"No signed URL returned for {path}")
+    return url
+
+
+def lookup(supa, key: str, ext: str, download_name: Optional[str] = None) -> Optional[CachedExport]:
+    """
+    The stored artifact for `key` with a fresh signed URL (saved as
+    download_name, else the stored filename), or None.
+    """
+    if not EXPORT_CACHE_ENABLED:
+        return None
+    path, meta_path = _paths(key, ext)
+    bucket = supa.storage.from_(EXPORT_CACHE_BUCKET)
+    try:
+        meta = json.loads(bucket.download(meta_path))
+        url = _signed_url(bucket, path, download_name or meta.get("filename"))
+    except Exception as exc:
+        # Not found (or storage unreachable): build the export
+        print(f"[EXPORT_CACHE] Miss {key}.{ext}: {str(exc)[:120]}")
+        return None
+    print(f"[EXPORT_CACHE] Hit {key}.{ext}")
+    return CachedExport(key, path, url, meta)
+
+
+def store(
+    supa,
+    key: str,
+    ext: str,
+    data: Union[bytes, BinaryIO],
+    content_type: str,
+    meta: Dict[str, Any],
+    download_name: Optional[str] = None,
+) -> CachedExport:
+    """Upload a finished artifact (plus its metadata) and sign it."""
+    if not EXPORT_CACHE_ENABLED:
+        # Nothing would ever look the artifact up again
+        raise RuntimeError("Export cache is disabled (EXPORT_CACHE=0)")
+    path, meta_path = _paths(key, ext)
+    bucket = supa.storage.from_(EXPORT_CACHE_BUCKET)
+    size = len(data) if isinstance(data, (bytes, bytearray)) else os.fstat(data.fileno()).st_size
+    meta = dict(meta, created_at=datetime.now(timezone.utc).isoformat(), size_bytes=size)
+    bucket.upload(path=path, file=data, file_options={
+        "content-type": content_type,
+        "cache-control": "3600",
+        "upsert": "true",
+    })
+    # The sidecar marks the artifact complete; without it lookup() misses
+    bucket.upload(path=meta_path, file=json.dumps(meta).encode("utf-8"), file_options={
+        "content-type": "application/json",
+        "upsert": "true",
+    })
+    prune(supa)
+    return CachedExport(key, path, _signed_url(bucket, path, download_name), meta)
+
+
+def prune(supa) -> None:
+    """Best effort: drop cache entries older than EXPORT_CACHE_MAX_AGE_HOURS."""
+    try:
+        bucket = supa.storage.from_(EXPORT_CACHE_BUCKET)
+        listing = bucket.list(path=EXPORT_CACHE_PREFIX)
+        entries = listing if isinstance(listing, list) else getattr(listing, "data", None) or []
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=EXPORT_CACHE_MAX_AGE_HOURS)
+        expired = []
+        for entry in entries:
+            name = entry.get("name") if isinstance(entry, dict) else None
+            created_at = entry.get("created_at") if isinstance(entry, dict) else None
+            if not name or not created_at:
+                continue
+            try:
+                if datetime.fromisoformat(created_at.replace("Z", "+00:00")) < cutoff:
+                    expired.append(f"{EXPORT_CACHE_PREFIX}/{name}")
+            except ValueError:
+                continue
+        if expired:
+            bucket.remove(expired[:PRUNE_BATCH])
+            print(f"[EXPORT_CACHE] Pruned {min(len(expired), PRUNE_BATCH)} expired objects")
+    except Exception as exc:
+        print(f"[EXPORT_CACHE] Prune skipped: {exc}")
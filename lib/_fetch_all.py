@@ -0,0 +1,120 @@
+"""
+Read every row of a PostgREST query past the max-rows cap (1000 on
+Supabase by default), which otherwise truncates a plain select silently.
+
+The first page is requested with count="exact", so the total and the first
+rows come back in one round trip. The remaining pages are fetched
+concurrently (at most FETCH_ALL_WORKERS in flight) and yielded in order, so
+callers can stream rows while only a few pages are held in memory:
+
+    rows = fetch_all(supa, "pendaftar", "nisn, namalengkap",
+                     apply=lambda q: q.eq("statusberkas", "DITERIMA"),
+                     order=(("createdat", True), ("id", True)))
+    for row in rows:
+        ...
+    rows.complete  # False if the table changed under the read
+
+Pages are offset-based, so `order` must end in a unique column. Pages are
+scheduled with lib/_pipeline.py, so worker round trips stay in the
+request's Server-Timing breakdown (lib/_timing.py).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from lib._pipeline import pipelined
+
+FETCH_ALL_PAGE_SIZE = int(os.getenv("FETCH_ALL_PAGE_SIZE", "1000"))
+FETCH_ALL_WORKERS = int(os.getenv("FETCH_ALL_WORKERS", "4"))
+
+
+class PagedRows:
+    """
+    Iterable over all matching rows (iterate once). `total` is known after
+    the first page; `fetched` and `complete` once iteration finishes.
+    """
+
+    def __init__(
+        self,
+        supa,
+        table: str,
+        columns: str,
+        apply: Optional[Callable[[Any], Any]],
+        order: Sequence[Tuple[str, bool]],
+        page_size: int,
+        max_workers: int,
+        limit: Optional[int],
+    ):
+        self._supa = supa
+        self._table = table
+        self._columns = columns
+        self._apply = apply
+        self._order = order
+        self._page_size = max(1, page_size)
+        self._max_workers = max(1, max_workers)
+        self._limit = limit
+        self.total: Optional[int] = None
+        self.fetched = 0
+        self.pages = 0
+
+    @property
+    def complete(self) -> bool:
+        """All `total` rows (or `limit`) were read."""
+        if self.total is None:
+            return False
+        expected = self.total if self._limit is None else min(self.total, self._limit)
+        return self.fetched == expected
+
+    def _query(self, count: Optional[str] = None):
+        query = self._supa.table(self._table).select(self._columns, count=count)
+        if self._apply is not None:
+            query = self._apply(query)
+        for column, desc in self._order:
+            query = query.order(column, desc=desc)
+        return query
+
+    def _page(self, start: int, end: int) -> List[Dict[str, Any]]:
+        return self._query().range(start, end).execute().data or []
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        wanted = self._page_size if self._limit is None else min(self._page_size, self._limit)
+        first = self._query(count="exact").range(0, wanted - 1).execute()
+        rows = first.data or []
+        self.total = first.count if first.count is not None else len(rows)
+        self.pages = 1
+        end = self.total if self._limit is None else min(self.total, self._limit)
+
+        # A lower server-side cap shortens pages; follow it
+        page_size = len(rows) if 0 < len(rows) < wanted else wanted
+        self.fetched = len(rows)
+        yield from rows
+        del rows, first
+
+        bounds = ((start, min(start + page_size, end) - 1) for start in range(page_size, end, page_size))
+        executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        pages = pipelined(executor, lambda page: self._page(*page), bounds, self._max_workers)
+        try:
+            for _, page in pages:
+                self.pages += 1
+                self.fetched += len(page)
+                yield from page
+        finally:
+            pages.close()
+            executor.shutdown(wait=True)
+
+
+def fetch_all(
+    supa,
+    table: str,
+    columns: str = "*",
+    apply: Optional[Callable[[Any], Any]] = None,
+    order: Sequence[Tuple[str, bool]] = (("id", False),),
+    page_size: int = FETCH_ALL_PAGE_SIZE,
+    max_workers: int = FETCH_ALL_WORKERS,
+    limit: Optional[int] = None,
+) -> PagedRows:
+    """
+    All rows of `table` matching `apply(query)` (filters only; ordering is
+    `order`), fetched page by page in parallel. `limit` caps the rows read.
+    """
+    return PagedRows(supa, table, columns, apply, order, page_size, max_workers, limit)
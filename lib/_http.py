@@ -0,0 +1,112 @@
+"""
+Shared keep-alive HTTP transport for upstream calls made outside the Supabase
+client (PostgREST proxy, Auth admin API, Turnstile, Storage URLs).
+
+One `requests.Session` per warm instance, so repeated calls to the same host
+reuse the TLS connection instead of handshaking every time. Tunable via env:
+- HTTP_POOL_HOSTS          → number of hosts kept in the pool (default 8)
+- HTTP_POOL_IDLE_PER_HOST  → idle connections kept per host for reuse
+                             (default 10; the old HTTP_POOL_PER_HOST name is
+                             still read). Not a concurrency cap: extra
+                             concurrent calls to a host open extra
+                             connections, closed instead of pooled afterwards
+- HTTP_CONNECT_TIMEOUT     → connect timeout in seconds (default 5)
+- HTTP_READ_TIMEOUT        → read timeout in seconds (default 30)
+
+`requests` is imported on first use, like `supabase` in lib/_supabase.py.
+Each call is recorded in the request's Server-Timing breakdown (lib/_timing.py).
+"""
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+
+from lib._timing import record_upstream, upstream_kind
+
+if TYPE_CHECKING:
+    import requests
+
+POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "8"))
+POOL_IDLE_PER_HOST = int(os.getenv("HTTP_POOL_IDLE_PER_HOST") or os.getenv("HTTP_POOL_PER_HOST") or "10")
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+
+_SESSION: Optional["requests.Session"] = None
+_SESSION_LOCK = threading.Lock()
+_STATS_LOCK = threading.Lock()
+_STATS: Dict[str, int] = {"requests": 0, "connections_opened": 0}
+
+
+def _count(key: str) -> None:
+    with _STATS_LOCK:
+        _STATS[key] += 1
+
+
+def _build_session() -> "requests.Session":
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class _CountingHTTPPool(HTTPConnectionPool):
+        def _new_conn(self):
+            _count("connections_opened")
+            return super()._new_conn()
+
+    class _CountingHTTPSPool(HTTPSConnectionPool):
+        def _new_conn(self):
+            _count("connections_opened")
+            return super()._new_conn()
+
+    class _PooledAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                "http": _CountingHTTPPool,
+                "https": _CountingHTTPSPool,
+            }
+
+        def send(self, request, **kwargs):
+            _count("requests")
+            return super().send(request, **kwargs)
+
+    session = requests.Session()
+    # pool_block stays False: pool_maxsize only bounds the idle pool
+    adapter = _PooledAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_IDLE_PER_HOST)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def http_session() -> "requests.Session":
+    """Return the process-wide pooled session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session()
+    return _SESSION
+
+
+def http_request(method: str, url: str, timeout=None, **kwargs) -> "requests.Response":
+    """
+    `requests.request` over the shared pool.
+    timeout defaults to (CONNECT_TIMEOUT, READ_TIMEOUT); a single number sets
+    the read timeout and keeps the default connect timeout.
+    """
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    elif isinstance(timeout, (int, float)):
+        timeout = (min(CONNECT_TIMEOUT, timeout), timeout)
+    started = time.perf_counter()
+    try:
+        return http_session().request(method, url, timeout=timeout, **kwargs)
+    finally:
+        record_upstream(upstream_kind(url), time.perf_counter() - started)
+
+
+def http_stats() -> Dict[str, int]:
+    """Request / connection counters for this instance."""
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    stats["connections_reused"] = max(0, stats["requests"] - stats["connections_opened"])
+    return stats
@@ -0,0 +1,53 @@
+"""
+Bounded, ordered fan-out over a ThreadPoolExecutor.
+
+    for item, result in pipelined(executor, fetch, items, depth=8):
+        ...
+
+`fn(item)` runs on the executor for up to `depth` items ahead of the
+consumer; results are yielded in input order. Memory is bounded by depth
+(calls running or finished-but-unread), not by the number of items, and
+`items` is only pulled as slots free up, so it may itself be a lazy
+pipeline. Used by lib/_fetch_all.py (pages) and the ZIP export (folder
+listings, file downloads).
+
+Each call runs in a copy of the caller's context, keeping its round trips
+in the request's Server-Timing breakdown (lib/_timing.py). The executor
+belongs to the caller; closing the generator cancels calls that have not
+started.
+"""
+import contextvars
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Iterable, Iterator, Tuple
+
+_END = object()
+
+
+def pipelined(
+    executor: ThreadPoolExecutor,
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    depth: int,
+) -> Iterator[Tuple[Any, Any]]:
+    """Yield (item, fn(item)) in input order, at most `depth` calls ahead."""
+    items = iter(items)
+    pending: Deque[Tuple[Any, Future]] = deque()
+
+    def submit_next() -> None:
+        item = next(items, _END)
+        if item is not _END:
+            context = contextvars.copy_context()
+            pending.append((item, executor.submit(context.run, fn, item)))
+
+    try:
+        for _ in range(max(1, depth)):
+            submit_next()
+        while pending:
+            item, future = pending.popleft()
+            result = future.result()
+            submit_next()
+            yield item, result
+    finally:
+        for _, future in pending:
+            future.cancel()
@@ -1,10 +1,15 @@
 import os
-from typing import Dict, Tuple
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Dict, Tuple
 
-_CLIENT_CACHE: Dict[Tuple[str, str], Client] = {}
+if TYPE_CHECKING:
+    from supabase import Client
 
-def supabase_client(service_role: bool = False) -> Client:
+# `supabase` (and its httpx/gotrue/postgrest/storage3 tree) is the heaviest
+# import in the function, so it is deferred until the first client is built.
+# Actions that never touch the database don't pay for it on cold start.
+_CLIENT_CACHE: Dict[Tuple[str, str], "Client"] = {}
+
+def supabase_client(service_role: bool = False) -> "Client":
     """
     Buat Supabase client.
     - service_role=True  → pakai SERVICE_ROLE_KEY (khusus server, akses penuh)
@@ -25,6 +30,10 @@ def supabase_client(service_role: bool = False) -> Client:
     if cached is not None:
         return cached
 
+    from supabase import create_client
+    from lib._timing import instrument_httpx
+
+    instrument_httpx()
     client = create_client(url, key)
     _CLIENT_CACHE[cache_key] = client
     return client
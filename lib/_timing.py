@@ -0,0 +1,160 @@
+"""
+Request-scoped latency breakdown.
+
+api/index.py opens a RequestTiming for every request. While it is active,
+each upstream call is recorded against it:
+- httpx requests made by the Supabase client (PostgREST → "db",
+  Storage → "storage", Auth → "auth"), via instrument_httpx()
+- calls made through lib._http.http_request ("http", or the Supabase kind
+  when the URL points at Supabase, e.g. supa_proxy)
+
+Every response then carries a `Server-Timing` header (total, app and one
+entry per upstream kind) and the router prints one structured log line:
+
+    [TIMING] {"action": "pendaftar_cek_status", "status": 200, "total_ms": 412.7,
+              "upstream_count": 3, "upstream_ms": 380.2, ...}
+
+The context lives in a ContextVar, so work handed to a thread pool with
+contextvars.copy_context().run(...) is still counted.
+"""
+import contextvars
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+_CURRENT: "contextvars.ContextVar[Optional[RequestTiming]]" = contextvars.ContextVar(
+    "request_timing", default=None
+)
+_HTTPX_INSTRUMENTED = False
+_INSTRUMENT_LOCK = threading.Lock()
+
+# URL path prefix → upstream kind, for Supabase endpoints
+_SUPABASE_KINDS: Tuple[Tuple[str, str], ...] = (
+    ("/rest/v1/", "db"),
+    ("/storage/v1/", "storage"),
+    ("/auth/v1/", "auth"),
+    ("/functions/v1/", "functions"),
+)
+
+
+def upstream_kind(url: str) -> str:
+    """Classify an upstream URL for the Server-Timing breakdown."""
+    for prefix, kind in _SUPABASE_KINDS:
+        if prefix in url:
+            return kind
+    return "http"
+
+
+class RequestTiming:
+    def __init__(self, method: str = "", path: str = ""):
+        self.method = method
+        self.path = path
+        self.action = ""
+        self.status: Optional[int] = None
+        self.started = time.perf_counter()
+        self._calls: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            self._calls.append((kind, seconds))
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def breakdown(self) -> Dict[str, Dict[str, float]]:
+        """{kind: {"count": n, "ms": total}} for the upstream calls so far."""
+        with self._lock:
+            calls = list(self._calls)
+        kinds: Dict[str, Dict[str, float]] = {}
+        for kind, seconds in calls:
+            entry = kinds.setdefault(kind, {"count": 0, "ms": 0.0})
+            entry["count"] += 1
+            entry["ms"] += seconds * 1000
+        return kinds
+
+    def server_timing(self) -> str:
+        total = self.elapsed_ms()
+        kinds = self.breakdown()
+        upstream = sum(entry["ms"] for entry in kinds.values())
+        # Upstream calls running in parallel can add up to more than the
+        # wall clock; app time never goes negative.
+        parts = [f"total;dur={total:.1f}", f"app;dur={max(0.0, total - upstream):.1f}"]
+        for kind, entry in sorted(kinds.items()):
+            parts.append(f'{kind};dur={entry["ms"]:.1f};desc="{int(entry["count"])} calls"')
+        return ", ".join(parts)
+
+    def summary(self) -> Dict[str, object]:
+        kinds = self.breakdown()
+        return {
+            "action": self.action,
+            "method": self.method,
+            "status": self.status,
+            "total_ms": round(self.elapsed_ms(), 1),
+            "upstream_count": int(sum(entry["count"] for entry in kinds.values())),
+            "upstream_ms": round(sum(entry["ms"] for entry in kinds.values()), 1),
+            "upstream": {
+                kind: {"count": int(entry["count"]), "ms": round(entry["ms"], 1)}
+                for kind, entry in sorted(kinds.items())
+            },
+        }
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return _CURRENT.get()
+
+
+def start_request(method: str = "", path: str = "") -> Tuple[RequestTiming, contextvars.Token]:
+    timing = RequestTiming(method, path)
+    return timing, _CURRENT.set(timing)
+
+
+def finish_request(timing: RequestTiming, token: contextvars.Token) -> None:
+    """Close the request's timing context and print its log line."""
+    _CURRENT.reset(token)
+    print("[TIMING] " + json.dumps(timing.summary(), separators=(", ", ": ")))
+
+
+def record_upstream(kind: str, seconds: float) -> None:
+    timing = _CURRENT.get()
+    if timing is not None:
+        timing.record(kind, seconds)
+
+
+def server_timing_hook(request_handler, status_code) -> None:
+    """Response hook (see _crud_helpers.add_response_hook)."""
+    timing = _CURRENT.get()
+    if timing is None:
+        return
+    timing.status = status_code
+    request_handler.send_header("Server-Timing", timing.server_timing())
+
+
+def instrument_httpx() -> None:
+    """
+    Time every httpx.Client.send (the transport under postgrest, storage3
+    and gotrue). Patched on the class because the Supabase client rebuilds
+    its sub-clients lazily; a no-op when no request context is active.
+    """
+    global _HTTPX_INSTRUMENTED
+    if _HTTPX_INSTRUMENTED:
+        return
+    with _INSTRUMENT_LOCK:
+        if _HTTPX_INSTRUMENTED:
+            return
+        import httpx
+
+        original_send = httpx.Client.send
+
+        def send(self, request, *args, **kwargs):
+            if _CURRENT.get() is None:
+                return original_send(self, request, *args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return original_send(self, request, *args, **kwargs)
+            finally:
+                record_upstream(upstream_kind(str(request.url)), time.perf_counter() - started)
+
+        httpx.Client.send = send
+        _HTTPX_INSTRUMENTED = True
@@ -1,5 +1,162 @@
+import gzip
+import hashlib
 import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+from typing import Dict, NamedTuple, Optional
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: Optional[str]
+    expires: float
+    # Compressed forms of body by content-coding, filled on first use
+    encoded: Dict[str, bytes]
+
+
+class ResponseCache:
+    """
+    In-process cache of serialized response bodies, bounded by total bytes.
+    LRU eviction, per-key TTL. Lives for as long as the warm instance does;
+    writes invalidate their keys on the instance that handled them, other
+    instances catch up when the TTL runs out.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= time.time():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, body, ttl, etag=None):
+        """Cache body under key; returns the new entry (None if too large)."""
+        if len(body) > self.max_bytes:
+            return None
+        entry = CachedBody(body, etag, time.time() + ttl, {})
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._size += len(body)
+            self._evict()
+        return entry
+
+    def set_encoded(self, key, entry, encoding, data):
+        """Keep a compressed form of entry's body, if entry is still cached."""
+        with self._lock:
+            if self._entries.get(key) is not entry or encoding in entry.encoded:
+                return
+            entry.encoded[encoding] = data
+            self._size += len(data)
+            self._evict()
+
+    def invalidate(self, *keys):
+        """Drop exact keys, or every key under a prefix when it ends with ':'."""
+        with self._lock:
+            for key in keys:
+                if key.endswith(":"):
+                    for cached_key in [k for k in self._entries if k.startswith(key)]:
+                        self._drop(cached_key)
+                elif key in self._entries:
+                    self._drop(key)
+
+    def _evict(self):
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._size -= len(entry.body) + sum(len(data) for data in entry.encoded.values())
+
+
+response_cache = ResponseCache(
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+)
+DEFAULT_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "60"))
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+# "auto" uses orjson when it is installed, "json" forces the stdlib encoder
+JSON_SERIALIZER = os.getenv("JSON_SERIALIZER", "auto").lower()
+_orjson_module = None
+
+# Callables run as hook(request_handler, status_code) right before
+# end_headers() on every response, e.g. to add timing headers.
+_RESPONSE_HOOKS = []
+
+# Bodies smaller than this go out uncompressed; the headers would eat the gain.
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+STREAM_CHUNK_BYTES = 64 * 1024
+_ENCODING_SUFFIXES = ("-br", "-gzip")
+_brotli_module = None
+
+
+def _brotli():
+    """The optional `brotli` package, or None when it isn't installed."""
+    global _brotli_module
+    if _brotli_module is None:
+        try:
+            import brotli
+            _brotli_module = brotli
+        except ImportError:
+            _brotli_module = False
+    return _brotli_module or None
+
+
+def _accepted_encodings(request_handler):
+    """Encodings from Accept-Encoding, skipping any sent with q=0."""
+    header = request_handler.headers.get("Accept-Encoding") or ""
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def negotiate_encoding(request_handler, body):
+    """
+    Pick a content-coding for body: brotli when the client accepts it and
+    the package is installed, else gzip, else None (send as is).
+    """
+    if len(body) < COMPRESS_MIN_BYTES:
+        return None
+    accepted = _accepted_encodings(request_handler)
+    if "br" in accepted and _brotli() is not None:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def encode_body(body, encoding):
+    if encoding == "br":
+        return _brotli().compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        # mtime=0: the same body always gzips to the same bytes, as the
+        # strong "-gzip" ETag promises
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
 
 
 def read_json_body(request_handler):
@@ -22,17 +179,293 @@ def read_json_body(request_handler):
         raise ValueError(f"Body bukan JSON valid: {exc}") from exc
 
 
-def send_json(request_handler, status_code, payload, extra_headers=None):
-    """Send JSON response with CORS headers."""
-    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+def compute_etag(body=None, version=None):
+    """
+    Strong ETag for a response. A handler-supplied version token (e.g. a
+    max(updated_at) value) is hashed instead of the body, so large bodies
+    don't have to be hashed at all.
+    """
+    source = str(version).encode("utf-8") if version is not None else body
+    return '"' + hashlib.blake2b(source, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request_handler, etag):
+    """True when the request's If-None-Match covers etag (weak comparison)."""
+    return _matched_etag(request_handler, etag) is not None
+
+
+def _matched_etag(request_handler, etag):
+    """
+    The If-None-Match entry that matches etag, as the client sent it (so a
+    304 can echo the compressed variant's ETag back), or None.
+    """
+    header = request_handler.headers.get("If-None-Match")
+    if not header or not etag:
+        return None
+    if header.strip() == "*":
+        return etag
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for raw in header.split(","):
+        raw = raw.strip()
+        candidate = raw[2:] if raw.startswith("W/") else raw
+        # Compressed variants carry the coding as an ETag suffix
+        for suffix in _ENCODING_SUFFIXES:
+            if candidate.endswith(suffix + '"'):
+                candidate = candidate[: -len(suffix) - 1] + '"'
+                break
+        if candidate == wanted:
+            return raw
+    return None
+
+
+def _orjson():
+    """The optional `orjson` package, or None (not installed / disabled)."""
+    global _orjson_module
+    if _orjson_module is None:
+        _orjson_module = False
+        if JSON_SERIALIZER != "json":
+            try:
+                import orjson
+                _orjson_module = orjson
+            except ImportError:
+                pass
+    return _orjson_module or None
+
+
+def dumps_json(payload):
+    """Serialize payload to UTF-8 JSON bytes (orjson when available)."""
+    orjson = _orjson()
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. ints beyond 64 bits; the stdlib encoder handles those
+            pass
+    return json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def add_response_hook(hook):
+    """Register hook(request_handler, status_code), run before end_headers()."""
+    if hook not in _RESPONSE_HOOKS:
+        _RESPONSE_HOOKS.append(hook)
+
+
+def send_json(
+    request_handler,
+    status_code,
+    payload,
+    extra_headers=None,
+    cache_key=None,
+    cache_ttl=DEFAULT_CACHE_TTL,
+    etag_version=None,
+):
+    """
+    Send JSON response with CORS headers.
+    200 responses carry an ETag and become a bodyless 304 when the client's
+    If-None-Match still matches. Pass etag_version to derive the ETag from a
+    version token instead of hashing the body; on a match the payload is
+    never serialized.
+    With cache_key, a 200 body is also stored in response_cache so the next
+    send_cached_json() for that key can skip Supabase.
+    """
+    etag = None
+    if status_code == 200 and etag_version is not None:
+        etag = compute_etag(version=etag_version)
+        if not cache_key and _is_conditional_get(request_handler, etag):
+            _write_not_modified(request_handler, etag, extra_headers)
+            return
+
+    body = dumps_json(payload)
+    if status_code == 200:
+        etag = etag or compute_etag(body)
+        entry = response_cache.set(cache_key, body, cache_ttl, etag=etag) if cache_key else None
+        if _is_conditional_get(request_handler, etag):
+            _write_not_modified(request_handler, etag, extra_headers)
+            return
+        if entry is not None:
+            # Compress into the cache entry, so hits reuse it
+            _send_cached_entry(request_handler, cache_key, entry, extra_headers)
+            return
+    send_body(request_handler, status_code, body, extra_headers=extra_headers, etag=etag)
+
+
+def send_cached_json(request_handler, cache_key, extra_headers=None):
+    """Serve a cached body for cache_key. Returns False on a miss."""
+    entry = response_cache.get(cache_key)
+    if entry is None:
+        return False
+    if _is_conditional_get(request_handler, entry.etag):
+        _write_not_modified(request_handler, entry.etag, extra_headers)
+    else:
+        _send_cached_entry(request_handler, cache_key, entry, extra_headers)
+    return True
+
+
+def _send_cached_entry(request_handler, cache_key, entry, extra_headers):
+    """Send a cached body, compressing it at most once per content-coding."""
+    encoding = negotiate_encoding(request_handler, entry.body)
+    encoded = entry.encoded.get(encoding) if encoding else None
+    if encoding and encoded is None:
+        encoded = encode_body(entry.body, encoding)
+        response_cache.set_encoded(cache_key, entry, encoding, encoded)
+    send_body(
+        request_handler, 200, entry.body, extra_headers=extra_headers, etag=entry.etag,
+        encoded=(encoding, encoded) if encoding else None,
+    )
+
+
+def invalidate_cache(*keys):
+    """Drop cached public reads after a write (see ResponseCache.invalidate)."""
+    response_cache.invalidate(*keys)
+
+
+def send_body(
+    request_handler,
+    status_code,
+    body,
+    content_type=JSON_CONTENT_TYPE,
+    extra_headers=None,
+    etag=None,
+    compress=True,
+    encoded=None,
+):
+    """
+    The single response writer: every handler response ends up here.
+    Sends CORS (Access-Control-Allow-Origin: * unless extra_headers sets
+    its own), negotiates compression, and runs the response hooks.
+    Pass compress=False for bodies that are already compressed (xlsx, zip),
+    or encoded=(encoding, bytes) when body was already compressed for this
+    request (cached responses).
+    """
+    if encoded is not None:
+        encoding, body = encoded
+    else:
+        encoding = negotiate_encoding(request_handler, body) if compress else None
+        if encoding:
+            body = encode_body(body, encoding)
+    if encoding and etag:
+        # A strong ETag must differ per representation
+        etag = etag[:-1] + f'-{encoding}"'
+
+    _start_response(request_handler, status_code, extra_headers)
+    if content_type:
+        request_handler.send_header("Content-Type", content_type)
+    request_handler.send_header("Content-Length", str(len(body)))
+    if compress:
+        request_handler.send_header("Vary", "Accept-Encoding")
+    if encoding:
+        request_handler.send_header("Content-Encoding", encoding)
+    if etag:
+        request_handler.send_header("ETag", etag)
+    _end_headers(request_handler, status_code)
+    request_handler.wfile.write(body)
+
+
+def send_file(request_handler, status_code, fileobj, content_type, extra_headers=None):
+    """
+    Stream an open binary file (e.g. an export written to a temporary file)
+    in STREAM_CHUNK_BYTES chunks with an exact Content-Length, so the body is
+    never held in memory. No content-coding: use it for xlsx / zip output.
+    """
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(0)
+
+    _start_response(request_handler, status_code, extra_headers)
+    if content_type:
+        request_handler.send_header("Content-Type", content_type)
+    request_handler.send_header("Content-Length", str(size))
+    _end_headers(request_handler, status_code)
+    shutil.copyfileobj(fileobj, request_handler.wfile, STREAM_CHUNK_BYTES)
+
+
+def send_stream(request_handler, status_code, chunks, content_type, extra_headers=None):
+    """
+    Stream an iterable of bytes as the body without knowing its length.
+    HTTP/1.1 clients get Transfer-Encoding: chunked; pieces are coalesced
+    into STREAM_CHUNK_BYTES chunks, except the first one, which is sent at
+    once so the time to first byte does not depend on the body size.
+    HTTP/1.0 clients get an unframed body ended by closing the connection.
+    The connection is closed afterwards either way.
+
+    Headers are already out when `chunks` raises, so the error is logged
+    and the stream is cut short (no terminating chunk), which a client
+    sees as a truncated response rather than a complete one.
+    """
+    chunked = getattr(request_handler, "request_version", "") == "HTTP/1.1"
+    if chunked:
+        # The handler answers HTTP/1.0 by default; chunking needs 1.1
+        request_handler.protocol_version = "HTTP/1.1"
+
+    _start_response(request_handler, status_code, extra_headers)
+    if content_type:
+        request_handler.send_header("Content-Type", content_type)
+    if chunked:
+        request_handler.send_header("Transfer-Encoding", "chunked")
+    request_handler.send_header("Connection", "close")
+    _end_headers(request_handler, status_code)
+
+    wfile = request_handler.wfile
+
+    def write(data):
+        if chunked:
+            wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        else:
+            wfile.write(data)
+        wfile.flush()
+
+    buffer = bytearray()
+    first = True
+    try:
+        for piece in chunks:
+            if not piece:
+                continue
+            buffer += piece
+            if first or len(buffer) >= STREAM_CHUNK_BYTES:
+                write(bytes(buffer))
+                buffer.clear()
+                first = False
+        if buffer:
+            write(bytes(buffer))
+        if chunked:
+            wfile.write(b"0\r\n\r\n")
+            wfile.flush()
+    except Exception as exc:
+        print(f"[STREAM] Body aborted after headers: {exc}")
+        request_handler.close_connection = True
+
+
+def _is_conditional_get(request_handler, etag):
+    return (
+        getattr(request_handler, "command", "GET") in ("GET", "HEAD")
+        and etag_matches(request_handler, etag)
+    )
+
+
+def _write_not_modified(request_handler, etag, extra_headers=None):
+    etag = _matched_etag(request_handler, etag) or etag
+    _start_response(request_handler, 304, extra_headers)
+    request_handler.send_header("ETag", etag)
+    request_handler.send_header("Vary", "Accept-Encoding")
+    _end_headers(request_handler, 304)
+
+
+def _start_response(request_handler, status_code, extra_headers=None):
     request_handler.send_response(status_code)
-    request_handler.send_header("Content-Type", "application/json; charset=utf-8")
-    request_handler.send_header("Access-Control-Allow-Origin", "*")
+    if not extra_headers or "Access-Control-Allow-Origin" not in extra_headers:
+        request_handler.send_header("Access-Control-Allow-Origin", "*")
     if extra_headers:
         for key, value in extra_headers.items():
             request_handler.send_header(str(key), str(value))
+
+
+def _end_headers(request_handler, status_code):
+    for hook in _RESPONSE_HOOKS:
+        try:
+            hook(request_handler, status_code)
+        except Exception as exc:
+            print(f"[RESPONSE_HOOK] Error in {getattr(hook, '__name__', hook)}: {exc}")
     request_handler.end_headers()
-    request_handler.wfile.write(body)
 
 
 def now_timestamp():
@@ -40,10 +473,19 @@ def now_timestamp():
     return datetime.now(timezone.utc).isoformat()
 
 
-def allow_cors(request_handler, methods):
+def allow_cors(
+    request_handler,
+    methods,
+    allow_headers="Content-Type",
+    status_code=200,
+    extra_headers=None,
+):
     """Send preflight CORS response."""
-    request_handler.send_response(200)
-    request_handler.send_header("Access-Control-Allow-Origin", "*")
-    request_handler.send_header("Access-Control-Allow-Methods", ", ".join(methods))
-    request_handler.send_header("Access-Control-Allow-Headers", "Content-Type")
-    request_handler.end_headers()
+    headers = {
+        "Access-Control-Allow-Methods": ", ".join(methods),
+        "Access-Control-Allow-Headers": allow_headers,
+    }
+    if extra_headers:
+        headers.update(extra_headers)
+    _start_response(request_handler, status_code, headers)
+    _end_headers(request_handler, status_code)
@@ -0,0 +1,97 @@
+"""
+Filters shared by the pendaftar exports (export_pendaftar_xlsx,
+export_pendaftar_stream).
+
+Every filter is pushed down into the PostgREST query, together with the
+export order, so only the requested applicants leave the database:
+
+    ?gelombang=Gelombang 1           exact match (repeat the param for several)
+    ?statusberkas=DITERIMA           or ?status=; case-insensitive
+    ?rencanatingkat=MTs
+    ?rencanaprogram=Pondok Putri
+    ?from=2025-01-01&to=2025-01-31   createdat, inclusive calendar days
+
+Invalid values raise ValueError (the handlers answer 400).
+"""
+import re
+from datetime import date, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Program, then name; id keeps equal names stable across pages
+EXPORT_ORDER: Tuple[Tuple[str, bool], ...] = (
+    ("rencanaprogram", False),
+    ("namalengkap", False),
+    ("id", False),
+)
+
+_SLUG_RE = re.compile(r"[^A-Za-z0-9]+")
+
+
+class ExportFilters(NamedTuple):
+    gelombang: Tuple[str, ...] = ()
+    statusberkas: Tuple[str, ...] = ()
+    rencanatingkat: Tuple[str, ...] = ()
+    rencanaprogram: Tuple[str, ...] = ()
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+
+
+def _values(params: Dict[str, List[str]], *names: str) -> Tuple[str, ...]:
+    values: List[str] = []
+    for name in names:
+        for value in params.get(name, []):
+            value = value.strip()
+            if value and value not in values:
+                values.append(value)
+    return tuple(values)
+
+
+def _date(params: Dict[str, List[str]], name: str) -> Optional[date]:
+    raw = (params.get(name, [""])[0] or "").strip()
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw[:10])
+    except ValueError:
+        raise ValueError(f"Invalid {name}: use YYYY-MM-DD")
+
+
+def parse_export_filters(params: Dict[str, List[str]]) -> ExportFilters:
+    """Read the export filters from parse_qs() output."""
+    filters = ExportFilters(
+        gelombang=_values(params, "gelombang"),
+        statusberkas=tuple(value.upper() for value in _values(params, "statusberkas", "status")),
+        rencanatingkat=_values(params, "rencanatingkat"),
+        rencanaprogram=_values(params, "rencanaprogram"),
+        created_from=_date(params, "from"),
+        created_to=_date(params, "to"),
+    )
+    if filters.created_from and filters.created_to and filters.created_from > filters.created_to:
+        raise ValueError("from must not be after to")
+    return filters
+
+
+def apply_export_filters(query, filters: ExportFilters):
+    """Add the filters to a pendaftar select."""
+    for column in ("gelombang", "statusberkas", "rencanatingkat", "rencanaprogram"):
+        values = getattr(filters, column)
+        if len(values) == 1:
+            query = query.eq(column, values[0])
+        elif values:
+            query = query.in_(column, list(values))
+    if filters.created_from:
+        query = query.gte("createdat", filters.created_from.isoformat())
+    if filters.created_to:
+        query = query.lt("createdat", (filters.created_to + timedelta(days=1)).isoformat())
+    return query
+
+
+def filters_slug(filters: ExportFilters) -> str:
+    """Short filename part describing the filters ('' when exporting everything)."""
+    parts: List[str] = []
+    for column in ("gelombang", "statusberkas", "rencanatingkat", "rencanaprogram"):
+        parts.extend(getattr(filters, column))
+    if filters.created_from or filters.created_to:
+        parts.append(f"{filters.created_from or ''}_{filters.created_to or ''}")
+    slug = "_".join(_SLUG_RE.sub("-", part).strip("-").lower() for part in parts)
+    return slug[:80].strip("_-")
@@ -0,0 +1,66 @@
+"""
+Shared applicant search for pendaftar_list and pembayaran_list.
+
+- A 10-digit query is a NISN and a 16-digit query a NIK: both go to an
+  equality filter on the indexed key column instead of a pattern scan.
+- Anything else is a case-insensitive substring match across the text
+  columns, one PostgREST or=() filter served by the trigram indexes in
+  sql/search.sql.
+- Ranked mode calls the search_* SQL function (similarity ordered, with a
+  limit) and falls back to the unranked filter while it is not installed.
+"""
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+SEARCH_LIMIT_DEFAULT = 20
+SEARCH_LIMIT_MAX = 100
+
+_SEPARATORS_RE = re.compile(r"[\s.\-]")
+
+
+class SearchTerm(NamedTuple):
+    kind: str  # "nisn" | "nik" | "text"
+    value: str
+
+
+def parse_search(q: str) -> Optional[SearchTerm]:
+    """Classify a search box value (None when empty)."""
+    q = (q or "").strip()
+    if not q:
+        return None
+    digits = _SEPARATORS_RE.sub("", q)
+    if digits.isdigit() and len(digits) == 10:
+        return SearchTerm("nisn", digits)
+    if digits.isdigit() and len(digits) == 16:
+        return SearchTerm("nik", digits)
+    return SearchTerm("text", q)
+
+
+def _quote(value: str) -> str:
+    """Double-quote a value for a PostgREST logic tree (commas, parens, dots)."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def apply_search(query, term: Optional[SearchTerm], text_columns: Sequence[str], key_columns: Dict[str, str]):
+    """
+    Filter `query` by `term`. key_columns maps "nisn"/"nik" to the column
+    holding that identifier; text_columns are matched with ilike.
+    """
+    if term is None:
+        return query
+    if term.kind in key_columns:
+        return query.eq(key_columns[term.kind], term.value)
+    pattern = _quote(f"*{term.value}*")
+    return query.or_(",".join(f"{column}.ilike.{pattern}" for column in text_columns))
+
+
+def ranked_search(supa, function: str, term: SearchTerm, limit: int, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Rows from the ranked SQL search function, best match first (each row
+    carries search_rank). Raises when the function is missing.
+    """
+    limit = max(1, min(SEARCH_LIMIT_MAX, limit))
+    payload: Dict[str, Any] = {"p_query": term.value, "p_limit": limit}
+    payload.update({key: value for key, value in (params or {}).items() if value})
+    result = supa.rpc(function, payload).execute().data
+    return result if isinstance(result, list) else []
@@ -0,0 +1,223 @@
+"""
+Binary upload bodies for the file-upload handlers.
+
+Besides the original JSON body with a base64 `file` string, uploads can be
+sent as:
+- multipart/form-data: the file part plus plain text fields, parsed
+  incrementally from rfile in UPLOAD_CHUNK_BYTES reads;
+- a raw body (Content-Type = the file's MIME type), with the other fields
+  in the query string, e.g. ?action=upload_file&nisn=..&fileName=..
+
+Either way the file is held in memory once, and the body is rejected as
+soon as it goes over the handler's size cap.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import parse_qs, urlparse
+
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Room for the multipart boundaries, part headers and text fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+MAX_FIELD_BYTES = 16 * 1024
+MAX_HEADER_BYTES = 8 * 1024
+_QUOTED_PAIR_RE = re.compile(r"\\(.)")
+
+
+class UploadError(ValueError):
+    """Rejected upload body; status is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class Upload(NamedTuple):
+    data: bytes
+    filename: Optional[str]
+    content_type: Optional[str]
+    fields: Dict[str, str]
+
+
+def is_json_request(request_handler) -> bool:
+    """True for the legacy base64-in-JSON body (also when no type is sent)."""
+    content_type = (request_handler.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+    return content_type in ("", "application/json", "text/json")
+
+
+def read_upload(request_handler, max_bytes: int, file_field: str = "file") -> Upload:
+    """Read a multipart or raw upload body (see module docstring)."""
+    header = request_handler.headers.get("Content-Type") or ""
+    media_type, params = _parse_header(header)
+
+    try:
+        length = int(request_handler.headers.get("Content-Length") or -1)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise UploadError("Content-Length wajib diisi", 411)
+
+    if media_type == "multipart/form-data":
+        boundary = params.get("boundary")
+        if not boundary:
+            raise UploadError("Boundary multipart tidak ditemukan")
+        if length > max_bytes + MULTIPART_OVERHEAD_BYTES:
+            raise UploadError(_too_large(max_bytes), 413)
+        parser = _MultipartReader(request_handler.rfile, length, boundary.encode("latin-1"), max_bytes, file_field)
+        return parser.parse()
+
+    if length > max_bytes:
+        raise UploadError(_too_large(max_bytes), 413)
+    query = parse_qs(urlparse(request_handler.path).query)
+    fields = {key: values[0] for key, values in query.items() if key != "action"}
+    data = request_handler.rfile.read(length) if length else b""
+    if len(data) != length:
+        raise UploadError("Body upload terpotong")
+    return Upload(data, fields.get("fileName") or fields.get("filename"), media_type or None, fields)
+
+
+def _format_size(size: int) -> str:
+    """1536 → '1.5KB', 5 * 1024 * 1024 → '5MB', 500 → '500B'."""
+    for unit, scale in (("MB", 1024 * 1024), ("KB", 1024)):
+        if size >= scale:
+            return f"{size / scale:.1f}".rstrip("0").rstrip(".") + unit
+    return f"{size}B"
+
+
+def _too_large(max_bytes: int) -> str:
+    return f"Ukuran file maksimal {_format_size(max_bytes)}"
+
+
+def _split_params(value: str) -> List[str]:
+    """Split on ';' outside quoted strings, so filename="a;b.pdf" stays whole."""
+    parts: List[str] = []
+    current: List[str] = []
+    quoted = escaped = False
+    for char in value:
+        if escaped:
+            escaped = False
+        elif quoted and char == "\\":
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif char == ";" and not quoted:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current).strip())
+    return parts
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = _QUOTED_PAIR_RE.sub(r"\1", value[1:-1])
+    return value
+
+
+def _parse_header(value: str):
+    """'multipart/form-data; boundary=x' → ('multipart/form-data', {'boundary': 'x'})."""
+    parts = _split_params(value)
+    params = {}
+    for part in parts[1:]:
+        key, _, val = part.partition("=")
+        if key.strip():
+            params[key.strip().lower()] = _unquote(val)
+    return parts[0].lower(), params
+
+
+class _MultipartReader:
+    """
+    Single-pass multipart/form-data parser over a socket file. Keeps at
+    most one read chunk plus the delimiter length buffered; the file part
+    is written straight into a bytearray.
+    """
+
+    def __init__(self, rfile, length: int, boundary: bytes, max_bytes: int, file_field: str):
+        self._rfile = rfile
+        self._remaining = length
+        self._buffer = b""
+        self._delimiter = b"\r\n--" + boundary
+        self._max_bytes = max_bytes
+        self._file_field = file_field
+
+    def _fill(self) -> bool:
+        if self._remaining <= 0:
+            return False
+        chunk = self._rfile.read(min(UPLOAD_CHUNK_BYTES, self._remaining))
+        if not chunk:
+            raise UploadError("Body upload terpotong")
+        self._remaining -= len(chunk)
+        self._buffer += chunk
+        return True
+
+    def _read_until(self, marker: bytes, limit: int) -> bytes:
+        while marker not in self._buffer:
+            if len(self._buffer) > limit + len(marker):
+                raise UploadError("Header multipart terlalu besar")
+            if not self._fill():
+                raise UploadError("Body multipart tidak lengkap")
+        head, _, self._buffer = self._buffer.partition(marker)
+        return head
+
+    def _take(self, size: int) -> bytes:
+        while len(self._buffer) < size:
+            if not self._fill():
+                raise UploadError("Body multipart tidak lengkap")
+        head, self._buffer = self._buffer[:size], self._buffer[size:]
+        return head
+
+    def _stream_part(self, limit: int, too_large: str) -> bytes:
+        """The part body up to the next delimiter."""
+        delimiter = self._delimiter
+        sink = bytearray()
+        while True:
+            index = self._buffer.find(delimiter)
+            if index >= 0:
+                if len(sink) + index > limit:
+                    raise UploadError(too_large, 413)
+                sink += memoryview(self._buffer)[:index]
+                self._buffer = self._buffer[index + len(delimiter):]
+                # Converted to bytes once, at the end
+                return bytes(sink)
+            # Everything except a possible partial delimiter at the end is body
+            safe = len(self._buffer) - len(delimiter) + 1
+            if safe > 0:
+                if len(sink) + safe > limit:
+                    raise UploadError(too_large, 413)
+                sink += memoryview(self._buffer)[:safe]
+                self._buffer = self._buffer[safe:]
+            if not self._fill():
+                raise UploadError("Body multipart tidak lengkap")
+
+    def parse(self) -> Upload:
+        # The first delimiter has no leading CRLF
+        self._buffer = b"\r\n"
+        self._read_until(self._delimiter, MAX_HEADER_BYTES)
+
+        fields: Dict[str, str] = {}
+        file_data: Optional[bytes] = None
+        filename = content_type = None
+        while True:
+            if self._take(2) == b"--":
+                break
+            raw_headers = self._read_until(b"\r\n\r\n", MAX_HEADER_BYTES)
+            headers = {}
+            for line in raw_headers.decode("utf-8", "replace").split("\r\n"):
+                key, _, value = line.partition(":")
+                if key:
+                    headers[key.strip().lower()] = value.strip()
+            _, disposition = _parse_header(headers.get("content-disposition", ""))
+            name = disposition.get("name", "")
+
+            if "filename" in disposition and (name == self._file_field or file_data is None):
+                file_data = self._stream_part(self._max_bytes, _too_large(self._max_bytes))
+                filename = disposition.get("filename") or None
+                content_type = headers.get("content-type")
+            else:
+                value = self._stream_part(MAX_FIELD_BYTES, f"Field '{name}' terlalu besar")
+                fields[name] = value.decode("utf-8", "replace")
+
+        if file_data is None:
+            raise UploadError(f"Field file '{self._file_field}' tidak ditemukan")
+        return Upload(file_data, filename, content_type, fields)
@@ -5,22 +5,38 @@ import csv
 from io import StringIO
 from lib._supabase import supabase_client
 from lib.handlers._crud_helpers import send_json, read_json_body, allow_cors
+from lib.handlers._upload_helpers import UploadError, is_json_request, read_upload
+
+MAX_CSV_BYTES = 2 * 1024 * 1024
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         try:
-            body = read_json_body(self)
-            file_base64 = body.get("file")
-            
-            if not file_base64:
-                return send_json(self, 400, {"ok": False, "error": "No file provided"})
+            if is_json_request(self):
+                body = read_json_body(self)
+                file_base64 = body.get("file")
+                
+                if not file_base64:
+                    return send_json(self, 400, {"ok": False, "error": "No file provided"})
+
+                # Decode base64
+                if isinstance(file_base64, str) and file_base64.startswith("data:"):
+                    file_base64 = file_base64.split(",", 1)[1]
+                
+                try:
+                    file_bytes = base64.b64decode(file_base64)
+                except Exception as e:
+                    return send_json(self, 400, {"ok": False, "error": f"Failed to decode file: {str(e)}"})
+            else:
+                # multipart/form-data or a raw text/csv body
+                try:
+                    file_bytes = read_upload(self, MAX_CSV_BYTES).data
+                except UploadError as e:
+                    return send_json(self, e.status, {"ok": False, "error": str(e)})
+                if not file_bytes:
+                    return send_json(self, 400, {"ok": False, "error": "No file provided"})
 
-            # Decode base64
-            if isinstance(file_base64, str) and file_base64.startswith("data:"):
-                file_base64 = file_base64.split(",", 1)[1]
-            
             try:
-                file_bytes = base64.b64decode(file_base64)
                 csv_text = file_bytes.decode('utf-8')
             except Exception as e:
                 return send_json(self, 400, {"ok": False, "error": f"Failed to decode file: {str(e)}"})
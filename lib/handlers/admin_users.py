@@ -5,26 +5,23 @@ Uses Supabase Admin API with service_role key for full user CRUD
 
 import os
 import json
-import urllib.request
-import urllib.error
+
+from lib._http import http_request
+from lib.handlers._crud_helpers import allow_cors, send_json
 
 # Supabase configuration
 SUPABASE_URL = os.environ.get('SUPABASE_URL', 'https://sxbvadzcwpaovkhghttv.supabase.co')
 SUPABASE_SERVICE_KEY = os.environ.get('SUPABASE_SERVICE_ROLE_KEY', '')
 
-def send_cors_headers(handler):
-    """Send CORS headers"""
-    handler.send_header('Access-Control-Allow-Origin', '*')
-    handler.send_header('Access-Control-Allow-Methods', 'GET, POST, DELETE, OPTIONS')
-    handler.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+CORS_METHODS = ['GET', 'POST', 'DELETE', 'OPTIONS']
+CORS_HEADERS = {
+    'Access-Control-Allow-Methods': ', '.join(CORS_METHODS),
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+}
 
 def send_json_response(handler, status_code, data):
     """Send JSON response"""
-    handler.send_response(status_code)
-    handler.send_header('Content-Type', 'application/json')
-    send_cors_headers(handler)
-    handler.end_headers()
-    handler.wfile.write(json.dumps(data).encode('utf-8'))
+    send_json(handler, status_code, data, CORS_HEADERS)
 
 def make_admin_request(method, endpoint, data=None):
     """Make request to Supabase Admin API"""
@@ -39,32 +36,31 @@ def make_admin_request(method, endpoint, data=None):
     }
     
     try:
-        req_data = json.dumps(data).encode('utf-8') if data else None
-        req = urllib.request.Request(url, data=req_data, headers=headers, method=method)
-        
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            return result, response.status
-            
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8')
-        try:
-            error_data = json.loads(error_body)
-            return {'error': error_data.get('msg', error_data.get('message', str(e)))}, e.code
-        except:
-            return {'error': str(e)}, e.code
+        response = http_request(method, url, json=data if data else None, headers=headers, timeout=30)
     except Exception as e:
         return {'error': str(e)}, 500
 
+    try:
+        result = response.json() if response.content else {}
+    except ValueError:
+        result = None
+
+    if response.status_code >= 400:
+        if isinstance(result, dict):
+            return {'error': result.get('msg', result.get('message', f'HTTP Error {response.status_code}'))}, response.status_code
+        return {'error': f'HTTP Error {response.status_code}: {response.reason}'}, response.status_code
+
+    if result is None:
+        return {'error': 'Invalid JSON from Supabase Admin API'}, 500
+    return result, response.status_code
+
 
 class handler:
     @staticmethod
     def do_OPTIONS(h):
         """Handle CORS preflight"""
-        h.send_response(200)
-        send_cors_headers(h)
-        h.send_header('Access-Control-Max-Age', '86400')
-        h.end_headers()
+        allow_cors(h, CORS_METHODS, 'Content-Type, Authorization',
+                   extra_headers={'Access-Control-Max-Age': '86400'})
     
     @staticmethod
     def do_GET(h):
@@ -8,6 +8,8 @@ from lib._supabase import supabase_client
 from ._crud_helpers import (
     read_json_body,
     send_json,
+    send_cached_json,
+    invalidate_cache,
     now_timestamp,
     allow_cors,
 )
@@ -15,6 +17,9 @@ from ._crud_helpers import (
 
 TABLE_NAME = "berita"
 ORDER_FIELD = "order_index"
+# Only the public (published_only=true) listing is cached
+CACHE_KEY = "berita_items:published"
+CACHE_HEADERS = {"Cache-Control": "public, max-age=30, s-maxage=120, stale-while-revalidate=300"}
 
 
 def _get_public_client():
@@ -41,6 +46,9 @@ class handler(BaseHTTPRequestHandler):
             params = parse_qs(parsed.query)
             published_only = params.get('published_only', ['false'])[0].lower() == 'true'
             
+            if published_only and send_cached_json(self, CACHE_KEY, CACHE_HEADERS):
+                return
+
             if published_only:
                 # Public access: only published berita
                 supa = _get_public_client()
@@ -73,12 +81,10 @@ class handler(BaseHTTPRequestHandler):
                     ), reverse=True)
 
             data = result.data or []
-            cache_headers = None
             if published_only:
-                cache_headers = {
-                    "Cache-Control": "public, max-age=30, s-maxage=120, stale-while-revalidate=300"
-                }
-            send_json(self, 200, {"ok": True, "data": data}, cache_headers)
+                send_json(self, 200, {"ok": True, "data": data}, CACHE_HEADERS, cache_key=CACHE_KEY)
+            else:
+                send_json(self, 200, {"ok": True, "data": data})
             
         except Exception as exc:
             print(f"[BERITA_ITEMS][GET] Error: {exc}")
@@ -162,6 +168,7 @@ class handler(BaseHTTPRequestHandler):
 
             result = admin_client.table(TABLE_NAME).insert(insert_payload).execute()
             created = result.data[0] if result.data else insert_payload
+            invalidate_cache(CACHE_KEY)
 
             send_json(
                 self,
@@ -224,6 +231,7 @@ class handler(BaseHTTPRequestHandler):
                     )
                     if res.data:
                         updated.append(res.data[0])
+                invalidate_cache(CACHE_KEY)
 
                 send_json(
                     self,
@@ -302,6 +310,7 @@ class handler(BaseHTTPRequestHandler):
             updated = result.data[0] if result.data else None
             if not updated:
                 raise ValueError(f"Berita dengan id {item_id} tidak ditemukan")
+            invalidate_cache(CACHE_KEY)
                 
             send_json(
                 self,
@@ -335,6 +344,7 @@ class handler(BaseHTTPRequestHandler):
             
             if not result.data:
                 raise ValueError(f"Berita dengan id {item_id} tidak ditemukan")
+            invalidate_cache(CACHE_KEY)
 
             send_json(
                 self,
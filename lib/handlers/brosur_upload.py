@@ -4,6 +4,9 @@ import re
 import time
 from lib._supabase import supabase_client
 from lib.handlers._crud_helpers import read_json_body, send_json, allow_cors
+from lib.handlers._upload_helpers import UploadError, is_json_request, read_upload
+
+MAX_BROSUR_BYTES = 8 * 1024 * 1024  # 8MB
 
 
 def _slugify_filename(name: str) -> str:
@@ -15,11 +18,21 @@ def _slugify_filename(name: str) -> str:
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         try:
-            body = read_json_body(self)
-            file_b64 = body.get("file")
-            file_name = (body.get("fileName") or "brosur.pdf").strip()
+            upload = None
+            if is_json_request(self):
+                body = read_json_body(self)
+                file_b64 = body.get("file")
+            else:
+                # multipart/form-data atau raw body, tanpa base64
+                try:
+                    upload = read_upload(self, MAX_BROSUR_BYTES)
+                except UploadError as e:
+                    return send_json(self, e.status, {"ok": False, "error": str(e)})
+                body = upload.fields
+                file_b64 = None
+            file_name = (body.get("fileName") or (upload.filename if upload else None) or "brosur.pdf").strip()
 
-            if not file_b64 or not file_name:
+            if not (upload.data if upload else file_b64) or not file_name:
                 return send_json(self, 400, {"ok": False, "error": "File dan nama wajib diisi"})
 
             # Allow PDF, JPG, PNG
@@ -37,20 +50,23 @@ class handler(BaseHTTPRequestHandler):
             }
             content_type = mime_types.get(ext, "application/octet-stream")
 
-            # Strip data URL prefix if present
-            if isinstance(file_b64, str) and file_b64.startswith("data:"):
-                file_b64 = file_b64.split(",", 1)[1]
+            if upload is not None:
+                file_bytes = upload.data
+            else:
+                # Strip data URL prefix if present
+                if isinstance(file_b64, str) and file_b64.startswith("data:"):
+                    file_b64 = file_b64.split(",", 1)[1]
 
-            try:
-                file_bytes = base64.b64decode(file_b64)
-            except Exception as e:
-                return send_json(self, 400, {"ok": False, "error": f"Gagal decode file: {e}"})
+                try:
+                    file_bytes = base64.b64decode(file_b64)
+                except Exception as e:
+                    return send_json(self, 400, {"ok": False, "error": f"Gagal decode file: {e}"})
+                file_b64 = body = None
 
             if not file_bytes:
                 return send_json(self, 400, {"ok": False, "error": "Isi file kosong"})
 
-            max_size = 8 * 1024 * 1024  # 8MB
-            if len(file_bytes) > max_size:
+            if len(file_bytes) > MAX_BROSUR_BYTES:
                 return send_json(self, 400, {"ok": False, "error": "Ukuran file maksimal 8MB"})
 
             base_name = ".".join(file_name.split(".")[:-1]) or "brosur"
@@ -0,0 +1,109 @@
+from http.server import BaseHTTPRequestHandler
+import csv
+import io
+import itertools
+from datetime import datetime
+from typing import Any, Dict, Iterator
+from urllib.parse import parse_qs, urlparse
+from lib._fetch_all import fetch_all
+from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, dumps_json, send_json, send_stream
+from lib.handlers._export_helpers import EXPORT_ORDER, apply_export_filters, filters_slug, parse_export_filters
+from lib.handlers.export_pendaftar_xlsx import HEADERS, SELECT_COLUMNS, export_values
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+CSV_ROWS_PER_PIECE = 200  # rows formatted per csv.writer flush
+
+
+def _plain(value: Any) -> Any:
+    """Cell value → JSON/CSV value (birth dates as YYYY-MM-DD)."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return value
+
+
+def ndjson_lines(rows) -> Iterator[bytes]:
+    """One JSON object per applicant, keys in HEADERS order."""
+    for item in rows:
+        record = {header: _plain(value) for header, value in zip(HEADERS, export_values(item))}
+        yield dumps_json(record) + b"\n"
+
+
+def csv_pieces(rows) -> Iterator[bytes]:
+    """Header line, then CSV_ROWS_PER_PIECE rows per yielded piece."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    writer.writerow(HEADERS)
+    pending = 0
+    for item in rows:
+        if pending == 0 and buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        writer.writerow([_plain(value) for value in export_values(item)])
+        pending += 1
+        if pending >= CSV_ROWS_PER_PIECE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        """
+        GET /api/export_pendaftar_stream?format=ndjson|csv
+        Same filters as export_pendaftar_xlsx (lib/handlers/_export_helpers.py)
+        and the same columns / mapping (alamat_lengkap, file_* YA/TIDAK).
+        Response: a chunked NDJSON or CSV body, written while the pages are
+        still being fetched, so memory does not grow with the table.
+        """
+        try:
+            params = parse_qs(urlparse(self.path).query)
+            fmt = (params.get('format', ['ndjson'])[0] or 'ndjson').strip().lower()
+            if fmt not in FORMATS:
+                send_json(self, 400, {"ok": False, "error": f"format must be one of: {', '.join(FORMATS)}"})
+                return
+            try:
+                filters = parse_export_filters(params)
+            except ValueError as exc:
+                send_json(self, 400, {"ok": False, "error": str(exc)})
+                return
+
+            supa = supabase_client(service_role=True)
+            rows = fetch_all(
+                supa,
+                "pendaftar",
+                SELECT_COLUMNS,
+                apply=lambda query: apply_export_filters(query, filters),
+                order=EXPORT_ORDER,
+            )
+
+            today = datetime.now().strftime('%Y%m%d')
+            slug = filters_slug(filters)
+            filename = f"pendaftar_{slug + '_' if slug else ''}{today}.{fmt}"
+            headers: Dict[str, str] = {
+                'Content-Disposition': f'attachment; filename="{filename}"',
+                'Cache-Control': 'no-store',
+            }
+            pieces = ndjson_lines(rows) if fmt == 'ndjson' else csv_pieces(rows)
+            # Pull the first page before the headers go out, so a failing
+            # query is still answered with a 500 instead of a cut-off 200
+            first = next(pieces, b"")
+            send_stream(self, 200, itertools.chain([first], pieces), FORMATS[fmt], extra_headers=headers)
+
+            status = "complete" if rows.complete else "INCOMPLETE"
+            print(f"[EXPORT_STREAM] {filename}: {rows.fetched}/{rows.total} rows in {rows.pages} pages ({status})")
+
+        except Exception as e:
+            print(f"Error in export_pendaftar_stream: {e}")
+            send_json(self, 500, {"ok": False, "error": str(e)})
+
+    def do_OPTIONS(self):
+        """Handle CORS preflight"""
+        allow_cors(self, ['GET', 'OPTIONS'])
@@ -1,271 +1,388 @@
 from http.server import BaseHTTPRequestHandler
-from io import BytesIO
+import re
+import tempfile
+from collections import OrderedDict
 from datetime import datetime
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
+from typing import Any, Dict, Iterable, List, Set
+from urllib.parse import parse_qs, urlparse
+from lib import _export_cache as export_cache
+from lib._fetch_all import fetch_all
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, send_body, send_file, send_json
+from lib.handlers._export_helpers import EXPORT_ORDER, apply_export_filters, filters_slug, parse_export_filters
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+SELECT_COLUMNS = (
+    "id, gelombang, nisn, namalengkap, tanggallahir, tempatlahir, namasekolahasal, "
+    "nomorkip, namaayah, namaibu, telepon_orang_tua, rencanatingkat, rencanaprogram, "
+    "alamatjalan, desa, file_akta, file_ijazah, file_foto, file_kk, file_bpjs"
+)
+
+# Define headers (EXACT ORDER)
+HEADERS = [
+    'gelombang',
+    'nisn',
+    'nama',
+    'tanggal_lahir',
+    'tempat_lahir',
+    'nama_sekolah_asal',
+    'nomor_kip',
+    'nama_ayah',
+    'nama_ibu',
+    'nomor_orangtua',
+    'rencana_tingkat',
+    'rencana_program',
+    'alamat_lengkap',
+    'file_akta',  # FIXED: was 'file_akte', should be 'file_akta' to match database
+    'file_ijazah',
+    'file_foto',
+    'file_kk',
+    'file_bpjs'
+]
+
+# Source column per header (file_* headers are YA/TIDAK from the same column)
+SOURCE_COLUMNS = {
+    'gelombang': 'gelombang',
+    'nisn': 'nisn',
+    'nama': 'namalengkap',
+    'tempat_lahir': 'tempatlahir',
+    'nama_sekolah_asal': 'namasekolahasal',
+    'nomor_kip': 'nomorkip',
+    'nama_ayah': 'namaayah',
+    'nama_ibu': 'namaibu',
+    'nomor_orangtua': 'telepon_orang_tua',
+    'rencana_tingkat': 'rencanatingkat',
+    'rencana_program': 'rencanaprogram',
+}
+
+TEXT_COLUMNS = ('nisn', 'nomor_orangtua')  # Text format (preserve leading zeros)
+WRAP_COLUMNS = ('alamat_lengkap', 'nama')  # Wrap text for long text columns
+MIN_COLUMN_WIDTH = 10
+MAX_COLUMN_WIDTH = 50
+
+LAYOUTS = ('single', 'program')
+DELIVERIES = ('file', 'url')
+# Bump when the workbook layout changes so cached exports are rebuilt
+XLSX_CACHE_VERSION = 1
+CACHE_HEADER = 'X-Export-Cache'
+
+DEFAULT_SHEET_TITLE = 'Pendaftar'
+EMPTY_PROGRAM_LABEL = 'Belum Diisi'
+_SHEET_TITLE_INVALID_RE = re.compile(r'[\[\]:*?/\\]')
+
+# Named styles, registered once per workbook and referenced by every cell
+STYLE_HEADER = 'pendaftar_header'
+STYLE_CELL = 'pendaftar_cell'
+STYLE_TEXT = 'pendaftar_text'
+STYLE_DATE = 'pendaftar_date'
+STYLE_WRAP = 'pendaftar_wrap'
+
+
+def has_file(field_value: Any) -> bool:
+    """Check if file exists: not null, not empty, not 'null' string"""
+    if not field_value:
+        return False
+    str_value = str(field_value).strip().lower()
+    # Exclude common "empty" values
+    if str_value in ['', 'null', 'none', 'undefined']:
+        return False
+    return True
+
+
+def export_values(item: Dict[str, Any]) -> List[Any]:
+    """One pendaftar row → cell values in HEADERS order."""
+    values: List[Any] = []
+    for header in HEADERS:
+        if header.startswith('file_'):
+            value: Any = 'YA' if has_file(item.get(header)) else 'TIDAK'
+        elif header == 'alamat_lengkap':
+            # Build alamat_lengkap (alamatjalan + desa separated by comma)
+            alamat_parts = [
+                str(item[key]).strip() for key in ('alamatjalan', 'desa') if item.get(key)
+            ]
+            value = ', '.join(filter(None, alamat_parts))
+        elif header == 'tanggal_lahir':
+            value = item.get('tanggallahir', '')
+            if value and isinstance(value, str):
+                try:
+                    # Try YYYY-MM-DD format
+                    value = datetime.strptime(value[:10], '%Y-%m-%d')
+                except ValueError:
+                    pass
+        else:
+            value = item.get(SOURCE_COLUMNS[header], '')
+
+        # Handle None
+        values.append('' if value is None else value)
+    return values
+
+
+def _register_styles(wb) -> None:
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+    thin = Side(style='thin')
+    thin_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    wb.add_named_style(NamedStyle(
+        name=STYLE_HEADER,
+        font=Font(bold=True, color="FFFFFF"),
+        fill=PatternFill(start_color="0F9D58", end_color="0F9D58", fill_type="solid"),
+        alignment=Alignment(horizontal="center", vertical="center"),
+        border=thin_border,
+    ))
+    wb.add_named_style(NamedStyle(name=STYLE_CELL, border=thin_border))
+    wb.add_named_style(NamedStyle(name=STYLE_TEXT, border=thin_border, number_format='@'))
+    wb.add_named_style(NamedStyle(name=STYLE_DATE, border=thin_border, number_format='DD/MM/YYYY'))
+    wb.add_named_style(NamedStyle(
+        name=STYLE_WRAP,
+        border=thin_border,
+        alignment=Alignment(wrap_text=True, vertical='top'),
+    ))
+
+
+class SheetRows:
+    """Cell values for one worksheet plus the widest value per column."""
+
+    def __init__(self, title: str):
+        self.title = title
+        self.rows: List[List[Any]] = []
+        # Headers count towards the width too
+        self.widths = [len(header) for header in HEADERS]
+
+    def add(self, values: List[Any]) -> None:
+        for col_idx, value in enumerate(values):
+            if value:
+                length = len(str(value))
+                if length > self.widths[col_idx]:
+                    self.widths[col_idx] = length
+        self.rows.append(values)
+
+
+def sheet_title(label: str, used: Set[str]) -> str:
+    """Excel-safe, unique worksheet title (max 31 chars, no []:*?/\\)."""
+    base = _SHEET_TITLE_INVALID_RE.sub('-', label).strip("' ") or EMPTY_PROGRAM_LABEL
+    title = base[:31]
+    suffix = 2
+    while title.lower() in used:
+        tail = f" ({suffix})"
+        title = base[:31 - len(tail)] + tail
+        suffix += 1
+    used.add(title.lower())
+    return title
+
+
+def _write_sheet(wb, title: str, rows: Iterable[List[Any]], widths: List[int]) -> None:
+    """
+    Append one worksheet in write-only mode: rows are serialized as they
+    are appended, so memory does not grow with the cell count. Column widths
+    are emitted before the rows, so they are measured up front (`widths`).
+    """
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    ws = wb.create_sheet(title)
+
+    for col_idx, max_length in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(
+            max(max_length + 2, MIN_COLUMN_WIDTH), MAX_COLUMN_WIDTH
+        )
+
+    # Freeze pane at A2 (header row visible when scrolling)
+    ws.freeze_panes = 'A2'
+
+    def styled(style: str) -> Any:
+        cell = WriteOnlyCell(ws)
+        cell.style = style
+        return cell
+
+    header_cells = []
+    for header in HEADERS:
+        cell = styled(STYLE_HEADER)
+        cell.value = header
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    # One cell per column, reused for every row: append() serializes the
+    # row immediately, so only the values change between rows
+    row_cells = [
+        styled(STYLE_TEXT if header in TEXT_COLUMNS else STYLE_WRAP if header in WRAP_COLUMNS else STYLE_CELL)
+        for header in HEADERS
+    ]
+    date_idx = HEADERS.index('tanggal_lahir')
+    date_cell = styled(STYLE_DATE)
+    plain_date_cell = row_cells[date_idx]
+
+    for values in rows:
+        for cell, value in zip(row_cells, values):
+            cell.value = value
+        if isinstance(values[date_idx], datetime):
+            date_cell.value = values[date_idx]
+            row_cells[date_idx] = date_cell
+        else:
+            plain_date_cell.value = values[date_idx]
+            row_cells[date_idx] = plain_date_cell
+        ws.append(row_cells)
+
+
+def write_workbook(fileobj, sheets: Iterable[SheetRows]) -> None:
+    """Write every sheet (in order) to fileobj as one .xlsx archive."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    _register_styles(wb)
+    for sheet in sheets:
+        _write_sheet(wb, sheet.title, sheet.rows, sheet.widths)
+    wb.save(fileobj)
+
+
+def _send_cached(request_handler, delivery, cached, filename, cache_status):
+    """Signed-URL answer: a 302 to the file, or JSON for delivery=url."""
+    headers = {
+        CACHE_HEADER: cache_status,
+        'Access-Control-Expose-Headers': CACHE_HEADER,
+        'Cache-Control': 'no-store',
+    }
+    if delivery == 'url':
+        send_json(request_handler, 200, {
+            "ok": True,
+            "download_url": cached.url,
+            "filename": filename,
+            "rows": cached.meta.get("rows"),
+            "size_bytes": cached.meta.get("size_bytes"),
+            "cache": cache_status.lower(),
+            "expires_in": export_cache.EXPORT_CACHE_URL_TTL,
+        }, headers)
+        return
+    headers['Location'] = cached.url
+    send_body(request_handler, 302, b"", content_type=None, extra_headers=headers, compress=False)
 
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         """
         GET /api/export_pendaftar_xlsx
-        Response: Excel file download (.xlsx)
+        Query (all optional, see lib/handlers/_export_helpers.py):
+        - gelombang, statusberkas (or status), rencanatingkat, rencanaprogram,
+          from / to (YYYY-MM-DD, on createdat): pushed down into PostgREST
+        - layout=program: one worksheet per rencanaprogram
+        - delivery=url: JSON {download_url, cache} instead of the file
+        Rows come back ordered by rencanaprogram, namalengkap from the DB.
+        Response: Excel file download (.xlsx). An identical export already
+        in the cache (lib/_export_cache.py) is a 302 to its signed URL;
+        X-Export-Cache says HIT or MISS.
         """
         try:
+            params = parse_qs(urlparse(self.path).query)
+            try:
+                filters = parse_export_filters(params)
+            except ValueError as exc:
+                send_json(self, 400, {"ok": False, "error": str(exc)})
+                return
+            layout = (params.get('layout', ['single'])[0] or 'single').strip().lower()
+            if layout not in LAYOUTS:
+                send_json(self, 400, {"ok": False, "error": f"layout must be one of: {', '.join(LAYOUTS)}"})
+                return
+            delivery = (params.get('delivery', ['file'])[0] or 'file').strip().lower()
+            if delivery not in DELIVERIES:
+                send_json(self, 400, {"ok": False, "error": f"delivery must be one of: {', '.join(DELIVERIES)}"})
+                return
+
             # Get Supabase client with service role for full access
             supa = supabase_client(service_role=True)
 
-            # Query pendaftar table with computed boolean fields
-            # Using CASE to create boolean flags for file existence
-            result = (
-                supa.table("pendaftar")
-                .select("""
-                    gelombang,
-                    nisn,
-                    namalengkap,
-                    tanggallahir,
-                    tempatlahir,
-                    namasekolahasal,
-                    nomorkip,
-                    namaayah,
-                    namaibu,
-                    telepon_orang_tua,
-                    rencanatingkat,
-                    rencanaprogram,
-                    alamatjalan,
-                    desa,
-                    file_akta,
-                    file_ijazah,
-                    file_foto,
-                    file_kk,
-                    file_bpjs
-                """)
-                .execute()
-            )
-            
-            if not result.data:
-                self.send_response(404)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    b'{"ok": false, "error": "Tidak ada data pendaftar"}'
-                )
+            def apply(query):
+                return apply_export_filters(query, filters)
+
+            # Generate filename
+            today = datetime.now().strftime('%Y%m%d')
+            slug = filters_slug(filters)
+            filename = f"pendaftar_{slug + '_' if slug else ''}{today}.xlsx"
+
+            # Same filters + layout over unchanged rows → same workbook
+            cache_key = None
+            cached = None
+            if export_cache.EXPORT_CACHE_ENABLED:
+                try:
+                    cache_key, _ = export_cache.fingerprint(supa, "pendaftar_xlsx", {
+                        "filters": filters._asdict(),
+                        "layout": layout,
+                        "version": XLSX_CACHE_VERSION,
+                    }, apply=apply)
+                    cached = export_cache.lookup(supa, cache_key, "xlsx", download_name=filename)
+                except Exception as cache_error:
+                    print(f"[EXPORT_XLSX] ⚠️ Export cache unavailable: {cache_error}")
+            if cached is not None:
+                _send_cached(self, delivery, cached, filename, "HIT")
                 return
 
-            # Transform data to match expected format
-            rows = []
-            for item in result.data:
-                # Build alamat_lengkap (alamatjalan + desa separated by comma)
-                alamat_parts = []
-                if item.get('alamatjalan'):
-                    alamat_parts.append(item['alamatjalan'].strip())
-                if item.get('desa'):
-                    alamat_parts.append(item['desa'].strip())
-                alamat_lengkap = ', '.join(filter(None, alamat_parts))
-                
-                # Check if files exist (any non-empty value counts as file exists)
-                def has_file(field_value):
-                    """Check if file exists: not null, not empty, not 'null' string"""
-                    if not field_value:
-                        return False
-                    str_value = str(field_value).strip().lower()
-                    # Exclude common "empty" values
-                    if str_value in ['', 'null', 'none', 'undefined']:
-                        return False
-                    return True
-                
-                has_file_akta = has_file(item.get('file_akta'))
-                has_file_ijazah = has_file(item.get('file_ijazah'))
-                has_file_foto = has_file(item.get('file_foto'))
-                has_file_kk = has_file(item.get('file_kk'))
-                has_file_bpjs = has_file(item.get('file_bpjs'))
-                
-                rows.append({
-                    'gelombang': item.get('gelombang', ''),
-                    'nisn': item.get('nisn', ''),
-                    'nama': item.get('namalengkap', ''),
-                    'tanggal_lahir': item.get('tanggallahir', ''),
-                    'tempat_lahir': item.get('tempatlahir', ''),
-                    'nama_sekolah_asal': item.get('namasekolahasal', ''),
-                    'nomor_kip': item.get('nomorkip', ''),
-                    'nama_ayah': item.get('namaayah', ''),
-                    'nama_ibu': item.get('namaibu', ''),
-                    'nomor_orangtua': item.get('telepon_orang_tua', ''),
-                    'rencana_tingkat': item.get('rencanatingkat', ''),
-                    'rencana_program': item.get('rencanaprogram', ''),
-                    'alamat_lengkap': alamat_lengkap,
-                    'has_file_akta': has_file_akta,
-                    'has_file_ijazah': has_file_ijazah,
-                    'has_file_foto': has_file_foto,
-                    'has_file_kk': has_file_kk,
-                    'has_file_bpjs': has_file_bpjs,
-                })
-            
-            # Sort by rencana_program (case-insensitive, A-Z), then by nama
-            rows.sort(key=lambda x: (str(x.get('rencana_program', '')).lower(), str(x.get('nama', ''))))
-
-            # Create Excel workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Pendaftar"
-
-            # Define headers (EXACT ORDER)
-            headers = [
-                'gelombang',
-                'nisn',
-                'nama',
-                'tanggal_lahir',
-                'tempat_lahir',
-                'nama_sekolah_asal',
-                'nomor_kip',
-                'nama_ayah',
-                'nama_ibu',
-                'nomor_orangtua',
-                'rencana_tingkat',
-                'rencana_program',
-                'alamat_lengkap',
-                'file_akta',  # FIXED: was 'file_akte', should be 'file_akta' to match database
-                'file_ijazah',
-                'file_foto',
-                'file_kk',
-                'file_bpjs'
-            ]
+            # Matching pendaftar rows in export order, past the 1000-row
+            # max-rows cap (pages in parallel)
+            result = fetch_all(supa, "pendaftar", SELECT_COLUMNS, apply=apply, order=EXPORT_ORDER)
 
-            # Write headers
-            ws.append(headers)
-
-            # Style header row
-            header_fill = PatternFill(start_color="0F9D58", end_color="0F9D58", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-
-            for cell in ws[1]:
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = thin_border
-
-            # Write data rows
-            for row_data in rows:
-                row_values = []
-                for header in headers:
-                    # Map has_file_* to file_* with YA/TIDAK
-                    if header.startswith('file_'):
-                        boolean_key = 'has_' + header
-                        value = 'YA' if row_data.get(boolean_key, False) else 'TIDAK'
-                        
-                    else:
-                        value = row_data.get(header, '')
-                    
-                    # Handle None
-                    if value is None:
-                        value = ''
-                    
-                    # Handle date formatting
-                    if header == 'tanggal_lahir' and value and value != '':
-                        try:
-                            # Parse date if string
-                            if isinstance(value, str):
-                                # Try YYYY-MM-DD format
-                                date_obj = datetime.strptime(value[:10], '%Y-%m-%d')
-                                value = date_obj
-                        except:
-                            pass
-                    
-                    row_values.append(value)
-                
-                ws.append(row_values)
-
-            # Apply styling to all cells
-            for row_idx, row in enumerate(ws.iter_rows(min_row=2, max_row=ws.max_row), start=2):
-                for col_idx, cell in enumerate(row, start=1):
-                    cell.border = thin_border
-                    
-                    header_name = headers[col_idx - 1]
-                    
-                    # Text format for NISN and phone number (preserve leading zeros)
-                    if header_name in ['nisn', 'nomor_orangtua']:
-                        cell.number_format = '@'  # Text format
-                    
-                    # Date format
-                    elif header_name == 'tanggal_lahir':
-                        if isinstance(cell.value, datetime):
-                            cell.number_format = 'DD/MM/YYYY'
-                    
-                    # Wrap text for long text columns
-                    if header_name in ['alamat_lengkap', 'nama']:
-                        cell.alignment = Alignment(wrap_text=True, vertical='top')
-
-            # Auto-fit columns
-            for col_idx, col in enumerate(ws.columns, start=1):
-                column_letter = get_column_letter(col_idx)
-                max_length = 0
-                
-                for cell in col:
-                    try:
-                        if cell.value:
-                            cell_length = len(str(cell.value))
-                            if cell_length > max_length:
-                                max_length = cell_length
-                    except:
-                        pass
-                
-                # Set column width with limits
-                adjusted_width = min(max(max_length + 2, 10), 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-
-            # Freeze pane at A2 (header row visible when scrolling)
-            ws.freeze_panes = 'A2'
-
-            # Save to BytesIO
-            excel_buffer = BytesIO()
-            wb.save(excel_buffer)
-            excel_buffer.seek(0)
-            excel_data = excel_buffer.read()
+            # One pass: cell values plus the widest value per column, per sheet
+            sheets: "OrderedDict[str, SheetRows]" = OrderedDict()
+            used_titles: Set[str] = set()
+            for item in result:
+                label = DEFAULT_SHEET_TITLE
+                if layout == 'program':
+                    label = str(item.get('rencanaprogram') or '').strip() or EMPTY_PROGRAM_LABEL
+                sheet = sheets.get(label)
+                if sheet is None:
+                    sheet = sheets[label] = SheetRows(sheet_title(label, used_titles))
+                sheet.add(export_values(item))
+            print(f"[EXPORT_XLSX] Fetched {result.fetched}/{result.total} rows in {result.pages} pages")
 
-            # Generate filename
-            today = datetime.now().strftime('%Y%m%d')
-            filename = f"pendaftar_{today}.xlsx"
+            if not sheets:
+                send_json(self, 404, {"ok": False, "error": "Tidak ada data pendaftar"})
+                return
 
-            # Send Excel response
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-            self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
-            self.send_header('Content-Length', str(len(excel_data)))
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Cache-Control', 'no-cache')
-            self.end_headers()
-            self.wfile.write(excel_data)
+            # The archive goes to a temporary file and is streamed from there
+            with tempfile.NamedTemporaryFile(suffix=".xlsx") as excel_file:
+                write_workbook(excel_file, sheets.values())
+                excel_file.flush()
 
-            print(f"✓ Excel exported: {filename} ({len(rows)} rows)")
+                stored = None
+                if cache_key and result.complete:
+                    try:
+                        # Storage reads the upload from disk (see the ZIP export)
+                        with open(excel_file.name, 'rb') as excel_stream:
+                            stored = export_cache.store(
+                                supa, cache_key, "xlsx", excel_stream, XLSX_CONTENT_TYPE,
+                                meta={"filename": filename, "rows": result.fetched, "sheets": len(sheets)},
+                                download_name=filename,
+                            )
+                    except Exception as cache_error:
+                        print(f"[EXPORT_XLSX] ⚠️ Could not cache export: {cache_error}")
+                if delivery == 'url':
+                    if stored is None:
+                        send_json(self, 503, {"ok": False, "error": "Export tidak dapat disimpan, coba delivery=file"})
+                    else:
+                        _send_cached(self, delivery, stored, filename, "MISS")
+                    return
+
+                # xlsx is already a zip archive, so no content-coding
+                send_file(
+                    self,
+                    200,
+                    excel_file,
+                    XLSX_CONTENT_TYPE,
+                    extra_headers={
+                        'Content-Disposition': f'attachment; filename="{filename}"',
+                        'Cache-Control': 'no-cache',
+                        CACHE_HEADER: 'MISS',
+                        'Access-Control-Expose-Headers': CACHE_HEADER,
+                    },
+                )
+
+            print(f"✓ Excel exported: {filename} ({result.fetched} rows, {len(sheets)} sheets)")
 
         except Exception as e:
             print(f"Error in export_pendaftar_xlsx: {e}")
             import traceback
             traceback.print_exc()
-            
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(
-                f'{{"ok": false, "error": "{str(e)}"}}'.encode('utf-8')
-            )
+
+            send_json(self, 500, {"ok": False, "error": str(e)})
 
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-
+        allow_cors(self, ['GET', 'OPTIONS'])
@@ -7,34 +7,15 @@ Returns: Single active gelombang or null
 """
 
 from http.server import BaseHTTPRequestHandler
-import json
-from typing import Dict, Any, Optional
 
 try:
     from lib._supabase import supabase_client
 except ImportError:
     from _supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, send_json, send_cached_json
 
-
-def _send_json(
-    request_handler,
-    code: int,
-    payload: Dict[str, Any],
-    extra_headers: Optional[Dict[str, str]] = None,
-) -> None:
-    """Helper to send JSON response with CORS headers"""
-    data = json.dumps(payload, default=str).encode('utf-8')
-    request_handler.send_response(code)
-    request_handler.send_header('Content-Type', 'application/json; charset=utf-8')
-    request_handler.send_header('Content-Length', str(len(data)))
-    request_handler.send_header('Access-Control-Allow-Origin', '*')
-    request_handler.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-    request_handler.send_header('Access-Control-Allow-Headers', 'Content-Type')
-    if extra_headers:
-        for key, value in extra_headers.items():
-            request_handler.send_header(str(key), str(value))
-    request_handler.end_headers()
-    request_handler.wfile.write(data)
+CACHE_KEY = "gelombang_active"
+CACHE_HEADERS = {"Cache-Control": "public, max-age=30, s-maxage=120, stale-while-revalidate=300"}
 
 
 class handler(BaseHTTPRequestHandler):
@@ -46,6 +27,9 @@ class handler(BaseHTTPRequestHandler):
         print("[GELOMBANG_ACTIVE] GET request received")
         
         try:
+            if send_cached_json(self, CACHE_KEY, CACHE_HEADERS):
+                return
+
             # Initialize Supabase client (ANON key for public access)
             supa = supabase_client(service_role=False)
             print("[GELOMBANG_ACTIVE] Supabase client initialized (ANON)")
@@ -69,22 +53,20 @@ class handler(BaseHTTPRequestHandler):
             else:
                 print("[GELOMBANG_ACTIVE] No active gelombang found")
             
-            return _send_json(self, 200, {
+            return send_json(self, 200, {
                 "ok": True,
                 "data": active_gelombang
-            }, {
-                "Cache-Control": "public, max-age=30, s-maxage=120, stale-while-revalidate=300"
-            })
+            }, CACHE_HEADERS, cache_key=CACHE_KEY)
             
         except Exception as e:
             print(f"[GELOMBANG_ACTIVE] Error: {str(e)}")
             import traceback
             traceback.print_exc()
-            return _send_json(self, 500, {
+            return send_json(self, 500, {
                 "ok": False,
                 "error": str(e)
             }, {"Cache-Control": "no-store"})
     
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        return _send_json(self, 204, {}, {"Cache-Control": "no-store"})
+        return allow_cors(self, ["GET", "OPTIONS"], status_code=204, extra_headers={"Cache-Control": "no-store"})
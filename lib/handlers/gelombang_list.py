@@ -1,6 +1,6 @@
 from http.server import BaseHTTPRequestHandler
-import json
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, send_json
 
 
 class handler(BaseHTTPRequestHandler):
@@ -24,17 +24,10 @@ class handler(BaseHTTPRequestHandler):
             gelombang_list = result.data if result.data else []
             
             # Send success response
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.send_header("Cache-Control", "public, max-age=30, s-maxage=120, stale-while-revalidate=300")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({
-                    "ok": True,
-                    "data": gelombang_list
-                }).encode('utf-8')
-            )
+            send_json(self, 200, {
+                "ok": True,
+                "data": gelombang_list
+            }, {"Cache-Control": "public, max-age=30, s-maxage=120, stale-while-revalidate=300"})
             
             print(f"✓ Gelombang list fetched: {len(gelombang_list)} items")
 
@@ -43,21 +36,11 @@ class handler(BaseHTTPRequestHandler):
             import traceback
             traceback.print_exc()
             
-            self.send_response(500)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({
-                    "ok": False,
-                    "error": str(e)
-                }).encode('utf-8')
-            )
+            send_json(self, 500, {
+                "ok": False,
+                "error": str(e)
+            })
 
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        allow_cors(self, ['GET', 'OPTIONS'])
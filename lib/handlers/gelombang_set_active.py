@@ -3,6 +3,7 @@ import json
 import os
 from datetime import datetime
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import invalidate_cache, allow_cors, send_json
 
 # Simple admin token from environment (optional)
 # If not set, relies on Supabase RLS policies
@@ -30,16 +31,10 @@ class handler(BaseHTTPRequestHandler):
             # Parse request body
             content_length = int(self.headers.get('Content-Length', 0))
             if content_length == 0:
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({
-                        "ok": False,
-                        "error": "Request body is required"
-                    }).encode('utf-8')
-                )
+                send_json(self, 400, {
+                    "ok": False,
+                    "error": "Request body is required"
+                })
                 return
 
             body = self.rfile.read(content_length).decode('utf-8')
@@ -51,16 +46,10 @@ class handler(BaseHTTPRequestHandler):
             print(f"[SET_GELOMBANG_ACTIVE] Received request to activate gelombang ID: {gelombang_id} (type: {type(gelombang_id).__name__})")
             
             if not gelombang_id:
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({
-                        "ok": False,
-                        "error": "Missing required field: id"
-                    }).encode('utf-8')
-                )
+                send_json(self, 400, {
+                    "ok": False,
+                    "error": "Missing required field: id"
+                })
                 return
             
             # Get Supabase client with service role
@@ -108,6 +97,8 @@ class handler(BaseHTTPRequestHandler):
             else:
                 print(f"[SET_GELOMBANG_ACTIVE] ✓ RPC SUCCESS: Gelombang ID {gelombang_id} activated")
             
+            invalidate_cache("gelombang_active")
+
             # Fetch updated gelombang to return in response
             activated_result = supa.table("gelombang").select("*").eq("id", gelombang_id).execute()
             
@@ -127,29 +118,17 @@ class handler(BaseHTTPRequestHandler):
                 print(f"  - ID {g['id']}: {g['nama']} = {status}")
             
             # Send success response
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({
-                    "ok": True,
-                    "data": activated_gelombang,
-                    "message": f"{activated_gelombang.get('nama', 'Gelombang')} berhasil diaktifkan"
-                }).encode('utf-8')
-            )
+            send_json(self, 200, {
+                "ok": True,
+                "data": activated_gelombang,
+                "message": f"{activated_gelombang.get('nama', 'Gelombang')} berhasil diaktifkan"
+            })
 
         except json.JSONDecodeError:
-            self.send_response(400)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({
-                    "ok": False,
-                    "error": "Invalid JSON format"
-                }).encode('utf-8')
-            )
+            send_json(self, 400, {
+                "ok": False,
+                "error": "Invalid JSON format"
+            })
         except Exception as e:
             print(f"[SET_GELOMBANG_ACTIVE] ❌ Exception in set_gelombang_active: {e}")
             import traceback
@@ -164,43 +143,26 @@ class handler(BaseHTTPRequestHandler):
             
             # Check if it's a unique constraint violation
             if "unique" in error_message.lower() or "constraint" in error_message.lower():
-                self.send_response(409)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({
-                        "ok": False,
-                        "error": "Konflik: Hanya satu gelombang yang boleh aktif"
-                    }).encode('utf-8')
-                )
+                send_json(self, 409, {
+                    "ok": False,
+                    "error": "Konflik: Hanya satu gelombang yang boleh aktif"
+                })
             else:
                 # Return more detailed error for debugging
-                self.send_response(500)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                
                 # Parse error message for cleaner display
                 clean_error = error_message
                 if "JSON" in error_message or "json" in error_message:
                     clean_error = "Database function error. Silakan coba lagi atau hubungi administrator."
                 
-                self.wfile.write(
-                    json.dumps({
-                        "ok": False,
-                        "error": clean_error,
-                        "details": {
-                            "error_type": error_type,
-                            "raw_error": error_message
-                        }
-                    }).encode('utf-8')
-                )
+                send_json(self, 500, {
+                    "ok": False,
+                    "error": clean_error,
+                    "details": {
+                        "error_type": error_type,
+                        "raw_error": error_message
+                    }
+                })
 
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, x-admin-token')
-        self.end_headers()
+        allow_cors(self, ['POST', 'OPTIONS'], 'Content-Type, x-admin-token')
@@ -2,6 +2,7 @@ from http.server import BaseHTTPRequestHandler
 import json
 from datetime import datetime
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import invalidate_cache, allow_cors, send_json
 
 
 class handler(BaseHTTPRequestHandler):
@@ -15,16 +16,10 @@ class handler(BaseHTTPRequestHandler):
             # Parse request body
             content_length = int(self.headers.get('Content-Length', 0))
             if content_length == 0:
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({
-                        "ok": False,
-                        "error": "Request body is required"
-                    }).encode('utf-8')
-                )
+                send_json(self, 400, {
+                    "ok": False,
+                    "error": "Request body is required"
+                })
                 return
 
             body = self.rfile.read(content_length).decode('utf-8')
@@ -41,16 +36,10 @@ class handler(BaseHTTPRequestHandler):
             # nama, start_date, end_date, tahun_ajaran are required
             # nama_en is optional for backward compatibility
             if not all([gelombang_id, nama, start_date, end_date, tahun_ajaran]):
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({
-                        "ok": False,
-                        "error": "Missing required fields: id, nama, start_date, end_date, tahun_ajaran"
-                    }).encode('utf-8')
-                )
+                send_json(self, 400, {
+                    "ok": False,
+                    "error": "Missing required fields: id, nama, start_date, end_date, tahun_ajaran"
+                })
                 return
             
             # Validate date range: start_date <= end_date
@@ -59,28 +48,16 @@ class handler(BaseHTTPRequestHandler):
                 end = datetime.strptime(end_date, '%Y-%m-%d')
                 
                 if start > end:
-                    self.send_response(400)
-                    self.send_header("Content-Type", "application/json")
-                    self.send_header("Access-Control-Allow-Origin", "*")
-                    self.end_headers()
-                    self.wfile.write(
-                        json.dumps({
-                            "ok": False,
-                            "error": "start_date harus lebih kecil atau sama dengan end_date"
-                        }).encode('utf-8')
-                    )
+                    send_json(self, 400, {
+                        "ok": False,
+                        "error": "start_date harus lebih kecil atau sama dengan end_date"
+                    })
                     return
             except ValueError as e:
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({
-                        "ok": False,
-                        "error": f"Invalid date format: {str(e)}"
-                    }).encode('utf-8')
-                )
+                send_json(self, 400, {
+                    "ok": False,
+                    "error": f"Invalid date format: {str(e)}"
+                })
                 return
             
             # Get Supabase client with service role
@@ -108,67 +85,40 @@ class handler(BaseHTTPRequestHandler):
             )
             
             if not result.data:
-                self.send_response(404)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({
-                        "ok": False,
-                        "error": f"Gelombang dengan id {gelombang_id} tidak ditemukan"
-                    }).encode('utf-8')
-                )
+                send_json(self, 404, {
+                    "ok": False,
+                    "error": f"Gelombang dengan id {gelombang_id} tidak ditemukan"
+                })
                 return
             
             updated_gelombang = result.data[0]
+            invalidate_cache("gelombang_active")
             
             # Send success response
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({
-                    "ok": True,
-                    "data": updated_gelombang,
-                    "message": f"Gelombang {updated_gelombang.get('nama', '')} berhasil diupdate"
-                }).encode('utf-8')
-            )
+            send_json(self, 200, {
+                "ok": True,
+                "data": updated_gelombang,
+                "message": f"Gelombang {updated_gelombang.get('nama', '')} berhasil diupdate"
+            })
             
             print(f"✓ Gelombang updated: id={gelombang_id}")
 
         except json.JSONDecodeError:
-            self.send_response(400)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({
-                    "ok": False,
-                    "error": "Invalid JSON format"
-                }).encode('utf-8')
-            )
+            send_json(self, 400, {
+                "ok": False,
+                "error": "Invalid JSON format"
+            })
         except Exception as e:
             print(f"Error in update_gelombang: {e}")
             import traceback
             traceback.print_exc()
             
-            self.send_response(500)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({
-                    "ok": False,
-                    "error": str(e)
-                }).encode('utf-8')
-            )
+            send_json(self, 500, {
+                "ok": False,
+                "error": str(e)
+            })
 
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        allow_cors(self, ['POST', 'OPTIONS'])
 
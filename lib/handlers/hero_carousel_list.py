@@ -3,12 +3,18 @@ API Handler: GET /api/hero_carousel_list
 Fetch all hero carousel images (santri PNG) for the homepage slider
 """
 from http.server import BaseHTTPRequestHandler
-import json
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import send_json, send_cached_json, allow_cors
+
+CACHE_KEY = "hero_carousel_list"
+CACHE_HEADERS = {"Cache-Control": "public, max-age=60, s-maxage=300, stale-while-revalidate=600"}
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         try:
+            if send_cached_json(self, CACHE_KEY, CACHE_HEADERS):
+                return
+
             print("[HERO_CAROUSEL_LIST] Fetching hero carousel images...")
             
             # Get Supabase client with service role
@@ -25,38 +31,21 @@ class handler(BaseHTTPRequestHandler):
             
             print(f"[HERO_CAROUSEL_LIST] Found {len(result.data) if result.data else 0} active images")
             
-            # Send success response
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.send_header("Cache-Control", "public, max-age=60, s-maxage=300, stale-while-revalidate=600")
-            self.end_headers()
-            
             response = {
                 "ok": True,
                 "data": result.data if result.data else [],
                 "count": len(result.data) if result.data else 0
             }
-            
-            self.wfile.write(json.dumps(response).encode())
+            send_json(self, 200, response, CACHE_HEADERS, cache_key=CACHE_KEY)
             print("[HERO_CAROUSEL_LIST] ✅ Success")
             
         except Exception as e:
             print(f"[HERO_CAROUSEL_LIST] ❌ Error: {e}")
             
-            self.send_response(500)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
-            self.wfile.write(json.dumps({
+            send_json(self, 500, {
                 "ok": False,
                 "error": str(e)
-            }).encode())
+            })
     
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['GET', 'OPTIONS'])
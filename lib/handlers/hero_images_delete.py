@@ -3,9 +3,9 @@ API Handler: DELETE /api/hero_images_delete
 Delete hero image from slider
 """
 from http.server import BaseHTTPRequestHandler
-import json
 from urllib.parse import urlparse, parse_qs
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import invalidate_cache, allow_cors, send_json
 
 class handler(BaseHTTPRequestHandler):
     def do_DELETE(self):
@@ -48,53 +48,35 @@ class handler(BaseHTTPRequestHandler):
             
             # Delete from database
             delete_result = supa.table("hero_images").delete().eq("id", image_id).execute()
+            invalidate_cache("hero_images_list")
             
             print(f"[HERO_DELETE] ✅ Image deleted from database: ID {image_id}")
             
             # Send success response
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
             response = {
                 "ok": True,
                 "message": "Hero image deleted successfully",
                 "deleted_id": image_id
             }
             
-            self.wfile.write(json.dumps(response).encode())
+            send_json(self, 200, response)
             
         except ValueError as e:
             print(f"[HERO_DELETE] ❌ Validation error: {e}")
             
-            self.send_response(400)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
-            self.wfile.write(json.dumps({
+            send_json(self, 400, {
                 "ok": False,
                 "error": str(e)
-            }).encode())
+            })
             
         except Exception as e:
             print(f"[HERO_DELETE] ❌ Error: {e}")
             
-            self.send_response(500)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
-            self.wfile.write(json.dumps({
+            send_json(self, 500, {
                 "ok": False,
                 "error": str(e)
-            }).encode())
+            })
     
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "DELETE, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['DELETE', 'OPTIONS'])
 
@@ -6,6 +6,7 @@ from http.server import BaseHTTPRequestHandler
 import json
 from datetime import datetime
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import invalidate_cache, allow_cors, send_json
 
 class handler(BaseHTTPRequestHandler):
     def do_PUT(self):
@@ -45,52 +46,34 @@ class handler(BaseHTTPRequestHandler):
                     updated_count += 1
                     print(f"[HERO_UPDATE_ORDER] Updated ID {image_id} to order {display_order}")
             
+            invalidate_cache("hero_images_list")
             print(f"[HERO_UPDATE_ORDER] ✅ Updated {updated_count} images")
             
             # Send success response
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
             response = {
                 "ok": True,
                 "message": f"Updated display order for {updated_count} images",
                 "updated_count": updated_count
             }
             
-            self.wfile.write(json.dumps(response).encode())
+            send_json(self, 200, response)
             
         except ValueError as e:
             print(f"[HERO_UPDATE_ORDER] ❌ Validation error: {e}")
             
-            self.send_response(400)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
-            self.wfile.write(json.dumps({
+            send_json(self, 400, {
                 "ok": False,
                 "error": str(e)
-            }).encode())
+            })
             
         except Exception as e:
             print(f"[HERO_UPDATE_ORDER] ❌ Error: {e}")
             
-            self.send_response(500)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
-            self.wfile.write(json.dumps({
+            send_json(self, 500, {
                 "ok": False,
                 "error": str(e)
-            }).encode())
+            })
     
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "PUT, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['PUT', 'OPTIONS'])
 
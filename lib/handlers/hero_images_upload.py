@@ -8,20 +8,33 @@ import base64
 import uuid
 from datetime import datetime
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import invalidate_cache, allow_cors, send_json
+from lib.handlers._upload_helpers import UploadError, is_json_request, read_upload
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         try:
-            # Read request body
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length)
-            data = json.loads(body.decode())
+            upload = None
+            if is_json_request(self):
+                # Read request body
+                content_length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(content_length)
+                data = json.loads(body.decode())
+            else:
+                # multipart/form-data (field "image") atau raw body
+                upload = read_upload(self, MAX_UPLOAD_BYTES, file_field="image")
+                data = dict(upload.fields)
+                data.setdefault('filename', upload.filename or "")
             
             print("[HERO_UPLOAD] Uploading hero image...")
             
             # Validate required fields
-            if not data.get('image_base64'):
+            if upload is None and not data.get('image_base64'):
                 raise ValueError("Missing image_base64")
+            if upload is not None and not upload.data:
+                raise ValueError("Missing image")
             
             if not data.get('filename'):
                 raise ValueError("Missing filename")
@@ -37,12 +50,16 @@ class handler(BaseHTTPRequestHandler):
             if current_count >= 5:
                 raise ValueError("Maximum 5 hero images allowed. Please delete one first.")
             
-            # Decode base64 image
-            image_data = data['image_base64']
-            if ',' in image_data:
-                image_data = image_data.split(',')[1]  # Remove data:image/...;base64, prefix
-            
-            image_bytes = base64.b64decode(image_data)
+            if upload is not None:
+                image_bytes = upload.data
+            else:
+                # Decode base64 image
+                image_data = data.pop('image_base64')
+                if ',' in image_data:
+                    image_data = image_data.split(',')[1]  # Remove data:image/...;base64, prefix
+                
+                image_bytes = base64.b64decode(image_data)
+                image_data = body = None
             
             # Generate unique filename
             file_ext = data['filename'].split('.')[-1] if '.' in data['filename'] else 'jpg'
@@ -82,6 +99,8 @@ class handler(BaseHTTPRequestHandler):
             
             # Insert record into hero_images table
             display_order = data.get('display_order', current_count + 1)
+            if isinstance(display_order, str) and display_order.strip().isdigit():
+                display_order = int(display_order)
             
             insert_result = supa.table("hero_images").insert({
                 "image_url": public_url,
@@ -91,52 +110,42 @@ class handler(BaseHTTPRequestHandler):
                 "updated_at": datetime.utcnow().isoformat()
             }).execute()
             
+            invalidate_cache("hero_images_list")
             print(f"[HERO_UPLOAD] ✅ Image uploaded successfully: {unique_filename}")
             
             # Send success response
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
             response = {
                 "ok": True,
                 "message": "Hero image uploaded successfully",
                 "data": insert_result.data[0] if insert_result.data else None
             }
             
-            self.wfile.write(json.dumps(response).encode())
+            send_json(self, 200, response)
+            
+        except UploadError as e:
+            print(f"[HERO_UPLOAD] ❌ Upload rejected: {e}")
+            
+            send_json(self, e.status, {
+                "ok": False,
+                "error": str(e)
+            })
             
         except ValueError as e:
             print(f"[HERO_UPLOAD] ❌ Validation error: {e}")
             
-            self.send_response(400)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
-            self.wfile.write(json.dumps({
+            send_json(self, 400, {
                 "ok": False,
                 "error": str(e)
-            }).encode())
+            })
             
         except Exception as e:
             print(f"[HERO_UPLOAD] ❌ Error: {e}")
             
-            self.send_response(500)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
-            self.wfile.write(json.dumps({
+            send_json(self, 500, {
                 "ok": False,
                 "error": str(e)
-            }).encode())
+            })
     
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['POST', 'OPTIONS'])
 
@@ -7,6 +7,8 @@ from lib._supabase import supabase_client
 from ._crud_helpers import (
     read_json_body,
     send_json,
+    send_cached_json,
+    invalidate_cache,
     now_timestamp,
     allow_cors,
 )
@@ -14,6 +16,8 @@ from ._crud_helpers import (
 
 TABLE_NAME = "kontak_items"
 ORDER_FIELD = "order_index"
+CACHE_KEY = "kontak_items"
+CACHE_HEADERS = {"Cache-Control": "public, max-age=300, s-maxage=600, stale-while-revalidate=1800"}
 
 
 def _public():
@@ -27,6 +31,8 @@ def _admin():
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         try:
+            if send_cached_json(self, CACHE_KEY, CACHE_HEADERS):
+                return
             result = (
                 _public()
                 .table(TABLE_NAME)
@@ -38,7 +44,8 @@ class handler(BaseHTTPRequestHandler):
                 self,
                 200,
                 {"ok": True, "data": result.data or []},
-                {"Cache-Control": "public, max-age=300, s-maxage=600, stale-while-revalidate=1800"},
+                CACHE_HEADERS,
+                cache_key=CACHE_KEY,
             )
         except Exception as exc:
             print(f"[KONTAK_ITEMS][GET] Error: {exc}")
@@ -87,6 +94,7 @@ class handler(BaseHTTPRequestHandler):
             }
             result = admin.table(TABLE_NAME).insert(insert_payload).execute()
             created = result.data[0] if result.data else insert_payload
+            invalidate_cache(CACHE_KEY)
 
             send_json(
                 self,
@@ -119,6 +127,7 @@ class handler(BaseHTTPRequestHandler):
                     )
                     if res.data:
                         updated.append(res.data[0])
+                invalidate_cache(CACHE_KEY)
 
                 send_json(
                     self,
@@ -167,6 +176,7 @@ class handler(BaseHTTPRequestHandler):
                 .execute()
             )
             updated = result.data[0] if result.data else None
+            invalidate_cache(CACHE_KEY)
 
             send_json(
                 self,
@@ -185,6 +195,7 @@ class handler(BaseHTTPRequestHandler):
                 raise ValueError("Parameter id wajib disertakan")
 
             _admin().table(TABLE_NAME).delete().eq("id", item_id).execute()
+            invalidate_cache(CACHE_KEY)
             send_json(
                 self,
                 200,
@@ -6,15 +6,14 @@ inside the single Python router function on Vercel.
 from http.server import BaseHTTPRequestHandler
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs
-import hashlib
 import json
-import time
-from typing import Optional
 
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, send_cached_json, send_json
 
 CACHE_TTL_SECONDS = 60
-_locale_cache = {}
+CACHE_KEY_PREFIX = "locales:"
+CACHE_HEADERS = {"Cache-Control": "public, max-age=0, s-maxage=60, stale-while-revalidate=300"}
 _BASE_LOCALES_DIR = Path(__file__).resolve().parents[2] / "public" / "locales"
 
 
@@ -82,22 +81,6 @@ def _rows_to_sections(locale: str, rows: list[dict], fallback_to_id: bool = True
     return result
 
 
-def _send_response(handler, status: int, body: Optional[str], etag: Optional[str]):
-    handler.send_response(status)
-    handler.send_header("Access-Control-Allow-Origin", "*")
-    handler.send_header(
-        "Cache-Control",
-        "public, max-age=0, s-maxage=60, stale-while-revalidate=300",
-    )
-    if etag:
-        handler.send_header("ETag", etag)
-    if status != 304:
-        handler.send_header("Content-Type", "application/json; charset=utf-8")
-    handler.end_headers()
-    if body and status != 304:
-        handler.wfile.write(body.encode("utf-8"))
-
-
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         try:
@@ -106,14 +89,8 @@ class handler(BaseHTTPRequestHandler):
             lang_param = (query.get("lang") or query.get("LANG") or [""])[0].lower()
             lang = lang_param if _is_supported_lang(lang_param) else "id"
 
-            now = time.time()
-            cached = _locale_cache.get(lang)
-
-            if cached and cached["expires"] > now:
-                if self.headers.get("If-None-Match") == cached["etag"]:
-                    _send_response(self, 304, None, cached["etag"])
-                    return
-                _send_response(self, 200, cached["body"], cached["etag"])
+            cache_key = CACHE_KEY_PREFIX + lang
+            if send_cached_json(self, cache_key, CACHE_HEADERS):
                 return
 
             supa = supabase_client(service_role=True)
@@ -127,29 +104,9 @@ class handler(BaseHTTPRequestHandler):
             base_locale = _load_base_locale(lang)
             sections_dict = _rows_to_sections(lang, result.data or [], True)
             merged = _deep_merge(base_locale, sections_dict)
-            body = json.dumps(merged, ensure_ascii=False, indent=2)
-            etag = hashlib.sha1(body.encode("utf-8")).hexdigest()
-
-            _locale_cache[lang] = {
-                "body": body,
-                "etag": etag,
-                "expires": now + CACHE_TTL_SECONDS,
-            }
-
-            if self.headers.get("If-None-Match") == etag:
-                _send_response(self, 304, None, etag)
-                return
-
-            _send_response(self, 200, body, etag)
+            send_json(self, 200, merged, CACHE_HEADERS, cache_key=cache_key, cache_ttl=CACHE_TTL_SECONDS)
         except Exception as exc:
-            error_body = json.dumps(
-                {"error": getattr(exc, "message", str(exc)) or "server error"}
-            )
-            _send_response(self, 500, error_body, None)
+            send_json(self, 500, {"error": getattr(exc, "message", str(exc)) or "server error"}, CACHE_HEADERS)
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['GET', 'OPTIONS'])
@@ -8,11 +8,16 @@ from lib._supabase import supabase_client
 from ._crud_helpers import (
     allow_cors,
     now_timestamp,
+    invalidate_cache,
     read_json_body,
+    send_cached_json,
     send_json,
 )
 
 TABLE_NAME = "maintenance_settings"
+CACHE_KEY = "maintenance_status"
+# Short TTL: when admin flips the switch, other warm instances follow quickly
+CACHE_TTL = 15
 
 
 def _public_client():
@@ -42,6 +47,8 @@ def _normalize_row(row):
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         try:
+            if send_cached_json(self, CACHE_KEY):
+                return
             result = (
                 _public_client()
                 .table(TABLE_NAME)
@@ -54,6 +61,8 @@ class handler(BaseHTTPRequestHandler):
                 self,
                 200,
                 {"ok": True, "data": _normalize_row(row)},
+                cache_key=CACHE_KEY,
+                cache_ttl=CACHE_TTL,
             )
         except Exception as exc:
             print(f"[MAINTENANCE][GET] Error: {exc}")
@@ -92,6 +101,7 @@ class handler(BaseHTTPRequestHandler):
             else:
                 result = admin.table(TABLE_NAME).insert(record).execute()
                 data = result.data[0] if result.data else record
+            invalidate_cache(CACHE_KEY)
 
             send_json(
                 self,
@@ -1,30 +1,27 @@
 from http.server import BaseHTTPRequestHandler
 import json
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import send_json, send_cached_json, invalidate_cache, allow_cors
+
+CACHE_KEY = "payment_settings"
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         """Fetch payment settings"""
         try:
+            if send_cached_json(self, CACHE_KEY):
+                return
+
             supa = supabase_client()
             # Fetch the single row (id=1)
             result = supa.table("payment_settings").select("*").eq("id", 1).single().execute()
             
             data = result.data if result.data else {}
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({"ok": True, "data": data}).encode())
+            send_json(self, 200, {"ok": True, "data": data}, cache_key=CACHE_KEY)
             
         except Exception as e:
             print(f"Error fetching payment settings: {e}")
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({"ok": False, "error": str(e)}).encode())
+            send_json(self, 500, {"ok": False, "error": str(e)})
 
     def do_POST(self):
         """Update payment settings"""
@@ -53,24 +50,13 @@ class handler(BaseHTTPRequestHandler):
             # Upsert row with id=1
             payload["id"] = 1
             result = supa.table("payment_settings").upsert(payload).execute()
+            invalidate_cache(CACHE_KEY)
             
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({"ok": True, "data": result.data}).encode())
+            send_json(self, 200, {"ok": True, "data": result.data})
             
         except Exception as e:
             print(f"Error updating payment settings: {e}")
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({"ok": False, "error": str(e)}).encode())
+            send_json(self, 500, {"ok": False, "error": str(e)})
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        allow_cors(self, ['GET', 'POST', 'OPTIONS'])
@@ -2,6 +2,17 @@ from http.server import BaseHTTPRequestHandler
 import json
 from urllib.parse import parse_qs, urlparse
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import dumps_json, response_cache, send_json, allow_cors
+from lib.handlers._search_helpers import apply_search, parse_search, ranked_search
+
+# q= matches these (trigram-indexed, see sql/search.sql); NISN/NIK go to equality
+SEARCH_TEXT_COLUMNS = ("nama_lengkap", "nisn", "nik")
+SEARCH_KEY_COLUMNS = {"nisn": "nisn", "nik": "nik"}
+
+# Page views within a few seconds share one summary; pembayaran writes
+# drop the "pembayaran_summary:" keys on their instance
+SUMMARY_CACHE_PREFIX = "pembayaran_summary:"
+SUMMARY_CACHE_TTL = 5
 
 def safe_float(value, default=0.0):
     """
@@ -15,6 +26,48 @@ def safe_float(value, default=0.0):
     except (TypeError, ValueError):
         return default
 
+def _summary_from_counts(supa, term):
+    """Fallback while public.pembayaran_summary() is not installed: five count queries."""
+    def base_count_query():
+        qb = supa.table("pembayaran").select("id", count="exact")
+        return apply_search(qb, term, SEARCH_TEXT_COLUMNS, SEARCH_KEY_COLUMNS)
+
+    total = base_count_query().limit(1).execute().count or 0  # type: ignore
+    pending = base_count_query().eq("status_pembayaran", "PENDING").limit(1).execute().count or 0  # type: ignore
+    pending_null = base_count_query().is_("status_pembayaran", None).limit(1).execute().count or 0  # type: ignore
+    verified = base_count_query().eq("status_pembayaran", "VERIFIED").limit(1).execute().count or 0  # type: ignore
+    rejected = base_count_query().eq("status_pembayaran", "REJECTED").limit(1).execute().count or 0  # type: ignore
+    return {
+        "pending": int(pending) + int(pending_null),
+        "verified": int(verified),
+        "rejected": int(rejected),
+        "total": int(total),
+    }
+
+
+def payment_summary(supa, term):
+    """
+    Status counts for the current q filter (null treated as PENDING), from
+    one grouped query; returns (stats, served_from_cache).
+    """
+    key = SUMMARY_CACHE_PREFIX + (f"{term.kind}:{term.value}" if term else "")
+    cached = response_cache.get(key)
+    if cached is not None:
+        return json.loads(cached.body), True
+
+    try:
+        stats = supa.rpc("pembayaran_summary", {"p_query": term.value if term else None}).execute().data
+        if not isinstance(stats, dict):
+            raise ValueError(f"Unexpected RPC result: {type(stats).__name__}")
+        stats = {name: int(stats.get(name) or 0) for name in ("pending", "verified", "rejected", "total")}
+    except Exception as rpc_error:
+        print(f"[PEMBAYARAN_LIST] ⚠️ RPC pembayaran_summary failed, counting per status: {rpc_error}")
+        stats = _summary_from_counts(supa, term)
+
+    response_cache.set(key, dumps_json(stats), SUMMARY_CACHE_TTL)
+    return stats, False
+
+
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         try:
@@ -22,6 +75,8 @@ class handler(BaseHTTPRequestHandler):
             params = parse_qs(parsed.query)
 
             q = (params.get("q", [""])[0] or "").strip()
+            term = parse_search(q)
+            search_mode = (params.get("mode", [""])[0] or "").strip().lower() == "search"
             has_pagination = "page" in params or "pageSize" in params
             page = int(params.get("page", ["1"])[0] or 1)
             page_size = int(params.get("pageSize", ["10"])[0] or 10)
@@ -31,10 +86,18 @@ class handler(BaseHTTPRequestHandler):
             # Get pembayaran from pembayaran table, ordered by newest first
             supa = supabase_client(service_role=True)
             query = supa.table('pembayaran').select("*").order('created_at', desc=True)
-            if q:
-                query = query.ilike("nama_lengkap", f"%{q}%")
+            query = apply_search(query, term, SEARCH_TEXT_COLUMNS, SEARCH_KEY_COLUMNS)
 
-            if has_pagination:
+            result = None
+            if search_mode and term is not None and term.kind == "text":
+                # Best matches first (similarity), limited to pageSize
+                try:
+                    result = ranked_search(supa, "search_pembayaran", term, page_size)
+                except Exception as search_error:
+                    print(f"[PEMBAYARAN_LIST] ⚠️ search_pembayaran failed, unranked fallback: {search_error}")
+                    result = query.limit(page_size).execute().data or []
+                has_pagination = False
+            elif has_pagination:
                 from_ = (page - 1) * page_size
                 to_ = from_ + page_size - 1
                 result = query.range(from_, to_).execute()
@@ -42,7 +105,7 @@ class handler(BaseHTTPRequestHandler):
                 result = query.execute()
 
             # Get data safely
-            raw_data = result.data if result else []
+            raw_data = result if isinstance(result, list) else (result.data if result else [])
             # Map fields for frontend compatibility dengan field yang konsisten
             result_data = []
             for item in raw_data:
@@ -69,46 +132,16 @@ class handler(BaseHTTPRequestHandler):
                     'created_at': item.get('created_at'),
                     'updated_at': item.get('updated_at')
                 }
+                if 'search_rank' in item:
+                    mapped['search_rank'] = item['search_rank']
                 result_data.append(mapped)
 
             total = None
             stats = None
+            stats_cached = False
             if has_pagination:
-                def base_count_query():
-                    qb = supa.table("pembayaran").select("id", count="exact")
-                    if q:
-                        qb = qb.ilike("nama_lengkap", f"%{q}%")
-                    return qb
-
-                # Total count for current filter
-                count_res = base_count_query().execute()  # type: ignore
-                total = count_res.count if hasattr(count_res, "count") else len(result_data)  # type: ignore
-
-                # Summary counts for current filter (null treated as PENDING)
-                pending_res = base_count_query().eq("status_pembayaran", "PENDING").execute()  # type: ignore
-                pending = pending_res.count if hasattr(pending_res, "count") else 0  # type: ignore
-                pending_null_res = base_count_query().is_("status_pembayaran", None).execute()  # type: ignore
-                pending_null = pending_null_res.count if hasattr(pending_null_res, "count") else 0  # type: ignore
-
-                verified_res = base_count_query().eq("status_pembayaran", "VERIFIED").execute()  # type: ignore
-                verified = verified_res.count if hasattr(verified_res, "count") else 0  # type: ignore
-
-                rejected_res = base_count_query().eq("status_pembayaran", "REJECTED").execute()  # type: ignore
-                rejected = rejected_res.count if hasattr(rejected_res, "count") else 0  # type: ignore
-
-                stats = {
-                    "pending": int(pending) + int(pending_null),
-                    "verified": int(verified),
-                    "rejected": int(rejected),
-                    "total": int(total) if total is not None else len(result_data),
-                }
-
-            # Send response
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Cache-Control', 'no-store')
-            self.end_headers()
+                stats, stats_cached = payment_summary(supa, term)
+                total = stats["total"]
 
             response_data = {
                 'success': True,
@@ -121,26 +154,34 @@ class handler(BaseHTTPRequestHandler):
                     "limit": page_size,
                     "total": total if total is not None else len(result_data),
                     "stats": stats,
+                    "stats_cached": stats_cached,
                 })
 
-            self.wfile.write(json.dumps(response_data).encode())
+            # Every write to pembayaran sets updated_at, so the page rows'
+            # (id, updated_at) plus the filter and counts identify this body
+            # without hashing it.
+            version = "|".join([
+                parsed.query,
+                str(total),
+                json.dumps(stats, sort_keys=True),
+                ",".join(f"{item.get('id')}:{item.get('updated_at')}" for item in raw_data),
+            ])
+            send_json(
+                self,
+                200,
+                response_data,
+                {"Cache-Control": "no-cache"},
+                etag_version=version,
+            )
             
         except Exception as e:
             print(f"Error in pembayaran_list: {str(e)}")
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            send_json(self, 500, {
                 'success': False,
                 'error': str(e),
                 'data': [],
                 'count': 0
-            }).encode())
+            })
     
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        allow_cors(self, ['GET', 'OPTIONS'])
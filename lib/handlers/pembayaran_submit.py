@@ -4,6 +4,7 @@ from lib._supabase import supabase_client
 import datetime
 import time
 import re
+from lib.handlers._crud_helpers import allow_cors, invalidate_cache, send_json
 
 def _safe_amount(value):
     """
@@ -54,12 +55,9 @@ class handler(BaseHTTPRequestHandler):
                     missing_fields.append(field)
             
             if missing_fields:
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+                send_json(self, 400, {
                     'error': f'Required fields missing: {", ".join(missing_fields)}'
-                }).encode())
+                })
                 return
             
             # Validasi format NISN (10 digit)
@@ -68,34 +66,25 @@ class handler(BaseHTTPRequestHandler):
             
             if not re.match(r'^\d{10}$', nisn):
                 print(f"[PEMBAYARAN_SUBMIT] Invalid NISN format: {nisn}")
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+                send_json(self, 400, {
                     'error': 'Format NISN tidak valid. Harus 10 digit angka'
-                }).encode())
+                })
                 return
             
             # Validasi nama lengkap
             nama_lengkap = data['nama_lengkap'].strip()
             if len(nama_lengkap) < 3:
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+                send_json(self, 400, {
                     'error': 'Nama lengkap minimal 3 karakter'
-                }).encode())
+                })
                 return
             
             # Validasi bukti pembayaran (harus URL)
             bukti_pembayaran = data['bukti_pembayaran'].strip()
             if not bukti_pembayaran.startswith(('http://', 'https://')):
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+                send_json(self, 400, {
                     'error': 'Bukti pembayaran harus berupa URL yang valid'
-                }).encode())
+                })
                 return
             
             # Get Supabase client with service role for admin operations
@@ -141,12 +130,9 @@ class handler(BaseHTTPRequestHandler):
             
             pendaftar_data = getattr(pendaftar, 'data', None)
             if not pendaftar_data:
-                self.send_response(404)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+                send_json(self, 404, {
                     'error': 'NISN tidak ditemukan di database pendaftar'
-                }).encode())
+                })
                 return
             
             # Check if payment already exists berdasarkan NISN
@@ -199,26 +185,16 @@ class handler(BaseHTTPRequestHandler):
                     'status': 'created'
                 }
             
+            invalidate_cache("pembayaran_summary:")
+
             # Send success response
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode())
+            send_json(self, 200, response_data)
             
         except Exception as e:
             print(f"Error in pembayaran_submit: {str(e)}")
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            send_json(self, 500, {
                 'error': str(e)
-            }).encode())
+            })
     
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        allow_cors(self, ['POST', 'OPTIONS'])
@@ -1,8 +1,9 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import re
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, invalidate_cache, send_json
 
 def _normalize_digits(value: str) -> str:
     """Hilangkan semua karakter non-digit."""
@@ -20,6 +21,235 @@ def _dedupe(values: List[str]) -> List[str]:
         result.append(value)
     return result
 
+MAX_BATCH_ITEMS = 500
+VALID_STATUSES = ("VERIFIED", "REJECTED")
+
+
+def _parse_batch_item(raw: Any) -> Dict[str, Any]:
+    """
+    Validate one {id | identifier/nisn/nik, status, catatan} batch entry.
+    The result carries "error" instead of raising, so one bad row does not
+    fail the batch.
+    """
+    if not isinstance(raw, dict):
+        return {"error": "Item harus berupa object"}
+
+    item: Dict[str, Any] = {}
+    payment_id = raw.get("id")
+    if payment_id not in (None, ""):
+        try:
+            item["id"] = int(payment_id)
+        except (TypeError, ValueError):
+            return {"error": "id tidak valid"}
+    else:
+        raw_identifier = str(raw.get("nisn") or raw.get("identifier") or raw.get("nik") or "").strip()
+        identifier = _normalize_digits(raw_identifier)
+        if len(identifier) not in (10, 16):
+            return {
+                "identifier": raw_identifier or None,
+                "error": "Identifier tidak valid. Gunakan NISN (10 digit) atau NIK (16 digit)",
+            }
+        item["identifier"] = identifier
+
+    status = str(raw.get("status") or "").upper()
+    if status not in VALID_STATUSES:
+        item["error"] = f"Invalid status. Must be one of: {', '.join(VALID_STATUSES)}"
+        return item
+    item["status"] = status
+    item["catatan"] = str(raw.get("catatan") or raw.get("catatan_admin") or "")
+    return item
+
+
+def _resolve_payments(supa, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    One query for every id / NISN / NIK in the batch. Returns the latest
+    payment per "id:<id>", "nisn:<nisn>" and "nik:<nik>" key.
+    """
+    ids = sorted({item["id"] for item in items if "id" in item})
+    nisns = sorted({item["identifier"] for item in items if len(item.get("identifier", "")) == 10})
+    niks = sorted({item["identifier"] for item in items if len(item.get("identifier", "")) == 16})
+
+    filters = []
+    if ids:
+        filters.append(f"id.in.({','.join(str(i) for i in ids)})")
+    if nisns:
+        filters.append(f"nisn.in.({','.join(nisns)})")
+    if niks:
+        filters.append(f"nik.in.({','.join(niks)})")
+    if not filters:
+        return {}
+
+    rows = (
+        supa.table("pembayaran")
+        .select("id, nisn, nik, status_pembayaran")
+        .or_(",".join(filters))
+        .order("updated_at", desc=True)
+        .order("id", desc=True)
+        .execute()
+        .data
+        or []
+    )
+    resolved: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        # Newest first: keep the first payment seen for each key
+        for key in (f"id:{row.get('id')}", f"nisn:{row.get('nisn')}", f"nik:{row.get('nik')}"):
+            resolved.setdefault(key, row)
+    return resolved
+
+
+def _apply_batch(supa, updates: List[Dict[str, Any]], verified_by: str) -> Dict[str, Any]:
+    """
+    Write all decisions: one RPC (sql/pembayaran_verify_batch.sql), or while
+    it is not installed one update per (status, catatan) group.
+    Returns {"updated": [ids], "pendaftar_updated": [nisn]}.
+    """
+    try:
+        result = supa.rpc("pembayaran_verify_batch", {
+            "p_items": [
+                {"id": update["payment_id"], "status": update["status"], "catatan": update["catatan"]}
+                for update in updates
+            ],
+            "p_verified_by": verified_by,
+        }).execute().data
+        if not isinstance(result, dict):
+            raise ValueError(f"Unexpected RPC result: {type(result).__name__}")
+        return {
+            "updated": [int(i) for i in result.get("updated") or []],
+            "pendaftar_updated": list(result.get("pendaftar_updated") or []),
+        }
+    except Exception as rpc_error:
+        print(f"[PEMBAYARAN_VERIFY] ⚠️ RPC pembayaran_verify_batch failed, grouped updates: {rpc_error}")
+
+    groups: Dict[tuple, List[int]] = {}
+    for update in updates:
+        groups.setdefault((update["status"], update["catatan"]), []).append(update["payment_id"])
+
+    updated: List[int] = []
+    for (status, catatan), ids in groups.items():
+        try:
+            res = (
+                supa.table("pembayaran")
+                .update({
+                    "status_pembayaran": status,
+                    "verified_by": verified_by,
+                    "catatan_admin": catatan,
+                    "tanggal_verifikasi": "now()",
+                    "updated_at": "now()",
+                })
+                .in_("id", ids)
+                .execute()
+            )
+            updated.extend(int(row["id"]) for row in res.data or [] if row.get("id") is not None)
+        except Exception as update_error:
+            print(f"[PEMBAYARAN_VERIFY] Warning: gagal update batch status={status} ({len(ids)} id): {update_error}")
+
+    updated_ids = set(updated)
+    verified_nisns = sorted({
+        update["nisn"] for update in updates
+        if update["status"] == "VERIFIED" and update["payment_id"] in updated_ids and update.get("nisn")
+    })
+    pendaftar_updated: List[str] = []
+    if verified_nisns:
+        try:
+            res = (
+                supa.table("pendaftar")
+                .update({
+                    "statusberkas": "DITERIMA",
+                    "verifiedby": verified_by,
+                    "verifiedat": "now()",
+                    "updatedat": "now()",
+                })
+                .in_("nisn", verified_nisns)
+                .execute()
+            )
+            pendaftar_updated = [row.get("nisn") for row in res.data or []]
+        except Exception as update_err:
+            print(f"Warning: Gagal update status pendaftar (batch): {update_err}")
+    return {"updated": updated, "pendaftar_updated": pendaftar_updated}
+
+
+def _verify_batch(request_handler, data: Dict[str, Any]):
+    """
+    POST {"items": [{"identifier" | "nisn" | "nik" | "id", "status", "catatan"}, ...],
+          "verified_by": "..."}
+    → 200 {"results": [...], "updated": n, "failed": n, "pendaftar_updated": n},
+    one result per item in request order.
+    """
+    raw_items = data["items"]
+    if not raw_items:
+        send_json(request_handler, 400, {"error": "items tidak boleh kosong"})
+        return
+    if len(raw_items) > MAX_BATCH_ITEMS:
+        send_json(request_handler, 400, {"error": f"Maksimal {MAX_BATCH_ITEMS} item per batch"})
+        return
+
+    verified_by = str(data.get("verified_by") or data.get("verifiedBy") or "admin")
+    items = [_parse_batch_item(raw) for raw in raw_items]
+    supa = supabase_client(service_role=True)
+    resolved = _resolve_payments(supa, [item for item in items if "error" not in item])
+
+    updates: List[Dict[str, Any]] = []
+    claimed: Dict[Any, int] = {}
+    for index, item in enumerate(items):
+        if "error" in item:
+            continue
+        if "id" in item:
+            row = resolved.get(f"id:{item['id']}")
+        else:
+            kind = "nisn" if len(item["identifier"]) == 10 else "nik"
+            row = resolved.get(f"{kind}:{item['identifier']}")
+        if not row:
+            item["error"] = "Pembayaran dengan NISN/NIK tersebut tidak ditemukan"
+            continue
+        if row["id"] in claimed:
+            item["error"] = f"Pembayaran yang sama sudah ada di item {claimed[row['id']]}"
+            continue
+        claimed[row["id"]] = index
+        item["payment_id"] = row["id"]
+        updates.append({
+            "payment_id": row["id"],
+            "nisn": row.get("nisn"),
+            "status": item["status"],
+            "catatan": item["catatan"],
+        })
+
+    applied = _apply_batch(supa, updates, verified_by) if updates else {"updated": [], "pendaftar_updated": []}
+    updated_ids = set(applied["updated"])
+    accepted = set(applied["pendaftar_updated"])
+    nisn_by_payment = {update["payment_id"]: update["nisn"] for update in updates}
+
+    results = []
+    for index, item in enumerate(items):
+        result = {
+            "index": index,
+            "identifier": item.get("identifier"),
+            "id": item.get("payment_id", item.get("id")),
+            "status": item.get("status"),
+        }
+        if "error" not in item and item["payment_id"] not in updated_ids:
+            item["error"] = "Gagal memperbarui data pembayaran"
+        if "error" in item:
+            result.update({"ok": False, "error": item["error"]})
+        else:
+            result.update({
+                "ok": True,
+                "pendaftar_updated": nisn_by_payment.get(item["payment_id"]) in accepted,
+            })
+        results.append(result)
+
+    if updated_ids:
+        invalidate_cache("pembayaran_summary:")
+
+    ok_count = sum(1 for result in results if result["ok"])
+    send_json(request_handler, 200, {
+        "message": f"{ok_count} dari {len(results)} pembayaran berhasil diperbarui",
+        "results": results,
+        "updated": ok_count,
+        "failed": len(results) - ok_count,
+        "pendaftar_updated": len(accepted),
+    })
+
+
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         try:
@@ -28,6 +258,11 @@ class handler(BaseHTTPRequestHandler):
             post_data = self.rfile.read(content_length)
             data = json.loads(post_data.decode("utf-8"))
 
+            # Batch mode: {"items": [...]} resolves and updates every payment at once
+            if isinstance(data.get("items"), list):
+                _verify_batch(self, data)
+                return
+
             raw_identifier = str(
                 data.get("nisn")
                 or data.get("identifier")
@@ -36,11 +271,7 @@ class handler(BaseHTTPRequestHandler):
             ).strip()
 
             if not raw_identifier:
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "Identifier (NISN / NIK) wajib diisi"}).encode())
+                send_json(self, 400, {"error": "Identifier (NISN / NIK) wajib diisi"})
                 return
 
             normalized_identifier = _normalize_digits(raw_identifier)
@@ -49,33 +280,20 @@ class handler(BaseHTTPRequestHandler):
             )
 
             if not normalized_identifier or len(normalized_identifier) not in (10, 16):
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(json.dumps({
+                send_json(self, 400, {
                     "error": "Identifier tidak valid. Gunakan NISN (10 digit) atau NIK (16 digit)"
-                }).encode())
+                })
                 return
 
             if "status" not in data or not data["status"]:
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "status is required"}).encode())
+                send_json(self, 400, {"error": "status is required"})
                 return
 
-            valid_statuses = ["VERIFIED", "REJECTED"]
             status = str(data["status"]).upper()
-            if status not in valid_statuses:
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(json.dumps({
-                    "error": f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
-                }).encode())
+            if status not in VALID_STATUSES:
+                send_json(self, 400, {
+                    "error": f"Invalid status. Must be one of: {', '.join(VALID_STATUSES)}"
+                })
                 return
 
             supa = supabase_client(service_role=True)
@@ -112,20 +330,12 @@ class handler(BaseHTTPRequestHandler):
                     break
 
             if not payment_row:
-                self.send_response(404)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "Pembayaran dengan NISN/NIK tersebut tidak ditemukan"}).encode())
+                send_json(self, 404, {"error": "Pembayaran dengan NISN/NIK tersebut tidak ditemukan"})
                 return
 
             payment_id = payment_row.get("id")
             if not payment_id:
-                self.send_response(500)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "Data pembayaran tidak lengkap (ID kosong)"}).encode())
+                send_json(self, 500, {"error": "Data pembayaran tidak lengkap (ID kosong)"})
                 return
 
             verified_by = data.get("verified_by", data.get("verifiedBy", "admin"))
@@ -142,11 +352,7 @@ class handler(BaseHTTPRequestHandler):
             )
 
             if not update_result.data:
-                self.send_response(500)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "Gagal memperbarui data pembayaran"}).encode())
+                send_json(self, 500, {"error": "Gagal memperbarui data pembayaran"})
                 return
 
             pendaftar_updated = False
@@ -204,28 +410,18 @@ class handler(BaseHTTPRequestHandler):
                 except Exception as update_err:
                     print(f"Warning: Gagal update status pendaftar: {update_err}")
 
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            invalidate_cache("pembayaran_summary:")
+
+            send_json(self, 200, {
                 "message": f"Pembayaran berhasil di{status.lower()}",
                 "identifier": matched_identifier or normalized_identifier,
                 "status": status,
                 "pendaftar_updated": pendaftar_updated,
-            }).encode())
+            })
 
         except Exception as e:
             print(f"Error in pembayaran_verify: {str(e)}")
-            self.send_response(500)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": str(e)}).encode())
+            send_json(self, 500, {"error": str(e)})
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['POST', 'OPTIONS'])
@@ -1,9 +1,18 @@
 from http.server import BaseHTTPRequestHandler
-import json
 import traceback
 from urllib.parse import parse_qs, urlparse
 from lib._supabase import supabase_client
-from typing import Any, Dict
+from lib.handlers._crud_helpers import allow_cors, send_json
+
+# Only what the public status page shows (no NIK in the applicant part)
+STATUS_COLUMNS = (
+    "id, nisn, namalengkap, tanggallahir, tempatlahir, statusberkas, alasan, "
+    "verifiedby, verifiedat, createdat, updatedat, telepon_orang_tua"
+)
+PAYMENT_COLUMNS = (
+    "nisn, nik, nama_lengkap, metode_pembayaran, jumlah, bukti_pembayaran, status_pembayaran, "
+    "verified_by, catatan_admin, tanggal_verifikasi, created_at, updated_at"
+)
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -11,17 +20,6 @@ class handler(BaseHTTPRequestHandler):
         GET /api/pendaftar_cek_status?nisn=1234567890
         Response: { ok: true, data: {...} | null }
         """
-        def send_json(code: int, payload: Dict[str, Any]) -> None:
-            """Send JSON response"""
-            try:
-                self.send_response(code)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(json.dumps(payload, default=str).encode())
-            except Exception as e:
-                print(f"Error sending JSON: {e}")
-        
         try:
             print(f"[CEK_STATUS] Request path: {self.path}")
             
@@ -40,7 +38,7 @@ class handler(BaseHTTPRequestHandler):
             # Validasi: identifier wajib diisi
             if not raw_nisn:
                 print("[CEK_STATUS] Error: NISN kosong")
-                return send_json(400, {
+                return send_json(self, 400, {
                     "ok": False,
                     "error": "NISN harus diisi"
                 })
@@ -48,7 +46,7 @@ class handler(BaseHTTPRequestHandler):
             # Validasi: identifier harus 10 digit (NISN) atau 16 digit (NIK)
             if len(normalized_nisn) not in (10, 16):
                 print(f"[CEK_STATUS] Error: Identifier invalid format - {raw_nisn}")
-                return send_json(400, {
+                return send_json(self, 400, {
                     "ok": False,
                     "error": "Format identifier tidak valid (masukkan NISN 10 digit atau NIK 16 digit)"
                 })
@@ -61,106 +59,83 @@ class handler(BaseHTTPRequestHandler):
                 print("[CEK_STATUS] Supabase client created")
             except Exception as e:
                 print(f"[CEK_STATUS] Error creating Supabase client: {e}")
-                return send_json(500, {
+                return send_json(self, 500, {
                     "ok": False,
                     "error": "Database connection error",
                     "detail": str(e)
                 })
 
-            identifiers = []
-            if normalized_nisn:
-                identifiers.append(normalized_nisn)
-            if raw_nisn and raw_nisn != normalized_nisn:
-                identifiers.append(raw_nisn)
-            identifiers = list(dict.fromkeys([candidate for candidate in identifiers if candidate]))
-
-            row = None
-            selected_identifier = None
-            search_fields = ("nisn", "nik", "nikcalon")
-            print(f"[CEK_STATUS] Searching pendaftar using identifiers={identifiers}")
-            for field in search_fields:
-                for candidate in identifiers:
+            # NISN and NIK differ in length (CHECK constraints), so the
+            # identifier picks its column; the latest payment rides along as
+            # an embed over fk_pembayaran_nisn. One round trip, hit or miss.
+            field = "nisn" if len(normalized_nisn) == 10 else "nikcalon"
+            print(f"[CEK_STATUS] Looking up pendaftar.{field}={normalized_nisn}")
+            try:
+                result = (
+                    supa.table("pendaftar")
+                    .select(f"{STATUS_COLUMNS}, pembayaran({PAYMENT_COLUMNS})")
+                    .eq(field, normalized_nisn)
+                    .order("updatedat", desc=True)
+                    .order("updated_at", desc=True, foreign_table="pembayaran")
+                    .limit(1)
+                    .limit(1, foreign_table="pembayaran")
+                    .execute()
+                )
+                row = result.data[0] if result.data else None
+                payments = (row or {}).pop("pembayaran", None) or []
+            except Exception as e:
+                # e.g. the relationship is not exposed: fall back to two queries
+                print(f"[CEK_STATUS] Combined lookup failed, querying separately: {e}")
+                result = (
+                    supa.table("pendaftar").select(STATUS_COLUMNS)
+                    .eq(field, normalized_nisn).order("updatedat", desc=True).limit(1).execute()
+                )
+                row = result.data[0] if result.data else None
+                payments = []
+                if row is not None and row.get("nisn"):
                     try:
-                        result = supa.table("pendaftar").select("*").eq(field, candidate).order("updatedat", desc=True).limit(1).execute()
-                    except Exception as e:
-                        print(f"[CEK_STATUS] Error querying pendaftar field={field} candidate={candidate}: {e}")
-                        traceback.print_exc()
-                        continue
-
-                    if result.data:
-                        row = result.data[0]
-                        selected_identifier = candidate
-                        print(f"[CEK_STATUS] Match found using field={field}, candidate={candidate}")
-                        break
-                if row is not None:
-                    break
+                        payments = (
+                            supa.table("pembayaran").select(PAYMENT_COLUMNS)
+                            .eq("nisn", row["nisn"]).order("updated_at", desc=True).limit(1).execute()
+                        ).data or []
+                    except Exception as payment_error:
+                        print(f"[CEK_STATUS] Warning: Error querying pembayaran: {payment_error}")
+                        # Continue even if pembayaran query fails
 
             if row is None:
                 print("[CEK_STATUS] NISN tidak ditemukan")
-                return send_json(200, {
+                return send_json(self, 200, {
                     "ok": True,
                     "data": None
                 })
 
             print(f"[CEK_STATUS] Found data for: {row.get('namalengkap')}")
-            print(f"[CEK_STATUS] Catatan Admin (alasan): {row.get('alasan')}")
 
-            # Query data pembayaran juga
             pembayaran_data = None
-            try:
-                payment_identifiers = identifiers.copy()
-                for field in search_fields:
-                    value = row.get(field)
-                    if value:
-                        payment_identifiers.append(str(value).strip())
-                payment_identifiers = list(dict.fromkeys([val for val in payment_identifiers if val]))
-
-                print(f"[CEK_STATUS] Searching pembayaran using identifiers={payment_identifiers}")
-                pembayaran_row = None
-                for field in ("nisn", "nik"):
-                    for candidate in payment_identifiers:
-                        try:
-                            pembayaran_result = supa.table("pembayaran").select("*").eq(field, candidate).order("updated_at", desc=True).limit(1).execute()
-                        except Exception as e:
-                            print(f"[CEK_STATUS] Error querying pembayaran field={field} candidate={candidate}: {e}")
-                            traceback.print_exc()
-                            continue
-
-                        if pembayaran_result.data:
-                            pembayaran_row = pembayaran_result.data[0]
-                            print(f"[CEK_STATUS] Pembayaran match using field={field}, candidate={candidate}")
-                            break
-                    if pembayaran_row is not None:
-                        break
-
-                if pembayaran_row:
-                    pembayaran_data = {
-                        "nisn": pembayaran_row.get("nisn", ""),
-                        "nik": pembayaran_row.get("nik", ""),
-                        "nama": pembayaran_row.get("nama") or pembayaran_row.get("nama_lengkap", ""),
-                        "metode_pembayaran": pembayaran_row.get("metode_pembayaran", ""),
-                        "jumlah": pembayaran_row.get("jumlah", 0),
-                        "bukti_bayar_url": pembayaran_row.get("bukti_bayar_url") or pembayaran_row.get("bukti_pembayaran", ""),
-                        "status_pembayaran": pembayaran_row.get("status_pembayaran", "PENDING"),
-                        "verified_by": pembayaran_row.get("verified_by", ""),
-                        "catatan_admin": pembayaran_row.get("catatan_admin", ""),
-                        "tanggal_verifikasi": pembayaran_row.get("tanggal_verifikasi"),
-                        "created_at": pembayaran_row.get("created_at"),
-                        "updated_at": pembayaran_row.get("updated_at")
-                    }
-                    print(f"[CEK_STATUS] Pembayaran found: status={pembayaran_data['status_pembayaran']}")
-                else:
-                    print("[CEK_STATUS] Pembayaran belum ada untuk NISN ini")
-            except Exception as e:
-                print(f"[CEK_STATUS] Warning: Error querying pembayaran: {e}")
-                # Continue even if pembayaran query fails
+            pembayaran_row = payments[0] if payments else None
+            if pembayaran_row:
+                pembayaran_data = {
+                    "nisn": pembayaran_row.get("nisn", ""),
+                    "nik": pembayaran_row.get("nik", ""),
+                    "nama": pembayaran_row.get("nama_lengkap", ""),
+                    "metode_pembayaran": pembayaran_row.get("metode_pembayaran", ""),
+                    "jumlah": pembayaran_row.get("jumlah", 0),
+                    "bukti_bayar_url": pembayaran_row.get("bukti_pembayaran", ""),
+                    "status_pembayaran": pembayaran_row.get("status_pembayaran", "PENDING"),
+                    "verified_by": pembayaran_row.get("verified_by", ""),
+                    "catatan_admin": pembayaran_row.get("catatan_admin", ""),
+                    "tanggal_verifikasi": pembayaran_row.get("tanggal_verifikasi"),
+                    "created_at": pembayaran_row.get("created_at"),
+                    "updated_at": pembayaran_row.get("updated_at")
+                }
+                print(f"[CEK_STATUS] Pembayaran found: status={pembayaran_data['status_pembayaran']}")
+            else:
+                print("[CEK_STATUS] Pembayaran belum ada untuk NISN ini")
 
             # Transform sesuai spec
             data = {
                 "id": row.get("id"),
-                "nisn": row.get("nisn", "") or selected_identifier or normalized_nisn,
-                "nik": row.get("nik"),
-                "nikcalon": row.get("nikcalon"),
+                "nisn": row.get("nisn", "") or normalized_nisn,
                 "nama": row.get("namalengkap", ""),
                 "tanggalLahir": row.get("tanggallahir"),
                 "tempatLahir": row.get("tempatlahir"),
@@ -171,28 +146,18 @@ class handler(BaseHTTPRequestHandler):
                 "created_at": row.get("createdat"),
                 "createdat": row.get("createdat"),  # Add both formats for compatibility
                 "updated_at": row.get("updatedat"),
-                "telepon_orang_tua": (
-                    row.get("telepon_orang_tua")
-                    or row.get("teleponorangtua")
-                    or row.get("nomorhportu")
-                    or ""
-                ),
-                "telepon": (
-                    row.get("telepon_orang_tua")
-                    or row.get("teleponorangtua")
-                    or row.get("nomorhportu")
-                    or ""
-                ),
+                "telepon_orang_tua": row.get("telepon_orang_tua") or "",
+                "telepon": row.get("telepon_orang_tua") or "",
                 "pembayaran": pembayaran_data  # Tambahkan data pembayaran
             }
 
             print("[CEK_STATUS] Sending success response")
-            return send_json(200, {"ok": True, "data": data})
+            return send_json(self, 200, {"ok": True, "data": data})
 
         except Exception as e:
             print(f"[CEK_STATUS] Unexpected error: {str(e)}")
             traceback.print_exc()
-            return send_json(500, {
+            return send_json(self, 500, {
                 "ok": False,
                 "error": "Internal server error",
                 "detail": str(e)
@@ -200,8 +165,4 @@ class handler(BaseHTTPRequestHandler):
 
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['GET', 'OPTIONS'])
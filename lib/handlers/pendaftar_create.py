@@ -3,8 +3,9 @@ import json
 import re
 import os
 from typing import Any, Dict, Tuple, List
-import requests
+from lib._http import http_request
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, send_json
 
 
 def _pick_client_ip(headers) -> str:
@@ -61,6 +62,8 @@ def verify_turnstile(token: str, remote_ip: str = "") -> Tuple[bool, str, List[s
     if not token:
         return False, "Token CAPTCHA tidak ditemukan", ["missing-input-response"]
 
+    import requests
+
     try:
         payload = {"secret": secret_key, "response": token}
         if remote_ip:
@@ -71,7 +74,7 @@ def verify_turnstile(token: str, remote_ip: str = "") -> Tuple[bool, str, List[s
         last_exc: Exception | None = None
         for attempt, timeout_s in enumerate((10, 15), start=1):
             try:
-                resp = requests.post(url, data=payload, timeout=timeout_s)
+                resp = http_request("POST", url, data=payload, timeout=timeout_s)
                 # Retry on transient upstream errors
                 if resp.status_code in (429,) or resp.status_code >= 500:
                     resp.raise_for_status()
@@ -138,14 +141,10 @@ class handler(BaseHTTPRequestHandler):
             
             missing_fields = [field for field in required_fields if not data.get(field)]
             if missing_fields:
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+                send_json(self, 400, {
                     "ok": False,
                     "error": f"Missing required fields: {', '.join(missing_fields)}"
-                }).encode())
+                })
                 return
             
             # Validasi format data
@@ -191,15 +190,11 @@ class handler(BaseHTTPRequestHandler):
             
             # Jika ada error validasi, kirim response error
             if errors:
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+                send_json(self, 400, {
                     "ok": False,
                     "error": "Validasi gagal",
                     "details": errors
-                }).encode())
+                })
                 return
             
             # Prepare payload with all required fields (use lowercase for PostgreSQL)
@@ -276,11 +271,7 @@ class handler(BaseHTTPRequestHandler):
             
             print(f"[PENDAFTAR_CREATE] Sending response: {response_payload}")
             
-            self.send_response(201)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response_payload).encode())
+            send_json(self, 201, response_payload)
             
         except Exception as e:
             print(f"[PENDAFTAR_CREATE] ❌ EXCEPTION: {str(e)}")
@@ -307,19 +298,11 @@ class handler(BaseHTTPRequestHandler):
                     status_code = 409  # Conflict
                     error_message = "Data yang Anda masukkan sudah terdaftar. Silakan periksa kembali atau hubungi admin."
 
-            self.send_response(status_code)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            send_json(self, status_code, {
                 "ok": False,
                 "error": error_message
-            }).encode())
+            })
     
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        allow_cors(self, ['POST', 'OPTIONS'])
@@ -1,20 +1,27 @@
 from http.server import BaseHTTPRequestHandler
-import json
 from urllib.parse import parse_qs, urlparse
-from io import BytesIO
+import os
+import tempfile
 import zipfile
 import re
-from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator
 import time
+from lib import _export_cache as export_cache
+from lib._fetch_all import fetch_all
+from lib._pipeline import pipelined
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, send_json
 
 
 # Configuration
-# Configuration
-MAX_PENDAFTAR_PER_REQUEST = 1000  # Increased to handle up to 1000 pendaftar
+MAX_PENDAFTAR_PER_REQUEST = 5000  # Read past the 1000-row cap via fetch_all; the timeout guard still applies
 MAX_CONCURRENT_DOWNLOADS = 20     # More parallel download workers for speed
+MAX_CONCURRENT_LISTINGS = 8       # Storage list() calls in flight ahead of the downloads
+ZIP_QUEUE_DEPTH = MAX_CONCURRENT_DOWNLOADS * 2  # Files downloading or waiting for the ZIP writer
 DOWNLOAD_TIMEOUT_SECONDS = 58     # Maximize timeout within Vercel's 60s limit
+ZIP_CACHE_VERSION = 2             # Bump when the ZIP layout changes
 
 
 def slugify(text):
@@ -67,6 +74,25 @@ def download_single_file(supa, file_info):
         return {'success': False, 'path': file_path, 'error': str(e)[:100]}
 
 
+def list_pendaftar_files(supa, nisn):
+    """List one applicant's folder in pendaftar-files - used by thread pool"""
+    try:
+        storage_result = supa.storage.from_("pendaftar-files").list(path=nisn)
+
+        # Handle different response formats
+        if isinstance(storage_result, list):
+            storage_files = storage_result
+        elif hasattr(storage_result, 'data'):
+            storage_files = storage_result.data or []
+        elif isinstance(storage_result, dict) and 'data' in storage_result:
+            storage_files = storage_result['data'] or []
+        else:
+            storage_files = []
+        return {'success': True, 'files': storage_files}
+    except Exception as e:
+        return {'success': False, 'error': str(e)[:100]}
+
+
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         """
@@ -75,8 +101,10 @@ class handler(BaseHTTPRequestHandler):
         Response: JSON with signed download URL (expires in 1 hour)
         
         OPTIMIZATIONS:
-        - Concurrent file downloads (10 workers)
-        - Limited pendaftar per request (max 50)
+        - Folder listing, downloads and ZIP writing run as one pipeline
+          (MAX_CONCURRENT_LISTINGS / MAX_CONCURRENT_DOWNLOADS workers)
+        - At most ZIP_QUEUE_DEPTH files in memory; the ZIP is spooled to a
+          temp file and uploaded from disk
         - Early timeout detection
         - Progress tracking
         """
@@ -104,45 +132,75 @@ class handler(BaseHTTPRequestHandler):
             supa = supabase_client(service_role=True)
             print("[ZIP_DOWNLOAD] ✓ Supabase client initialized")
 
-            # Build query for pendaftar
-            query = supa.table("pendaftar").select("*")
-            
-            # Apply filters
-            if status_filter in ["pending", "verified", "rejected", "diterima", "revisi", "ditolak"]:
-                query = query.eq("statusberkas", status_filter.upper())
-            
-            if date_from:
-                query = query.gte("created_at", date_from)
-            
-            if date_to:
-                query = query.lte("created_at", date_to)
-            
-            # Apply limit
-            query = query.limit(limit)
-            
-            # Execute query
+            # Build filters for pendaftar
+            def apply_filters(query):
+                if status_filter in ["pending", "verified", "rejected", "diterima", "revisi", "ditolak"]:
+                    query = query.eq("statusberkas", status_filter.upper())
+                
+                if date_from:
+                    query = query.gte("created_at", date_from)
+                
+                if date_to:
+                    query = query.lte("created_at", date_to)
+                return query
+
+            # Same filters over unchanged pendaftar rows → same ZIP (file
+            # uploads go through pendaftar_update_files, which moves updatedat)
+            cache_key = None
+            cached = None
+            if export_cache.EXPORT_CACHE_ENABLED:
+                try:
+                    cache_key, _ = export_cache.fingerprint(supa, "pendaftar_zip", {
+                        "only": only_type,
+                        "status": status_filter,
+                        "date_from": date_from,
+                        "date_to": date_to,
+                        "limit": limit,
+                        "version": ZIP_CACHE_VERSION,
+                    }, apply=apply_filters)
+                    cached = export_cache.lookup(supa, cache_key, "zip")
+                except Exception as cache_error:
+                    print(f"[ZIP_DOWNLOAD] ⚠️ Export cache unavailable: {cache_error}")
+            if cached is not None:
+                meta = cached.meta
+                total_time = time.time() - start_time
+                print(f"[ZIP_DOWNLOAD] ✓ Served from export cache in {total_time:.1f}s")
+                send_json(self, 200, {
+                    "ok": True,
+                    "download_url": cached.url,
+                    "filename": meta.get("filename"),
+                    "size_bytes": meta.get("size_bytes"),
+                    "size_mb": round((meta.get("size_bytes") or 0) / 1024 / 1024, 2),
+                    "total_files": meta.get("total_files"),
+                    "success_count": meta.get("success_count"),
+                    "failed_count": 0,
+                    "processing_time_seconds": round(total_time, 1),
+                    "pendaftar_processed": meta.get("pendaftar_processed"),
+                    "expires_in": "1 hour",
+                    "cache": "hit",
+                    "message": f"ZIP berhasil dibuat! {meta.get('success_count')} file dari {meta.get('total_files')}"
+                })
+                return
+
+            # Execute query (paged past the 1000-row cap, up to limit)
             print(f"[ZIP_DOWNLOAD] Querying pendaftar table (limit: {limit})...")
             try:
-                pendaftar_result = query.order("namalengkap").execute()
+                pendaftar_rows = fetch_all(
+                    supa, "pendaftar", "id, nisn, namalengkap", apply=apply_filters,
+                    order=(("namalengkap", False), ("id", False)), limit=limit,
+                )
+                pendaftar_list = list(pendaftar_rows)
             except Exception as e:
                 print(f"[ZIP_DOWNLOAD] ❌ Error querying database: {e}")
                 raise Exception(f"Database query failed: {str(e)}")
 
-            pendaftar_count = len(pendaftar_result.data) if pendaftar_result.data else 0
-            print(f"[ZIP_DOWNLOAD] ✓ Query successful, found {pendaftar_count} pendaftar")
+            pendaftar_count = len(pendaftar_list)
+            print(f"[ZIP_DOWNLOAD] ✓ Query successful, found {pendaftar_count} pendaftar (of {pendaftar_rows.total})")
 
-            if not pendaftar_result.data:
+            if not pendaftar_list:
                 print("[ZIP_DOWNLOAD] ⚠️ No pendaftar found with current filters")
-                self.send_response(404)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({"ok": False, "error": "Tidak ada pendaftar ditemukan"}).encode()
-                )
+                send_json(self, 404, {"ok": False, "error": "Tidak ada pendaftar ditemukan"})
                 return
-
-            pendaftar_list = pendaftar_result.data
             
             # Image extensions for filtering
             image_extensions = [".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp"]
@@ -151,41 +209,41 @@ class handler(BaseHTTPRequestHandler):
             # Determine which extensions to include
             target_extensions = image_extensions if only_type == "images" else all_extensions
 
-            # PHASE 1: Collect all files to download
-            print("[ZIP_DOWNLOAD] PHASE 1: Collecting files to download...")
-            files_to_download = []
+            # PIPELINE: list folders → download files → write ZIP, overlapped.
+            # The writer (this thread) drains downloads in order straight into
+            # a ZIP spooled to disk, so memory holds at most ZIP_QUEUE_DEPTH
+            # files instead of the whole archive (twice).
+            print(f"[ZIP_DOWNLOAD] PIPELINE: {MAX_CONCURRENT_LISTINGS} listing / {MAX_CONCURRENT_DOWNLOADS} download workers, queue depth {ZIP_QUEUE_DEPTH}...")
             skipped_pendaftar = []
-            
-            for idx, pendaftar in enumerate(pendaftar_list, 1):
-                # Check timeout
-                elapsed = time.time() - start_time
-                if elapsed > DOWNLOAD_TIMEOUT_SECONDS * 0.3:  # 30% of timeout for collection
-                    print(f"[ZIP_DOWNLOAD] ⚠️ Collection phase taking too long, stopping early")
-                    break
-                
-                nisn = pendaftar.get("nisn", "")
-                nama = pendaftar.get("namalengkap", "Unknown")
-                slug_name = slugify(nama)
-                
-                if not nisn:
-                    skipped_pendaftar.append(f"{nama} (no NISN)")
-                    continue
-                
-                # List files from storage for this pendaftar
-                try:
-                    storage_result = supa.storage.from_("pendaftar-files").list(path=nisn)
-                    
-                    # Handle different response formats
-                    if isinstance(storage_result, list):
-                        storage_files = storage_result
-                    elif hasattr(storage_result, 'data'):
-                        storage_files = storage_result.data or []
-                    elif isinstance(storage_result, dict) and 'data' in storage_result:
-                        storage_files = storage_result['data'] or []
+            failed_files = []
+            collection_complete = True
+            total_files = 0
+            success_count = 0
+            used_folders: Dict[str, str] = {}
+
+            def applicants():
+                for pendaftar in pendaftar_list:
+                    if pendaftar.get("nisn"):
+                        yield pendaftar
                     else:
-                        storage_files = []
-                    
-                    for file_obj in storage_files:
+                        skipped_pendaftar.append(f"{pendaftar.get('namalengkap', 'Unknown')} (no NISN)")
+
+            def files_to_download(listings) -> Iterator[Dict[str, Any]]:
+                nonlocal collection_complete, total_files
+                for pendaftar, listing in listings:
+                    nisn = pendaftar["nisn"]
+                    nama = pendaftar.get("namalengkap", "Unknown")
+                    if not listing['success']:
+                        print(f"[ZIP_DOWNLOAD] ⚠️ Error listing files for {nisn}: {listing['error']}")
+                        collection_complete = False
+                        continue
+
+                    # Applicants sharing a name get separate folders
+                    slug_name = slugify(nama)
+                    if used_folders.setdefault(slug_name, nisn) != nisn:
+                        slug_name = f"{slug_name}-{nisn}"
+
+                    for file_obj in listing['files']:
                         if not isinstance(file_obj, dict):
                             continue
                         
@@ -198,133 +256,143 @@ class handler(BaseHTTPRequestHandler):
                             continue
                         
                         folder = detect_file_type(file_name)
-                        file_path = f"{nisn}/{file_name}"
-                        zip_path = f"{slug_name}/{folder}/{file_name}"
-                        
-                        files_to_download.append({
-                            'path': file_path,
-                            'zip_path': zip_path,
+                        total_files += 1
+                        yield {
+                            'path': f"{nisn}/{file_name}",
+                            'zip_path': f"{slug_name}/{folder}/{file_name}",
                             'nama': nama
-                        })
-                        
-                except Exception as e:
-                    print(f"[ZIP_DOWNLOAD] ⚠️ Error listing files for {nisn}: {e}")
-                    continue
-
-            print(f"[ZIP_DOWNLOAD] ✓ Found {len(files_to_download)} files to download")
-            
-            if not files_to_download:
-                self.send_response(404)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({
-                        "ok": False, 
-                        "error": "Tidak ada berkas ditemukan untuk pendaftar yang dipilih"
-                    }).encode()
-                )
+                        }
+
+            zip_spool = tempfile.NamedTemporaryFile(prefix="pendaftar-", suffix=".zip")
+            list_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_LISTINGS)
+            download_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS)
+            listings = pipelined(
+                list_executor, lambda pendaftar: list_pendaftar_files(supa, pendaftar["nisn"]),
+                applicants(), MAX_CONCURRENT_LISTINGS * 2,
+            )
+            downloads = pipelined(
+                download_executor, lambda file_info: download_single_file(supa, file_info),
+                files_to_download(listings), ZIP_QUEUE_DEPTH,
+            )
+            timed_out = False
+            try:
+                with zipfile.ZipFile(zip_spool, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zip_file:
+                    for file_info, result in downloads:
+                        # Check timeout
+                        elapsed = time.time() - start_time
+                        if elapsed > DOWNLOAD_TIMEOUT_SECONDS:
+                            print(f"[ZIP_DOWNLOAD] ⚠️ Timeout approaching ({elapsed:.1f}s), stopping downloads")
+                            timed_out = True
+                            break
+
+                        if result['success']:
+                            zip_file.writestr(result['zip_path'], result['data'])
+                            success_count += 1
+                        else:
+                            failed_files.append(f"{result['path']} ({result.get('error', 'unknown')})")
+                        del result
+            finally:
+                downloads.close()
+                listings.close()
+                download_executor.shutdown(wait=False, cancel_futures=True)
+                list_executor.shutdown(wait=False, cancel_futures=True)
+            zip_spool.flush()
+
+            print(f"[ZIP_DOWNLOAD] ✓ Downloaded {success_count}/{total_files} files")
+
+            if total_files == 0:
+                zip_spool.close()
+                send_json(self, 404, {
+                    "ok": False, 
+                    "error": "Tidak ada berkas ditemukan untuk pendaftar yang dipilih"
+                })
                 return
 
-            # PHASE 2: Download files concurrently
-            print(f"[ZIP_DOWNLOAD] PHASE 2: Downloading {len(files_to_download)} files with {MAX_CONCURRENT_DOWNLOADS} workers...")
-            
-            downloaded_files = []
-            failed_files = []
-            
-            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS) as executor:
-                # Submit all downloads
-                future_to_file = {
-                    executor.submit(download_single_file, supa, file_info): file_info 
-                    for file_info in files_to_download
-                }
-                
-                # Process completed downloads
-                for future in as_completed(future_to_file):
-                    # Check timeout
-                    elapsed = time.time() - start_time
-                    if elapsed > DOWNLOAD_TIMEOUT_SECONDS:
-                        print(f"[ZIP_DOWNLOAD] ⚠️ Timeout approaching ({elapsed:.1f}s), stopping downloads")
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        break
-                    
-                    result = future.result()
-                    if result['success']:
-                        downloaded_files.append(result)
-                    else:
-                        failed_files.append(f"{result['path']} ({result.get('error', 'unknown')})")
-
-            print(f"[ZIP_DOWNLOAD] ✓ Downloaded {len(downloaded_files)}/{len(files_to_download)} files")
-
-            if not downloaded_files:
-                self.send_response(404)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({
-                        "ok": False, 
-                        "error": "Tidak ada berkas yang berhasil diunduh",
-                        "failed_details": failed_files[:10]
-                    }).encode()
-                )
+            if success_count == 0:
+                zip_spool.close()
+                send_json(self, 404, {
+                    "ok": False, 
+                    "error": "Tidak ada berkas yang berhasil diunduh",
+                    "failed_details": failed_files[:10]
+                })
                 return
 
-            # PHASE 3: Create ZIP file
-            print("[ZIP_DOWNLOAD] PHASE 3: Creating ZIP file...")
-            zip_buffer = BytesIO()
-            
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zip_file:
-                for file_data in downloaded_files:
-                    zip_file.writestr(file_data['zip_path'], file_data['data'])
-
-            zip_buffer.seek(0)
-            zip_data = zip_buffer.getvalue()
-            
-            zip_size_mb = len(zip_data) / 1024 / 1024
-            print(f"[ZIP_DOWNLOAD] ✓ ZIP created: {zip_size_mb:.2f} MB ({len(downloaded_files)} files)")
+            zip_size = os.path.getsize(zip_spool.name)
+            zip_size_mb = zip_size / 1024 / 1024
+            print(f"[ZIP_DOWNLOAD] ✓ ZIP created: {zip_size_mb:.2f} MB ({success_count} files)")
 
-            # PHASE 4: Upload to storage
-            print("[ZIP_DOWNLOAD] PHASE 4: Uploading ZIP to storage...")
+            # Upload straight from the spooled file
+            print("[ZIP_DOWNLOAD] Uploading ZIP to storage...")
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"semua-berkas_{timestamp}.zip"
             storage_path = f"exports/{filename}"
 
-            try:
-                upload_result = supa.storage.from_("temp-downloads").upload(
-                    path=storage_path,
-                    file=zip_data,
-                    file_options={
-                        "content-type": "application/zip",
-                        "cache-control": "3600"
-                    }
-                )
-                print(f"[ZIP_DOWNLOAD] ✓ Upload successful")
-            except Exception as e:
-                print(f"[ZIP_DOWNLOAD] ❌ Upload failed: {e}")
-                raise Exception(f"Failed to upload ZIP to storage: {str(e)}")
-
-            # Generate signed URL
-            print("[ZIP_DOWNLOAD] Generating signed URL...")
-            try:
-                signed_url_result = supa.storage.from_("temp-downloads").create_signed_url(
-                    path=storage_path,
-                    expires_in=3600
-                )
-                
-                if isinstance(signed_url_result, dict) and 'signedURL' in signed_url_result:
-                    download_url = signed_url_result['signedURL']
-                elif isinstance(signed_url_result, dict) and 'signedUrl' in signed_url_result:
-                    download_url = signed_url_result['signedUrl']
-                elif hasattr(signed_url_result, 'signed_url'):
-                    download_url = signed_url_result.signed_url
+            # Only a complete ZIP is reusable; partial ones keep a one-off name
+            cacheable = (
+                cache_key is not None
+                and collection_complete
+                and pendaftar_rows.complete
+                and not timed_out
+                and not failed_files
+                and success_count == total_files
+            )
+            stored = None
+            with zip_spool, open(zip_spool.name, 'rb') as zip_stream:
+                if cacheable:
+                    try:
+                        stored = export_cache.store(
+                            supa, cache_key, "zip", zip_stream, "application/zip",
+                            meta={
+                                "filename": filename,
+                                "total_files": total_files,
+                                "success_count": success_count,
+                                "pendaftar_processed": len(pendaftar_list),
+                            },
+                            download_name=filename,
+                        )
+                        print("[ZIP_DOWNLOAD] ✓ Stored in export cache")
+                    except Exception as e:
+                        print(f"[ZIP_DOWNLOAD] ⚠️ Could not cache ZIP, uploading one-off copy: {e}")
+
+                if stored is not None:
+                    download_url = stored.url
                 else:
-                    download_url = supa.storage.from_("temp-downloads").get_public_url(storage_path)
+                    try:
+                        zip_stream.seek(0)
+                        upload_result = supa.storage.from_("temp-downloads").upload(
+                            path=storage_path,
+                            file=zip_stream,
+                            file_options={
+                                "content-type": "application/zip",
+                                "cache-control": "3600"
+                            }
+                        )
+                        print("[ZIP_DOWNLOAD] ✓ Upload successful")
+                    except Exception as e:
+                        print(f"[ZIP_DOWNLOAD] ❌ Upload failed: {e}")
+                        raise Exception(f"Failed to upload ZIP to storage: {str(e)}")
+
+                    # Generate signed URL
+                    print("[ZIP_DOWNLOAD] Generating signed URL...")
+                    try:
+                        signed_url_result = supa.storage.from_("temp-downloads").create_signed_url(
+                            path=storage_path,
+                            expires_in=3600
+                        )
                 
-                print(f"[ZIP_DOWNLOAD] ✓ Signed URL generated")
-            except Exception as e:
-                print(f"[ZIP_DOWNLOAD] ❌ Failed to generate signed URL: {e}")
-                raise Exception(f"Failed to generate download URL: {str(e)}")
+                        if isinstance(signed_url_result, dict) and 'signedURL' in signed_url_result:
+                            download_url = signed_url_result['signedURL']
+                        elif isinstance(signed_url_result, dict) and 'signedUrl' in signed_url_result:
+                            download_url = signed_url_result['signedUrl']
+                        elif hasattr(signed_url_result, 'signed_url'):
+                            download_url = signed_url_result.signed_url
+                        else:
+                            download_url = supa.storage.from_("temp-downloads").get_public_url(storage_path)
+                
+                        print(f"[ZIP_DOWNLOAD] ✓ Signed URL generated")
+                    except Exception as e:
+                        print(f"[ZIP_DOWNLOAD] ❌ Failed to generate signed URL: {e}")
+                        raise Exception(f"Failed to generate download URL: {str(e)}")
 
             # Cleanup old files (non-blocking, best effort)
             try:
@@ -336,8 +404,10 @@ class handler(BaseHTTPRequestHandler):
                 else:
                     files_list = []
                 
-                cutoff_time = datetime.now() - timedelta(hours=24)
-                for file_obj in files_list[:10]:  # Limit cleanup to prevent timeout
+                # Storage timestamps are UTC; scan the whole listing, remove in one call
+                cutoff_time = datetime.now(timezone.utc) - timedelta(hours=24)
+                expired = []
+                for file_obj in files_list:
                     if not isinstance(file_obj, dict):
                         continue
                     file_name = file_obj.get("name", "")
@@ -346,41 +416,42 @@ class handler(BaseHTTPRequestHandler):
                         try:
                             file_time = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
                             if file_time < cutoff_time:
-                                supa.storage.from_("temp-downloads").remove([f"exports/{file_name}"])
-                        except:
+                                expired.append(f"exports/{file_name}")
+                        except ValueError:
                             pass
-            except:
+                if expired:
+                    supa.storage.from_("temp-downloads").remove(expired[:export_cache.PRUNE_BATCH])
+            except Exception:
                 pass  # Ignore cleanup errors
+            if stored is None:
+                # store() prunes the cache itself; otherwise (EXPORT_CACHE=0,
+                # partial ZIP) drop expired cache entries here
+                export_cache.prune(supa)
 
             # Calculate total time
             total_time = time.time() - start_time
             print(f"[ZIP_DOWNLOAD] ========================================")
             print(f"[ZIP_DOWNLOAD] ✓✓✓ SUCCESS in {total_time:.1f}s")
-            print(f"[ZIP_DOWNLOAD]   Files: {len(downloaded_files)}/{len(files_to_download)}")
+            print(f"[ZIP_DOWNLOAD]   Files: {success_count}/{total_files}")
             print(f"[ZIP_DOWNLOAD]   Size: {zip_size_mb:.2f} MB")
             print(f"[ZIP_DOWNLOAD] ========================================")
 
             # Send response
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({
-                    "ok": True,
-                    "download_url": download_url,
-                    "filename": filename,
-                    "size_bytes": len(zip_data),
-                    "size_mb": round(zip_size_mb, 2),
-                    "total_files": len(files_to_download),
-                    "success_count": len(downloaded_files),
-                    "failed_count": len(failed_files),
-                    "processing_time_seconds": round(total_time, 1),
-                    "pendaftar_processed": len(pendaftar_list),
-                    "expires_in": "1 hour",
-                    "message": f"ZIP berhasil dibuat! {len(downloaded_files)} file dari {len(files_to_download)}"
-                }).encode()
-            )
+            send_json(self, 200, {
+                "ok": True,
+                "download_url": download_url,
+                "filename": filename,
+                "size_bytes": zip_size,
+                "size_mb": round(zip_size_mb, 2),
+                "total_files": total_files,
+                "success_count": success_count,
+                "failed_count": len(failed_files),
+                "processing_time_seconds": round(total_time, 1),
+                "pendaftar_processed": len(pendaftar_list),
+                "expires_in": "1 hour",
+                "cache": "miss",
+                "message": f"ZIP berhasil dibuat! {success_count} file dari {total_files}"
+            })
 
         except Exception as e:
             total_time = time.time() - start_time
@@ -392,26 +463,16 @@ class handler(BaseHTTPRequestHandler):
             import traceback
             traceback.print_exc()
             
-            self.send_response(500)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({
-                    "ok": False, 
-                    "error": str(e),
-                    "error_type": type(e).__name__,
-                    "processing_time_seconds": round(total_time, 1),
-                    "message": f"Terjadi kesalahan: {str(e)}"
-                }).encode()
-            )
+            send_json(self, 500, {
+                "ok": False, 
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "processing_time_seconds": round(total_time, 1),
+                "message": f"Terjadi kesalahan: {str(e)}"
+            })
 
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['GET', 'OPTIONS'])
 
 
@@ -1,7 +1,7 @@
 from http.server import BaseHTTPRequestHandler
-import json
 from urllib.parse import parse_qs, urlparse
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, send_json
 
 
 class handler(BaseHTTPRequestHandler):
@@ -17,13 +17,7 @@ class handler(BaseHTTPRequestHandler):
             nisn = (params.get("nisn", [""])[0] or "").strip()
 
             if not nisn:
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({"ok": False, "error": "NISN required"}).encode()
-                )
+                send_json(self, 400, {"ok": False, "error": "NISN required"})
                 return
 
             # Get Supabase client with service role for storage access
@@ -38,13 +32,7 @@ class handler(BaseHTTPRequestHandler):
             )
 
             if not pendaftar_result.data:
-                self.send_response(404)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Access-Control-Allow-Origin", "*")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({"ok": False, "error": "Pendaftar tidak ditemukan"}).encode()
-                )
+                send_json(self, 404, {"ok": False, "error": "Pendaftar tidak ditemukan"})
                 return
 
             pendaftar = pendaftar_result.data[0]
@@ -113,37 +101,21 @@ class handler(BaseHTTPRequestHandler):
                         # Continue with other files
 
             # Return success
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({
-                    "ok": True,
-                    "files": files,
-                    "pendaftar": {
-                        "nisn": pendaftar.get("nisn"),
-                        "nama": pendaftar.get("namalengkap"),
-                        "nik": pendaftar.get("nikcalon"),
-                    },
-                }).encode()
-            )
+            send_json(self, 200, {
+                "ok": True,
+                "files": files,
+                "pendaftar": {
+                    "nisn": pendaftar.get("nisn"),
+                    "nama": pendaftar.get("namalengkap"),
+                    "nik": pendaftar.get("nikcalon"),
+                },
+            })
 
         except Exception as e:
             print(f"Error in pendaftar_files_list: {e}")
-            self.send_response(500)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({"ok": False, "error": str(e)}).encode()
-            )
+            send_json(self, 500, {"ok": False, "error": str(e)})
 
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['GET', 'OPTIONS'])
 
@@ -1,133 +1,292 @@
 from http.server import BaseHTTPRequestHandler
-import json
 from urllib.parse import parse_qs, urlparse
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
+import base64
+import json
+import re
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import send_json, allow_cors
+from lib.handlers._search_helpers import SearchTerm, apply_search, parse_search, ranked_search
+
+COUNT_METHODS = ("exact", "planned", "estimated")
+
+# q= matches these (trigram-indexed, see sql/search.sql); NISN/NIK go to equality
+SEARCH_TEXT_COLUMNS = ("namalengkap", "sekolahdomisili", "nisn", "nikcalon")
+SEARCH_KEY_COLUMNS = {"nisn": "nisn", "nik": "nikcalon"}
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque keyset cursor for the (createdat, id) position of a row."""
+    raw = json.dumps([row.get("createdat"), row.get("id")], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Cursor tidak valid")
+
+
+def apply_filters(query, status: str, term: Optional[SearchTerm]):
+    """Filters shared by the page query and the count query."""
+    if status:
+        query = query.eq("statusberkas", status)
+    return apply_search(query, term, SEARCH_TEXT_COLUMNS, SEARCH_KEY_COLUMNS)
+
+
+def format_tanggal(created_at: Any) -> str:
+    """ISO timestamp → DD/MM/YYYY (Indonesian display format)."""
+    if not created_at:
+        return ""
+    try:
+        date_obj = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        return date_obj.strftime("%d/%m/%Y")
+    except ValueError:
+        # If parsing fails, use original value
+        return created_at
+
+
+def full_row(row_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Default row shape: every column plus the aliases older admin pages read."""
+    # Map createdat to tanggal_daftar for the frontend CSV export
+    created_at = row_dict.get("createdat", "")
+    tanggal_daftar = format_tanggal(created_at)
+
+    # Get all possible identifiers for payment matching
+    nisn = row_dict.get("nisn", "")
+    nik = row_dict.get("nik", "") or row_dict.get("nikcalon", "")
+    nikcalon = row_dict.get("nikcalon", "") or row_dict.get("nik", "")
+
+    return {
+        "id": row_dict.get("id"),
+        "nama": row_dict.get("namalengkap", ""),
+        "email": row_dict.get("emailcalon", "-"),
+        "no_hp": row_dict.get("telepon_orang_tua", row_dict.get("nomorhportu", "-")),
+        "alamat": f"{row_dict.get('alamatjalan', '')}, {row_dict.get('desa', '')}, {row_dict.get('kecamatan', '')}",
+        "status": (row_dict.get("statusberkas", "PENDING") or "PENDING").lower(),
+        "tanggal_daftar": tanggal_daftar,  # Add tanggal_daftar field for CSV export
+        "createdat": created_at,
+        "alasan": row_dict.get("alasan", "-"),
+        # CRITICAL: Ensure all identifier fields are present for payment matching
+        "nisn": nisn,
+        "nik": nik,
+        "nikcalon": nikcalon,
+        # Include original data for detail view with proper field mapping
+        **{
+            key: value for key, value in row_dict.items()
+            if key not in ["telepon_orang_tua", "nomorhportu", "statusberkas", "createdat", "alasan", "nisn", "nik", "nikcalon"]
+        },
+        # Ensure consistent field names
+        "telepon_orang_tua": row_dict.get("telepon_orang_tua", row_dict.get("nomorhportu", "-")),
+        "statusberkas": row_dict.get("statusberkas", "PENDING"),
+        "createdat": created_at,
+        "alasan_catatan": row_dict.get("alasan", "-"),
+        # CRITICAL: Add consistent field names for statistics calculation
+        "rencana_program": row_dict.get("rencanaprogram", ""),  # For statistics
+        "rencanaprogram": row_dict.get("rencanaprogram", ""),   # Keep lowercase for compatibility
+        "rencanatingkat": row_dict.get("rencanatingkat", ""),   # For jenjang filtering
+        "jeniskelamin": row_dict.get("jeniskelamin", "")        # For gender filtering
+    }
+
+
+# Derived output keys: (source columns, builder). Any other key is a plain column.
+DERIVED_FIELDS: Dict[str, Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], Any]]] = {
+    "nama": (("namalengkap",), lambda r: r.get("namalengkap") or ""),
+    "email": (("emailcalon",), lambda r: r.get("emailcalon") or "-"),
+    "no_hp": (("telepon_orang_tua",), lambda r: r.get("telepon_orang_tua") or "-"),
+    "alamat": (
+        ("alamatjalan", "desa", "kecamatan"),
+        lambda r: f"{r.get('alamatjalan') or ''}, {r.get('desa') or ''}, {r.get('kecamatan') or ''}",
+    ),
+    "status": (("statusberkas",), lambda r: (r.get("statusberkas") or "PENDING").lower()),
+    "tanggal_daftar": (("createdat",), lambda r: format_tanggal(r.get("createdat"))),
+    "nik": (("nikcalon",), lambda r: r.get("nikcalon") or ""),
+    "alasan_catatan": (("alasan",), lambda r: r.get("alasan") or "-"),
+    "rencana_program": (("rencanaprogram",), lambda r: r.get("rencanaprogram") or ""),
+}
+
+# Named row shapes; "*" passes every column through. Without view/fields
+# the response keeps the full_row() shape.
+VIEWS: Dict[str, Tuple[str, ...]] = {
+    "table": ("id", "nisn", "nikcalon", "nama", "status", "createdat"),
+    "detail": ("*", "nama", "status", "tanggal_daftar"),
+    "export": (
+        "id", "nisn", "nikcalon", "nama", "jeniskelamin", "email", "no_hp", "alamat",
+        "rencanatingkat", "rencanaprogram", "status", "alasan", "tanggal_daftar", "createdat",
+    ),
+}
+
+# The full shape is capped at 50 rows a page; projected rows are small
+# enough for the admin grid to pull a large page at once
+MAX_PAGE_SIZE = 50
+MAX_PROJECTED_PAGE_SIZE = 1000
+
+_FIELD_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def parse_output_keys(view: str, fields: str) -> Optional[Tuple[str, ...]]:
+    """view=/fields= → output keys (None = full_row shape)."""
+    if fields:
+        keys = tuple(dict.fromkeys(key.strip().lower() for key in fields.split(",") if key.strip()))
+        invalid = [key for key in keys if key != "*" and not _FIELD_RE.match(key)]
+        if invalid:
+            raise ValueError(f"fields tidak valid: {', '.join(invalid)}")
+        return keys or None
+    if not view or view == "full":
+        return None
+    if view not in VIEWS:
+        raise ValueError(f"view tidak dikenal: {view} (pilihan: full, {', '.join(VIEWS)})")
+    return VIEWS[view]
+
+
+def select_columns(output_keys: Optional[Tuple[str, ...]]) -> str:
+    """PostgREST select list for the output keys (id/createdat always, for the cursor)."""
+    if output_keys is None or "*" in output_keys:
+        return "*"
+    columns = ["id", "createdat"]
+    for key in output_keys:
+        columns.extend(DERIVED_FIELDS[key][0] if key in DERIVED_FIELDS else (key,))
+    return ",".join(dict.fromkeys(columns))
+
+
+def build_row(row: Dict[str, Any], output_keys: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    if output_keys is None:
+        return full_row(row)
+    out: Dict[str, Any] = {}
+    for key in output_keys:
+        if key == "*":
+            out.update(row)
+        elif key in DERIVED_FIELDS:
+            out[key] = DERIVED_FIELDS[key][1](row)
+        else:
+            out[key] = row.get(key)
+    return out
+
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         """
-        GET /api/pendaftar_list?page=1&pageSize=10&q=&status=
-        Response: { ok: true, rows: [...], page: 1, pageSize: 10 }
+        GET /api/pendaftar_list?page=1&pageSize=10&q=&status=&count=exact
+        GET /api/pendaftar_list?cursor=&pageSize=10&q=&status=
+        GET /api/pendaftar_list?view=table&pageSize=1000
+        GET /api/pendaftar_list?fields=id,nama,status,provinsi
+        GET /api/pendaftar_list?q=ahmad&mode=search&pageSize=20
+        Response: { success: true, data: [...], total, page, limit, next_cursor }
         
         Filter by:
-        - q: search in namaLengkap
+        - q: name, school, NISN or NIK (a 10/16-digit q is an exact
+          NISN/NIK lookup); mode=search returns the best pageSize
+          matches ranked by similarity instead of pages
         - status: statusBerkas (MENUNGGU_VERIFIKASI, DITERIMA, DITOLAK)
+        
+        Pagination:
+        - page: offset pages (default); total is counted with the same
+          filters unless count=none
+        - cursor: keyset pages on (createdat, id), start with an empty
+          cursor and pass back next_cursor (null on the last page); total
+          only when count=exact|planned|estimated is given
+        
+        Row shape:
+        - default: every column plus the legacy aliases (full_row)
+        - view=table|detail|export: named key sets (VIEWS)
+        - fields=a,b,c: columns and/or derived keys (DERIVED_FIELDS)
+        Only the columns those keys need are selected from PostgREST, and
+        pageSize may go up to 1000 for the projected shapes.
         """
         try:
             # Parse query parameters
             parsed = urlparse(self.path)
-            params = parse_qs(parsed.query)
+            params = parse_qs(parsed.query, keep_blank_values=True)
             
-            q = params.get('q', [''])[0].strip()
+            term = parse_search(params.get('q', [''])[0])
+            search_mode = params.get('mode', [''])[0].strip().lower() == 'search'
             status = params.get('status', [''])[0].strip()
-            page = int(params.get('page', ['1'])[0])
-            page_size = min(50, int(params.get('pageSize', ['10'])[0]))
+            output_keys = parse_output_keys(
+                params.get('view', [''])[0].strip().lower(),
+                params.get('fields', [''])[0].strip(),
+            )
+            columns = select_columns(output_keys)
+            max_page_size = MAX_PAGE_SIZE if output_keys is None else MAX_PROJECTED_PAGE_SIZE
+            page_size = max(1, min(max_page_size, int(params.get('pageSize', ['10'])[0] or 10)))
+            cursor: Optional[str] = params['cursor'][0].strip() if 'cursor' in params else None
+            page = int(params.get('page', ['1'])[0] or 1)
             
-            # Calculate range
-            from_ = (page - 1) * page_size
-            to_ = from_ + page_size - 1
+            count_method: Optional[str] = params.get('count', ['' if cursor is not None else 'exact'])[0].strip().lower()
+            if count_method not in COUNT_METHODS:
+                count_method = None
             
             # Query Supabase with service-role for admin operations
             supa = supabase_client(service_role=True)
-            query = supa.table("pendaftar").select("*").order("createdat", desc=True)
+            total: Optional[int] = None
+            next_cursor: Optional[str] = None
             
-            # Apply filters
-            if status:
-                query = query.eq("statusberkas", status)
-            
-            if q:
-                # Search in namalengkap (case-insensitive)
-                query = query.ilike("namalengkap", f"%{q}%")
-            
-            # Apply pagination
-            res = query.range(from_, to_).execute()
-            
-            # Get total count
-            count_res = supa.table("pendaftar").select("*", count="exact").execute()  # type: ignore
-            total = count_res.count if hasattr(count_res, 'count') else len(res.data)  # type: ignore
-            
-            # Transform data untuk admin dashboard
-            transformed_data: List[Dict[str, Any]] = []
-            for row in res.data:  # type: ignore
-                row_dict: Dict[str, Any] = row  # type: ignore
-                # Map createdat to tanggal_daftar for the frontend CSV export
-                created_at = row_dict.get("createdat", "")
-                # Format date to Indonesian format (DD/MM/YYYY) for display
-                tanggal_daftar = ""
-                if created_at:
-                    try:
-                        # Convert ISO format to DD/MM/YYYY format
-                        date_obj = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                        tanggal_daftar = date_obj.strftime("%d/%m/%Y")
-                    except ValueError:
-                        # If parsing fails, use original value
-                        tanggal_daftar = created_at
+            if search_mode and term is not None and term.kind == "text":
+                try:
+                    rows = ranked_search(supa, "search_pendaftar", term, page_size, {"p_status": status})
+                except Exception as search_error:
+                    print(f"[PENDAFTAR_LIST] ⚠️ search_pendaftar failed, unranked fallback: {search_error}")
+                    query = apply_filters(supa.table("pendaftar").select(columns), status, term)
+                    rows = query.order("createdat", desc=True).order("id", desc=True).limit(page_size).execute().data or []
+                total = len(rows)
+            elif cursor is not None:
+                query = apply_filters(supa.table("pendaftar").select(columns), status, term)
+                if cursor:
+                    created_at, last_id = decode_cursor(cursor)
+                    # (createdat, id) < (created_at, last_id), expressed with flat filters
+                    query = query.lte("createdat", created_at).or_(
+                        f'createdat.lt."{created_at}",id.lt.{last_id}'
+                    )
+                # One extra row tells whether there is a next page
+                res = query.order("createdat", desc=True).order("id", desc=True).limit(page_size + 1).execute()
+                rows = res.data or []
+                if len(rows) > page_size:
+                    rows = rows[:page_size]
+                    next_cursor = encode_cursor(rows[-1])
                 
-                # Get all possible identifiers for payment matching
-                nisn = row_dict.get("nisn", "")
-                nik = row_dict.get("nik", "") or row_dict.get("nikcalon", "")
-                nikcalon = row_dict.get("nikcalon", "") or row_dict.get("nik", "")
+                if count_method:
+                    count_query = supa.table("pendaftar").select("id", count=count_method)  # type: ignore
+                    total = apply_filters(count_query, status, term).limit(1).execute().count
+            else:
+                # Calculate range
+                from_ = (page - 1) * page_size
+                to_ = from_ + page_size - 1
                 
-                transformed_data.append({
-                    "id": row_dict.get("id"),
-                    "nama": row_dict.get("namalengkap", ""),
-                    "email": row_dict.get("emailcalon", "-"),
-                    "no_hp": row_dict.get("telepon_orang_tua", row_dict.get("nomorhportu", "-")),
-                    "alamat": f"{row_dict.get('alamatjalan', '')}, {row_dict.get('desa', '')}, {row_dict.get('kecamatan', '')}",
-                    "status": (row_dict.get("statusberkas", "PENDING") or "PENDING").lower(),
-                    "tanggal_daftar": tanggal_daftar,  # Add tanggal_daftar field for CSV export
-                    "createdat": created_at,
-                    "alasan": row_dict.get("alasan", "-"),
-                    # CRITICAL: Ensure all identifier fields are present for payment matching
-                    "nisn": nisn,
-                    "nik": nik,
-                    "nikcalon": nikcalon,
-                    # Include original data for detail view with proper field mapping
-                    **{
-                        key: value for key, value in row_dict.items()
-                        if key not in ["telepon_orang_tua", "nomorhportu", "statusberkas", "createdat", "alasan", "nisn", "nik", "nikcalon"]
-                    },
-                    # Ensure consistent field names
-                    "telepon_orang_tua": row_dict.get("telepon_orang_tua", row_dict.get("nomorhportu", "-")),
-                    "statusberkas": row_dict.get("statusberkas", "PENDING"),
-                    "createdat": created_at,
-                    "alasan_catatan": row_dict.get("alasan", "-"),
-                    # CRITICAL: Add consistent field names for statistics calculation
-                    "rencana_program": row_dict.get("rencanaprogram", ""),  # For statistics
-                    "rencanaprogram": row_dict.get("rencanaprogram", ""),   # Keep lowercase for compatibility
-                    "rencanatingkat": row_dict.get("rencanatingkat", ""),   # For jenjang filtering
-                    "jeniskelamin": row_dict.get("jeniskelamin", "")        # For gender filtering
-                })
+                # Count comes back with the page itself (Content-Range), same filters
+                query = supa.table("pendaftar").select(columns, count=count_method)  # type: ignore
+                query = apply_filters(query, status, term).order("createdat", desc=True).order("id", desc=True)
+                res = query.range(from_, to_).execute()
+                rows = res.data or []
+                total = res.count if count_method else None
             
-            # Response
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            # Transform data untuk admin dashboard
+            transformed_data: List[Dict[str, Any]] = [build_row(row, output_keys) for row in rows]  # type: ignore
+            
+            # Response (no-cache: browser may keep it but must revalidate via ETag)
+            send_json(self, 200, {
                 "success": True,
                 "data": transformed_data,
                 "total": total,
-                "page": page,
-                "limit": page_size
-            }).encode())
+                "page": page if cursor is None and not search_mode else None,
+                "limit": page_size,
+                "next_cursor": next_cursor
+            }, {"Cache-Control": "no-cache"})
+            
+        except ValueError as e:
+            send_json(self, 400, {
+                "success": False,
+                "error": str(e)
+            })
             
         except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            send_json(self, 500, {
                 "success": False,
                 "error": str(e)
-            }).encode())
+            })
     
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
\ No newline at end of file
+        allow_cors(self, ['GET', 'OPTIONS'])
@@ -1,206 +1,245 @@
 from http.server import BaseHTTPRequestHandler
-import json
+from typing import Any, Dict, Iterable
+from urllib.parse import parse_qs, urlparse
+from lib._fetch_all import fetch_all
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, read_json_body, send_json
+
+STATS_COLUMNS = "statusberkas, jeniskelamin, rencanaprogram, rencanatingkat, provinsi"
+
+
+def aggregate_rows(data: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Python twin of public.pendaftar_stats() (sql/pendaftar_stats.sql), same
+    result shape, in one pass over the rows. Only used while the SQL
+    function is not installed.
+    """
+    stats = {
+        "total": 0,
+        "pending": 0,
+        "diterima": 0,
+        "ditolak": 0,
+        "revisi": 0
+    }
+    
+    # Aggregation for Charts
+    gender_counts = {"L": 0, "P": 0}
+    program_counts = {}
+    asrama_counts = {"Asrama": 0, "Non-Asrama": 0}
+
+    # Detailed Breakdown Calculation
+    breakdown = {
+        "putraIndukMts": 0, "putraIndukMa": 0, "putraIndukKuliah": 0, "putraIndukTotal": 0,
+        "putraTahfidzMts": 0, "putraTahfidzMa": 0, "putraTahfidzKuliah": 0, "putraTahfidzTotal": 0,
+        "putriMts": 0, "putriMa": 0, "putriKuliah": 0, "putriTotal": 0,
+        "hanyaSekolahMtsL": 0, "hanyaSekolahMtsP": 0, "hanyaSekolahMtsTotal": 0,
+        "hanyaSekolahMaL": 0, "hanyaSekolahMaP": 0, "hanyaSekolahMaTotal": 0
+    }
+
+    # Province Aggregation (Top 10)
+    province_counts = {}
+
+    # Distinct raw values (debug_values)
+    distinct: Dict[str, set] = {"programs": set(), "jenjang": set(), "gender": set()}
+
+    for row in data:
+        stats["total"] += 1
+        distinct["programs"].add(row.get("rencanaprogram"))
+        distinct["jenjang"].add(row.get("rencanatingkat"))
+        distinct["gender"].add(row.get("jeniskelamin"))
+
+        # 1. Status Stats
+        status = (row.get("statusberkas") or "PENDING").lower()
+        if status in stats and status != "total":
+            stats[status] += 1
+        else:
+            stats["pending"] += 1
+
+        # 2. Extract Data
+        prog = (row.get("rencanaprogram") or "").strip()
+        jenjang = (row.get("rencanatingkat") or "").strip()
+        jk = (row.get("jeniskelamin") or "").strip().upper()
+        prov = (row.get("provinsi") or "Belum Diisi").strip()
+
+        # 3. Chart Aggregations
+        # Gender
+        if "L" in jk: gender_counts["L"] += 1
+        elif "P" in jk: gender_counts["P"] += 1
+
+        # Program Pie Chart
+        full_prog = f"{jenjang} - {prog}"
+        program_counts[full_prog] = program_counts.get(full_prog, 0) + 1
+
+        # Asrama Pie Chart
+        if "Asrama" in prog:
+             asrama_counts["Asrama"] += 1
+        else:
+             asrama_counts["Non-Asrama"] += 1
+
+        # 4. Province
+        if not prov: prov = "Belum Diisi"
+        province_counts[prov] = province_counts.get(prov, 0) + 1
+
+        # Helper bools for Breakdown
+        is_mts = jenjang == "MTs" or jenjang == "MTS"
+        is_ma = jenjang == "MA"
+        is_kuliah = jenjang == "Kuliah" or jenjang == "KULIAH"
+        is_l = "L" in jk
+        is_p = "P" in jk
+
+        prog_upper = prog.upper()
+
+        # Putra Induk (Robust Check)
+        if "PUTRA INDUK" in prog_upper:
+            if is_mts: breakdown["putraIndukMts"] += 1
+            if is_ma: breakdown["putraIndukMa"] += 1
+            if is_kuliah: breakdown["putraIndukKuliah"] += 1
+            breakdown["putraIndukTotal"] += 1
+
+        # Putra Tahfidz
+        elif "TAHFIDZ" in prog_upper:
+            if is_mts: breakdown["putraTahfidzMts"] += 1
+            if is_ma: breakdown["putraTahfidzMa"] += 1
+            if is_kuliah: breakdown["putraTahfidzKuliah"] += 1
+            breakdown["putraTahfidzTotal"] += 1
+
+        # Putri
+        elif "PUTRI" in prog_upper:
+            if is_mts: breakdown["putriMts"] += 1
+            if is_ma: breakdown["putriMa"] += 1
+            if is_kuliah: breakdown["putriKuliah"] += 1
+            breakdown["putriTotal"] += 1
+
+        # Hanya Sekolah (Non-Asrama) 
+        # Note: Logic asks for "Hanya Sekolah" specifically, or fallback?
+        # Usually if not one of the above Asramas, it's Sekolah only.
+        # But let's check for "SEKOLAH" or "NON" keyword if specific.
+        # If unsure, we can use 'else' but risky if data is dirty.
+        # Let's try matching "SEKOLAH" or if it doesn't match above but has valid jenjang.
+        elif "SEKOLAH" in prog_upper or "NON" in prog_upper:
+            if is_mts:
+                if is_l: breakdown["hanyaSekolahMtsL"] += 1
+                if is_p: breakdown["hanyaSekolahMtsP"] += 1
+                breakdown["hanyaSekolahMtsTotal"] += 1
+            elif is_ma:
+                if is_l: breakdown["hanyaSekolahMaL"] += 1
+                if is_p: breakdown["hanyaSekolahMaP"] += 1
+                breakdown["hanyaSekolahMaTotal"] += 1
+
+        # Fallback: if program is just "MTs Regular" or something without "Sekolah" keyword
+        # but wasn't caught by Asrama checks, we might want to count it as Sekolah?
+        # For now stick to strict-ish text match to avoid over-counting garbage data.
+
+    return {
+        "kpi": stats,
+        "gender": gender_counts,
+        "asrama": asrama_counts,
+        "program": program_counts,
+        # Top 10, ties by name like the SQL function
+        "province": [
+            [label, count] for label, count in
+            sorted(province_counts.items(), key=lambda item: (-item[1], item[0]))[:10]
+        ],
+        "breakdown": breakdown,
+        "distinct": {key: list(values) for key, values in distinct.items()},
+    }
+
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
+        """
+        GET /api/pendaftar_stats[?gelombang=...]
+        Reads the pendaftar_counters groups via public.pendaftar_stats().
+        """
         try:
+            params = parse_qs(urlparse(self.path).query)
+            gelombang = params.get("gelombang", [""])[0].strip()
+            
             # Init Supabase with service role for admin access (bypasses RLS)
             supa = supabase_client(service_role=True)
             
-            # Fetch all rows efficiently (just ID and relevant columns for stats)
-            # Fetching 1000+ rows is fine if we only select specific columns, 
-            # but ideally we'd use count() for total/status. 
-            # However, for charts (gender/program), we need the data.
-            # Supabase API max rows is 1000 by default, so we need to be careful.
-            # A better approach for scalability is to run separate count queries.
+            # All aggregates in one round trip, from the counters table
+            try:
+                rpc_params = {"p_gelombang": gelombang} if gelombang else {}
+                result = supa.rpc("pendaftar_stats", rpc_params).execute().data
+                if not isinstance(result, dict):
+                    raise ValueError(f"Unexpected RPC result: {type(result).__name__}")
+                note = "Aggregated in the database (public.pendaftar_stats)"
+            except Exception as rpc_error:
+                print(f"[PENDAFTAR_STATS] ⚠️ RPC pendaftar_stats failed, falling back to raw rows: {rpc_error}")
+                rows = fetch_all(
+                    supa, "pendaftar", "id, " + STATS_COLUMNS,
+                    apply=(lambda q: q.eq("gelombang", gelombang)) if gelombang else None,
+                )
+                result = aggregate_rows(rows)
+                note = (
+                    f"Aggregated from raw data ({rows.fetched}/{rows.total} rows"
+                    f"{'' if rows.complete else ', incomplete'}); "
+                    "run sql/pendaftar_counters.sql and sql/pendaftar_stats.sql"
+                )
             
-            # 1. Status Counts (Exact)
-            stats = {
-                "total": 0,
-                "pending": 0,
-                "diterima": 0,
-                "ditolak": 0,
-                "revisi": 0
-            }
-            
-            # It's more reliable to hit the DB multiple times for exact counts than fetching all rows if >1000
-            # But making 5 requests is slow. 
-            # Let's try fetching just the columns needed for stats with a higher limit.
-            
-            res = supa.table("pendaftar").select(
-                "id, statusberkas, jeniskelamin, rencanaprogram, rencanatingkat, provinsi"
-            ).execute()
-            
-            data = res.data if res.data else []
-            
-            # Init stats containers
-            stats = {
-                "total": len(data),
-                "pending": 0,
-                "diterima": 0,
-                "ditolak": 0,
-                "revisi": 0
-            }
-            
-            # Aggregation for Charts
-            gender_counts = {"L": 0, "P": 0}
-            program_counts = {}
-            asrama_counts = {"Asrama": 0, "Non-Asrama": 0}
-            
-            # Detailed Breakdown Calculation
-            breakdown = {
-                "putraIndukMts": 0, "putraIndukMa": 0, "putraIndukKuliah": 0, "putraIndukTotal": 0,
-                "putraTahfidzMts": 0, "putraTahfidzMa": 0, "putraTahfidzKuliah": 0, "putraTahfidzTotal": 0,
-                "putriMts": 0, "putriMa": 0, "putriKuliah": 0, "putriTotal": 0,
-                "hanyaSekolahMtsL": 0, "hanyaSekolahMtsP": 0, "hanyaSekolahMtsTotal": 0,
-                "hanyaSekolahMaL": 0, "hanyaSekolahMaP": 0, "hanyaSekolahMaTotal": 0
-            }
-
-            # Province Aggregation (Top 10)
-            province_counts = {}
-
-            for row in data:
-                # 1. Status Stats
-                status = (row.get("statusberkas") or "PENDING").lower()
-                if status in stats:
-                    stats[status] += 1
-                else:
-                    stats["pending"] += 1
-                
-                # 2. Extract Data
-                prog = (row.get("rencanaprogram") or "").strip()
-                jenjang = (row.get("rencanatingkat") or "").strip()
-                jk = (row.get("jeniskelamin") or "").strip().upper()
-                prov = (row.get("provinsi") or "Belum Diisi").strip()
-                
-                # 3. Chart Aggregations
-                # Gender
-                if "L" in jk: gender_counts["L"] += 1
-                elif "P" in jk: gender_counts["P"] += 1
-                
-                # Program Pie Chart
-                full_prog = f"{jenjang} - {prog}"
-                program_counts[full_prog] = program_counts.get(full_prog, 0) + 1
-                
-                # Asrama Pie Chart
-                if "Asrama" in prog:
-                     asrama_counts["Asrama"] += 1
-                else:
-                     asrama_counts["Non-Asrama"] += 1
-
-                # 4. Province
-                if not prov: prov = "Belum Diisi"
-                province_counts[prov] = province_counts.get(prov, 0) + 1
-                
-                # Helper bools for Breakdown
-                is_mts = jenjang == "MTs" or jenjang == "MTS"
-                is_ma = jenjang == "MA"
-                is_kuliah = jenjang == "Kuliah" or jenjang == "KULIAH"
-                is_l = "L" in jk
-                is_p = "P" in jk
-                
-                prog_upper = prog.upper()
-
-                # Putra Induk (Robust Check)
-                if "PUTRA INDUK" in prog_upper:
-                    if is_mts: breakdown["putraIndukMts"] += 1
-                    if is_ma: breakdown["putraIndukMa"] += 1
-                    if is_kuliah: breakdown["putraIndukKuliah"] += 1
-                    breakdown["putraIndukTotal"] += 1
-                
-                # Putra Tahfidz
-                elif "TAHFIDZ" in prog_upper:
-                    if is_mts: breakdown["putraTahfidzMts"] += 1
-                    if is_ma: breakdown["putraTahfidzMa"] += 1
-                    if is_kuliah: breakdown["putraTahfidzKuliah"] += 1
-                    breakdown["putraTahfidzTotal"] += 1
-                
-                # Putri
-                elif "PUTRI" in prog_upper:
-                    if is_mts: breakdown["putriMts"] += 1
-                    if is_ma: breakdown["putriMa"] += 1
-                    if is_kuliah: breakdown["putriKuliah"] += 1
-                    breakdown["putriTotal"] += 1
-                
-                # Hanya Sekolah (Non-Asrama) 
-                # Note: Logic asks for "Hanya Sekolah" specifically, or fallback?
-                # Usually if not one of the above Asramas, it's Sekolah only.
-                # But let's check for "SEKOLAH" or "NON" keyword if specific.
-                # If unsure, we can use 'else' but risky if data is dirty.
-                # Let's try matching "SEKOLAH" or if it doesn't match above but has valid jenjang.
-                elif "SEKOLAH" in prog_upper or "NON" in prog_upper:
-                    if is_mts:
-                        if is_l: breakdown["hanyaSekolahMtsL"] += 1
-                        if is_p: breakdown["hanyaSekolahMtsP"] += 1
-                        breakdown["hanyaSekolahMtsTotal"] += 1
-                    elif is_ma:
-                        if is_l: breakdown["hanyaSekolahMaL"] += 1
-                        if is_p: breakdown["hanyaSekolahMaP"] += 1
-                        breakdown["hanyaSekolahMaTotal"] += 1
-                
-                # Fallback: if program is just "MTs Regular" or something without "Sekolah" keyword
-                # but wasn't caught by Asrama checks, we might want to count it as Sekolah?
-                # For now stick to strict-ish text match to avoid over-counting garbage data.
-            
-            # Sort provinces by count (descending) and top 10
-            sorted_prov = sorted(province_counts.items(), key=lambda item: item[1], reverse=True)[:10]
+            province = result.get("province") or []
             prov_chart_data = {
-                "labels": [k for k, v in sorted_prov],
-                "data": [v for k, v in sorted_prov]
+                "labels": [label for label, _ in province],
+                "data": [count for _, count in province]
             }
-            
-            # Debug: Collect distinct values to diagnose mismatch
-            distinct_programs = set()
-            distinct_jenjang = set()
-            distinct_gender = set()
-
-            for row in data:
-                distinct_programs.add(row.get("rencanaprogram"))
-                distinct_jenjang.add(row.get("rencanatingkat"))
-                distinct_gender.add(row.get("jeniskelamin"))
+            distinct = result.get("distinct") or {}
 
             # Construct response
             response_data = {
                 "success": True,
-                "kpi": stats,
-                "breakdown": breakdown,
+                "kpi": result["kpi"],
+                "breakdown": result["breakdown"],
                 "charts": {
-                    "gender": gender_counts,
-                    "program": program_counts,
-                    "asrama": asrama_counts,
+                    "gender": result["gender"],
+                    "program": result["program"],
+                    "asrama": result["asrama"],
                     "province": prov_chart_data
                 },
                 "debug_values": {
-                    "programs": list(distinct_programs),
-                    "jenjang": list(distinct_jenjang),
-                    "gender": list(distinct_gender)
+                    "programs": distinct.get("programs", []),
+                    "jenjang": distinct.get("jenjang", []),
+                    "gender": distinct.get("gender", [])
                 },
                 "meta": {
-                    "fetched_count": len(data),
-                    "note": "Aggregated from raw data (limit 1000)"
+                    "fetched_count": result["kpi"]["total"],
+                    "note": note
                 }
             }
             
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Cache-Control', 'no-store') # Always fresh
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode())
+            send_json(self, 200, response_data, {'Cache-Control': 'no-store'})
+            
+        except Exception as e:
+            send_json(self, 500, {
+                "success": False,
+                "error": str(e)
+            })
+
+    def do_POST(self):
+        """
+        POST /api/pendaftar_counters_rebuild
+        Body: { dryRun?: true }
+        Reconciles pendaftar_counters with pendaftar; dryRun only reports
+        how many groups drifted.
+        """
+        try:
+            body = read_json_body(self)
+            dry_run = bool(body.get("dryRun", False))
+            
+            supa = supabase_client(service_role=True)
+            result = supa.rpc("pendaftar_counters_rebuild", {"p_dry_run": dry_run}).execute().data
+            print(f"[PENDAFTAR_STATS] Counters {'reconcile' if dry_run else 'rebuild'}: {result}")
+            
+            send_json(self, 200, {
+                "success": True,
+                "result": result
+            }, {'Cache-Control': 'no-store'})
             
         except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            send_json(self, 500, {
                 "success": False,
                 "error": str(e)
-            }).encode())
+            })
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        allow_cors(self, ['GET', 'POST', 'OPTIONS'])
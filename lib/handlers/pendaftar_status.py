@@ -1,7 +1,138 @@
 from http.server import BaseHTTPRequestHandler
 import json
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, send_json
+
+VALID_STATUSES = ['PENDING', 'REVISI', 'DITERIMA', 'DITOLAK']
+MAX_BULK_IDS = 2000
+BULK_CHUNK_SIZE = 500  # ids per update (keeps the id=in.(...) URL short)
+
+
+def build_update_payload(status: str, alasan: Optional[str], verified_by: str) -> Dict[str, Any]:
+    """Columns written for a status change (single and bulk)."""
+    update_payload: Dict[str, Any] = {
+        "statusberkas": status,
+        "updatedat": "now()",
+    }
+
+    # Add alasan/catatan if provided
+    if alasan:
+        update_payload["alasan"] = alasan
+
+    # Add verified information for non-pending status
+    if status != 'PENDING':
+        update_payload["verifiedby"] = verified_by
+        update_payload["verifiedat"] = "now()"  # Timestamp verifikasi
+    return update_payload
+
+
+def contact_info(pendaftar_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Name / NISN / phone for the manual WhatsApp message after DITERIMA."""
+    # Get phone number from multiple possible field names
+    telepon = (
+        pendaftar_data.get('telepon_orang_tua') or
+        pendaftar_data.get('teleponorangtua') or
+        pendaftar_data.get('nomorhportu') or
+        pendaftar_data.get('nomorhp') or
+        ''
+    )
+    return {
+        "nama": pendaftar_data.get('namalengkap', ''),
+        "nisn": pendaftar_data.get('nisn', ''),
+        "telepon": telepon,
+    }
+
+
+def _bulk_update(request_handler, data: Dict[str, Any], p_status: str, p_alasan: Optional[str], p_verified_by: str):
+    """
+    PATCH /api/pendaftar_status
+    Body: { ids: [1, 2, ...] | filter: { status?, q?, gelombang? }, status, alasan?, verifiedBy? }
+    Response: { success, updated, failed: [{ id, error }], ids: [...], pendaftar?: [...] }
+
+    Each update returns its rows (return=representation), so nothing is
+    read back. ids go out in chunks of BULK_CHUNK_SIZE; a failed chunk
+    or an unknown id is reported in `failed` without undoing the rest.
+    """
+    supa = supabase_client(service_role=True)
+    update_payload = build_update_payload(p_status, p_alasan, p_verified_by)
+    updated_rows: List[Dict[str, Any]] = []
+    failed: List[Dict[str, Any]] = []
+
+    if data.get("ids") is not None:
+        raw_ids = data["ids"]
+        if not isinstance(raw_ids, list) or not raw_ids:
+            send_json(request_handler, 400, {"success": False, "error": "ids must be a non-empty list"})
+            return
+        ids: List[int] = []
+        for raw_id in raw_ids:
+            try:
+                p_id = int(raw_id)
+            except (TypeError, ValueError):
+                failed.append({"id": raw_id, "error": "id tidak valid"})
+                continue
+            if p_id not in ids:
+                ids.append(p_id)
+        if len(ids) > MAX_BULK_IDS:
+            send_json(request_handler, 400, {"success": False, "error": f"Maksimal {MAX_BULK_IDS} id per request"})
+            return
+
+        for start in range(0, len(ids), BULK_CHUNK_SIZE):
+            chunk = ids[start:start + BULK_CHUNK_SIZE]
+            try:
+                result = supa.table("pendaftar").update(update_payload).in_("id", chunk).execute()
+            except Exception as chunk_error:
+                print(f"[VERIFIKASI] Bulk update failed for {len(chunk)} ids: {chunk_error}")
+                failed.extend({"id": p_id, "error": str(chunk_error)} for p_id in chunk)
+                continue
+            rows = result.data or []  # type: ignore
+            updated_rows.extend(rows)
+            found = {row.get("id") for row in rows}
+            failed.extend({"id": p_id, "error": "Pendaftar tidak ditemukan"} for p_id in chunk if p_id not in found)
+    else:
+        # A whole filtered set, with the same filters as pendaftar_list
+        from lib.handlers._search_helpers import parse_search
+        from lib.handlers.pendaftar_list import apply_filters
+
+        filters = data.get("filter")
+        if not isinstance(filters, dict):
+            send_json(request_handler, 400, {"success": False, "error": "id, ids or filter is required"})
+            return
+        status_filter = str(filters.get("status") or "").strip()
+        gelombang = str(filters.get("gelombang") or "").strip()
+        term = parse_search(str(filters.get("q") or ""))
+        if not (status_filter or gelombang or term):
+            # Never update every applicant by accident
+            send_json(request_handler, 400, {
+                "success": False,
+                "error": "filter needs at least one of status, q, gelombang",
+            })
+            return
+
+        query = apply_filters(supa.table("pendaftar").update(update_payload), status_filter, term)
+        if gelombang:
+            query = query.eq("gelombang", gelombang)
+        result = query.execute()
+        updated_rows = result.data or []  # type: ignore
+
+    print(f"[VERIFIKASI] Bulk status {p_status}: {len(updated_rows)} updated, {len(failed)} failed")
+    response_data: Dict[str, Any] = {
+        "success": not failed,
+        "message": f"{len(updated_rows)} pendaftar berhasil diubah menjadi {p_status}",
+        "updated": len(updated_rows),
+        "ids": [row.get("id") for row in updated_rows],
+        "failed": failed,
+    }
+    if p_status == 'DITERIMA':
+        response_data["pendaftar"] = [dict(contact_info(row), id=row.get("id")) for row in updated_rows]
+    if not failed:
+        status_code = 200
+    elif updated_rows:
+        status_code = 207  # partial: see failed
+    else:
+        status_code = 404
+    send_json(request_handler, status_code, response_data)
+
 
 class handler(BaseHTTPRequestHandler):
     def do_PATCH(self):
@@ -9,6 +140,8 @@ class handler(BaseHTTPRequestHandler):
         PATCH /api/pendaftar_status
         Body: { id: 123, status: "diterima" | "ditolak" | "pending" | "revisi", alasan?: "...", verifiedBy?: "admin@email.com" }
         Response: { success: true }
+
+        Bulk: send ids: [...] or filter: {...} instead of id (see _bulk_update).
         """
         try:
             # Parse request body
@@ -16,30 +149,24 @@ class handler(BaseHTTPRequestHandler):
             body = self.rfile.read(content_length).decode('utf-8')
             data = json.loads(body)
             
+            bulk = not data.get('id') and ("ids" in data or "filter" in data)
+
             # Validasi input wajib
-            if not data.get('id'):
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+            if not data.get('id') and not bulk:
+                send_json(self, 400, {
                     "success": False,
                     "error": "id is required"
-                }).encode())
+                })
                 return
                 
             if not data.get('status'):
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+                send_json(self, 400, {
                     "success": False,
                     "error": "status is required"
-                }).encode())
+                })
                 return
             
-            p_id = data["id"]
+            p_id = data.get("id")
             p_status_input = data["status"]
             
             # Normalisasi status input (support both uppercase and lowercase)
@@ -66,62 +193,35 @@ class handler(BaseHTTPRequestHandler):
             p_status = status_mapping.get(p_status_normalized, p_status_normalized)
             
             # Validasi status value
-            valid_statuses = ['PENDING', 'REVISI', 'DITERIMA', 'DITOLAK']
-            if p_status not in valid_statuses:
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+            if p_status not in VALID_STATUSES:
+                send_json(self, 400, {
                     "success": False,
-                    "error": f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
-                }).encode())
+                    "error": f"Invalid status. Must be one of: {', '.join(VALID_STATUSES)}"
+                })
                 return
-            
+
+            if bulk:
+                _bulk_update(self, data, p_status, p_alasan, p_verified_by)
+                return
+
             # Update dengan service-role
             supa = supabase_client(service_role=True)
-            
-            # Prepare update payload dengan field yang konsisten
-            update_payload: Dict[str, Any] = {
-                "statusberkas": p_status,
-            }
-            
-            # Add alasan/catatan if provided
-            if p_alasan:
-                update_payload["alasan"] = p_alasan
-            
-            # Add verified information for non-pending status
-            if p_status != 'PENDING':
-                update_payload["verifiedby"] = p_verified_by
-                update_payload["verifiedat"] = "now()"  # Timestamp verifikasi
-            
-            # Execute update
+
+            # Execute update; PostgREST returns the updated row (return=representation),
+            # which is the full record needed below, so there is no second read
+            update_payload = build_update_payload(p_status, p_alasan, p_verified_by)
             result = supa.table("pendaftar").update(update_payload).eq("id", p_id).execute()
-            
+
             # Validasi hasil update
             if not result.data:  # type: ignore
-                self.send_response(404)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps({
+                send_json(self, 404, {
                     "success": False,
                     "error": "Pendaftar tidak ditemukan"
-                }).encode())
+                })
                 return
-            
-            # Get FULL pendaftar data for response (untuk WhatsApp manual di frontend)
-            # Update query mungkin tidak return semua field, jadi query lagi untuk dapat semua field
-            print(f"[VERIFIKASI] Fetching full pendaftar data for ID: {p_id}")
-            full_data_result = supa.table("pendaftar").select("*").eq("id", p_id).execute()
-            
-            if full_data_result.data:
-                pendaftar_data = full_data_result.data[0]
-                print(f"[VERIFIKASI] Full data fetched. Available fields: {list(pendaftar_data.keys())}")
-            else:
-                pendaftar_data = result.data[0] if result.data else None
-                print(f"[VERIFIKASI] Using update result data")
-            
+
+            pendaftar_data = result.data[0]  # type: ignore
+
             # Response success
             response_data = {
                 "success": True,
@@ -130,43 +230,18 @@ class handler(BaseHTTPRequestHandler):
             
             # Include pendaftar data jika status DITERIMA (untuk WhatsApp manual)
             if p_status == 'DITERIMA' and pendaftar_data:
-                # Get phone number from multiple possible field names
-                telepon = (
-                    pendaftar_data.get('telepon_orang_tua') or 
-                    pendaftar_data.get('teleponorangtua') or 
-                    pendaftar_data.get('nomorhportu') or 
-                    pendaftar_data.get('nomorhp') or 
-                    ''
-                )
-                
+                response_data["pendaftar"] = contact_info(pendaftar_data)
+                telepon = response_data["pendaftar"]["telepon"]
                 print(f"[VERIFIKASI] Phone number found: {telepon[:6] if telepon else 'NONE'}...")
-                
-                response_data["pendaftar"] = {
-                    "nama": pendaftar_data.get('namalengkap', ''),
-                    "nisn": pendaftar_data.get('nisn', ''),
-                    "telepon": telepon,
-                }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode())
+
+            send_json(self, 200, response_data)
             
         except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            send_json(self, 500, {
                 "success": False,
                 "error": str(e)
-            }).encode())
+            })
     
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'PATCH, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
\ No newline at end of file
+        allow_cors(self, ['PATCH', 'OPTIONS'])
@@ -2,6 +2,7 @@ from http.server import BaseHTTPRequestHandler
 import json
 import re
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, send_json
 
 
 class handler(BaseHTTPRequestHandler):
@@ -14,12 +15,7 @@ class handler(BaseHTTPRequestHandler):
 
             pendaftar_id = data.get("id")
             if not pendaftar_id:
-                self.send_response(400)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({"ok": False, "error": "ID required"}).encode()
-                )
+                send_json(self, 400, {"ok": False, "error": "ID required"})
                 return
 
             # Prepare update data dengan validasi
@@ -29,12 +25,7 @@ class handler(BaseHTTPRequestHandler):
                 if data["file_ijazah"].startswith(('http://', 'https://')):
                     update_data["file_ijazah"] = data["file_ijazah"]
                 else:
-                    self.send_response(400)
-                    self.send_header("Content-type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(
-                        json.dumps({"ok": False, "error": "URL file_ijazah tidak valid"}).encode()
-                    )
+                    send_json(self, 400, {"ok": False, "error": "URL file_ijazah tidak valid"})
                     return
                     
             if data.get("file_akta"):
@@ -42,12 +33,7 @@ class handler(BaseHTTPRequestHandler):
                 if data["file_akta"].startswith(('http://', 'https://')):
                     update_data["file_akta"] = data["file_akta"]
                 else:
-                    self.send_response(400)
-                    self.send_header("Content-type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(
-                        json.dumps({"ok": False, "error": "URL file_akta tidak valid"}).encode()
-                    )
+                    send_json(self, 400, {"ok": False, "error": "URL file_akta tidak valid"})
                     return
                     
             if data.get("file_foto"):
@@ -55,12 +41,7 @@ class handler(BaseHTTPRequestHandler):
                 if data["file_foto"].startswith(('http://', 'https://')):
                     update_data["file_foto"] = data["file_foto"]
                 else:
-                    self.send_response(400)
-                    self.send_header("Content-type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(
-                        json.dumps({"ok": False, "error": "URL file_foto tidak valid"}).encode()
-                    )
+                    send_json(self, 400, {"ok": False, "error": "URL file_foto tidak valid"})
                     return
                     
 
@@ -69,12 +50,7 @@ class handler(BaseHTTPRequestHandler):
                 if data["file_kk"].startswith(('http://', 'https://')):
                     update_data["file_kk"] = data["file_kk"]
                 else:
-                    self.send_response(400)
-                    self.send_header("Content-type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(
-                        json.dumps({"ok": False, "error": "URL file_kk tidak valid"}).encode()
-                    )
+                    send_json(self, 400, {"ok": False, "error": "URL file_kk tidak valid"})
                     return
                     
             if data.get("file_bpjs"):
@@ -82,21 +58,11 @@ class handler(BaseHTTPRequestHandler):
                 if data["file_bpjs"].startswith(('http://', 'https://')):
                     update_data["file_bpjs"] = data["file_bpjs"]
                 else:
-                    self.send_response(400)
-                    self.send_header("Content-type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(
-                        json.dumps({"ok": False, "error": "URL file_bpjs tidak valid"}).encode()
-                    )
+                    send_json(self, 400, {"ok": False, "error": "URL file_bpjs tidak valid"})
                     return
 
             if not update_data:
-                self.send_response(400)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({"ok": False, "error": "No valid files to update"}).encode()
-                )
+                send_json(self, 400, {"ok": False, "error": "No valid files to update"})
                 return
 
             # Get Supabase client with service role for admin operations
@@ -113,32 +79,14 @@ class handler(BaseHTTPRequestHandler):
 
             # Validasi hasil update
             if not response.data:
-                self.send_response(404)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({"ok": False, "error": "Pendaftar tidak ditemukan"}).encode()
-                )
+                send_json(self, 404, {"ok": False, "error": "Pendaftar tidak ditemukan"})
                 return
 
             # Return success
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(json.dumps({"ok": True, "message": "File berhasil diupdate"}).encode())
+            send_json(self, 200, {"ok": True, "message": "File berhasil diupdate"})
 
         except Exception as e:
-            self.send_response(500)
-            self.send_header("Content-type", "application/json")
-            self.end_headers()
-            self.wfile.write(
-                json.dumps({"ok": False, "error": str(e)}).encode()
-            )
+            send_json(self, 500, {"ok": False, "error": str(e)})
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
\ No newline at end of file
+        allow_cors(self, ['POST', 'OPTIONS'])
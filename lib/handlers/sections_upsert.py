@@ -8,16 +8,13 @@ import json
 import os
 
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import invalidate_cache, allow_cors, send_json
 
 ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN")
 
 
 def _unauthorized(handler):
-    handler.send_response(401)
-    handler.send_header("Content-Type", "application/json")
-    handler.send_header("Access-Control-Allow-Origin", "*")
-    handler.end_headers()
-    handler.wfile.write(json.dumps({"error": "Unauthorized"}).encode("utf-8"))
+    send_json(handler, 401, {"error": "Unauthorized"})
 
 
 class handler(BaseHTTPRequestHandler):
@@ -37,20 +34,12 @@ class handler(BaseHTTPRequestHandler):
             raw_body = self.rfile.read(content_length) if content_length else b""
             payload = json.loads(raw_body.decode("utf-8") or "{}") if raw_body else {}
         except json.JSONDecodeError:
-            self.send_response(400)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": "Invalid JSON body"}).encode("utf-8"))
+            send_json(self, 400, {"error": "Invalid JSON body"})
             return
 
         slug = payload.get("slug")
         if not slug or not isinstance(slug, str):
-            self.send_response(400)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": "Invalid slug"}).encode("utf-8"))
+            send_json(self, 400, {"error": "Invalid slug"})
             return
 
         try:
@@ -93,30 +82,15 @@ class handler(BaseHTTPRequestHandler):
                     rows,
                     on_conflict="section_id,locale",
                 ).execute()
+            invalidate_cache("locales:")
 
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(json.dumps({"ok": True, "section_id": section_id}).encode("utf-8"))
+            send_json(self, 200, {"ok": True, "section_id": section_id})
 
         except Exception as exc:
-            self.send_response(500)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": str(exc) or "server error"}).encode("utf-8"))
+            send_json(self, 500, {"error": str(exc) or "server error"})
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization")
-        self.end_headers()
+        allow_cors(self, ['POST', 'OPTIONS'], 'Content-Type, Authorization')
 
     def _method_not_allowed(self):
-        self.send_response(405)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.end_headers()
-        self.wfile.write(json.dumps({"error": "Method not allowed"}).encode("utf-8"))
+        send_json(self, 405, {"error": "Method not allowed"})
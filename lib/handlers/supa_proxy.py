@@ -10,7 +10,9 @@ Proxy Supabase REST (PostgREST) dengan CORS & multi-tabel.
 
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs, urlencode
-import json, requests
+import requests
+from lib._http import http_request
+from lib.handlers._crud_helpers import allow_cors, send_body, send_json
 
 # === Dewa Satria - Supabase Project Settings ===
 SUPABASE_URL = "https://pislnvhdmsxudltcuuku.supabase.co"
@@ -21,11 +23,14 @@ TIMEOUT_SEC = 30
 ALLOWED_TABLES = ["berita", "prestasi", "sambutan", "profile_pondok", "pendaftar"]
 # ==============================================
 
-def _cors_headers(h: BaseHTTPRequestHandler):
-    h.send_header("Access-Control-Allow-Origin", ALLOWED_ORIGIN)
-    h.send_header("Access-Control-Allow-Methods", "GET, POST, PUT, PATCH, DELETE, OPTIONS")
-    h.send_header("Access-Control-Allow-Headers", "authorization, apikey, content-type, prefer, range, if-match, accept")
-    h.send_header("Vary", "Origin")
+CORS_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+CORS_ALLOW_HEADERS = "authorization, apikey, content-type, prefer, range, if-match, accept"
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": ALLOWED_ORIGIN,
+    "Access-Control-Allow-Methods": ", ".join(CORS_METHODS),
+    "Access-Control-Allow-Headers": CORS_ALLOW_HEADERS,
+    "Vary": "Origin",
+}
 
 def _extract_table_and_query(path: str):
     parsed = urlparse(path)
@@ -60,11 +65,7 @@ def _read_body(h: BaseHTTPRequestHandler):
     return h.rfile.read(ln) if ln > 0 else None
 
 def _finish_json(h: BaseHTTPRequestHandler, status: int, payload: dict):
-    h.send_response(status)
-    _cors_headers(h)
-    h.send_header("Content-Type", "application/json; charset=utf-8")
-    h.end_headers()
-    h.wfile.write(json.dumps(payload).encode("utf-8"))
+    send_json(h, status, payload, CORS_HEADERS)
 
 def _forward(method: str, h: BaseHTTPRequestHandler):
     table, fwd_qs = _extract_table_and_query(h.path)
@@ -79,24 +80,33 @@ def _forward(method: str, h: BaseHTTPRequestHandler):
     headers = _supabase_headers(h)
 
     try:
-        resp = requests.request(method, target, headers=headers, data=body, timeout=TIMEOUT_SEC)
+        resp = http_request(method, target, headers=headers, data=body, timeout=TIMEOUT_SEC)
     except requests.RequestException as e:
         return _finish_json(h, 502, {"success": False, "error": f"Upstream error: {str(e)}"})
 
-    h.send_response(resp.status_code)
-    _cors_headers(h)
-    for hk in ["content-type", "content-range", "content-location", "etag"]:
+    extra = dict(CORS_HEADERS)
+    for hk in ["content-range", "content-location"]:
         hv = resp.headers.get(hk)
         if hv:
-            h.send_header(hk.title(), hv)
-    h.end_headers()
-    h.wfile.write(resp.content)
+            extra[hk.title()] = hv
+    send_body(
+        h,
+        resp.status_code,
+        resp.content,
+        content_type=resp.headers.get("content-type"),
+        extra_headers=extra,
+        etag=resp.headers.get("etag"),
+    )
 
 class handler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
-        self.send_response(204)
-        _cors_headers(self)
-        self.end_headers()
+        allow_cors(
+            self,
+            CORS_METHODS,
+            CORS_ALLOW_HEADERS,
+            status_code=204,
+            extra_headers={"Access-Control-Allow-Origin": ALLOWED_ORIGIN, "Vary": "Origin"},
+        )
 
     def do_GET(self): _forward("GET", self)
     def do_POST(self): _forward("POST", self)
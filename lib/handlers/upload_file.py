@@ -4,11 +4,21 @@ import base64
 import re
 from datetime import datetime
 from io import BytesIO
-from PIL import Image
+from typing import TYPE_CHECKING
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import allow_cors, send_json
+from lib.handlers._upload_helpers import UploadError, is_json_request, read_upload
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Batas body binary (sebelum kompresi server); hasil akhir tetap maks 5MB
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
 
 # ---------- Utilities (format-preserving) ----------
-def _maybe_downscale(img: Image.Image, max_side: int = 1600) -> Image.Image:
+def _maybe_downscale(img: "Image.Image", max_side: int = 1600) -> "Image.Image":
+    from PIL import Image
+
     w, h = img.size
     if max(w, h) > max_side:
         if w >= h:
@@ -28,6 +38,12 @@ def compress_image_keep_format(file_data: bytes, target_kb: int, orig_ext: str):
     Return: (bytes_hasil, ext_out, mime_out)
     """
     ext = (orig_ext or "jpg").lower()
+    if ext not in ["jpg", "jpeg", "png"]:
+        # bukan gambar
+        return file_data, ext, None
+
+    # PIL hanya dimuat saat memang ada gambar yang perlu dikompres
+    from PIL import Image
 
     if ext in ["jpg", "jpeg"]:
         img = Image.open(BytesIO(file_data)).convert("RGB")
@@ -105,59 +121,65 @@ def compress_image_keep_format(file_data: bytes, target_kb: int, orig_ext: str):
             best_bytes = file_data
         return best_bytes, "png", "image/png"
 
-    # bukan gambar
-    return file_data, ext, None
-
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
-        # === helper lokal: tidak bergantung pada atribut class lain ===
-        def send_json(code: int, payload: dict):
-            self.send_response(code)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(json.dumps(payload).encode())
-
         try:
-            length = int(self.headers.get("Content-Length", "0") or "0")
-            raw = self.rfile.read(length)
-            try:
-                data = json.loads(raw.decode("utf-8"))
-            except Exception as e:
-                return send_json(400, {"ok": False, "error": f"Invalid JSON body: {e}"})
+            upload = None
+            file_base64 = None
+            if is_json_request(self):
+                length = int(self.headers.get("Content-Length", "0") or "0")
+                raw = self.rfile.read(length)
+                try:
+                    data = json.loads(raw.decode("utf-8"))
+                except Exception as e:
+                    return send_json(self, 400, {"ok": False, "error": f"Invalid JSON body: {e}"})
+                file_base64 = data.get("file")
+            else:
+                # multipart/form-data atau raw body: file tidak lewat base64
+                try:
+                    upload = read_upload(self, MAX_UPLOAD_BYTES)
+                except UploadError as e:
+                    return send_json(self, e.status, {"ok": False, "error": str(e)})
+                data = upload.fields
 
-            file_base64 = data.get("file")
-            file_name   = data.get("fileName")
+            file_name   = data.get("fileName") or (upload.filename if upload else None)
             file_type   = data.get("fileType")
             nisn        = data.get("nisn")
             already_compressed = data.get("alreadyCompressed", False)
-            client_mime_type = data.get("mimeType")
+            client_mime_type = data.get("mimeType") or (upload.content_type if upload else None)
+            if isinstance(already_compressed, str):
+                already_compressed = already_compressed.strip().lower() in ("1", "true", "yes")
 
-            print(f"[REQ] upload_file: name={file_name}, type={file_type}, nisn={nisn}, client_compressed={already_compressed}")
+            print(f"[REQ] upload_file: name={file_name}, type={file_type}, nisn={nisn}, client_compressed={already_compressed}, mode={'json' if upload is None else 'binary'}")
 
             # Validasi input
-            if not all([file_base64, file_name, nisn]):
-                return send_json(400, {"ok": False, "error": "Missing required fields: file, fileName, nisn"})
+            if not all([upload.data if upload else file_base64, file_name, nisn]):
+                return send_json(self, 400, {"ok": False, "error": "Missing required fields: file, fileName, nisn"})
 
             if nisn == "undefined" or not str(nisn).strip():
-                return send_json(400, {"ok": False, "error": "NISN tidak valid"})
+                return send_json(self, 400, {"ok": False, "error": "NISN tidak valid"})
 
             if not re.match(r"^\d{10}$", str(nisn)):
-                return send_json(400, {"ok": False, "error": "Format NISN tidak valid. Harus 10 digit angka"})
+                return send_json(self, 400, {"ok": False, "error": "Format NISN tidak valid. Harus 10 digit angka"})
 
-            # Ambil base64 data (hilangkan prefix data:)
-            if isinstance(file_base64, str) and file_base64.startswith("data:"):
-                try:
-                    file_base64 = file_base64.split(",", 1)[1]
-                except Exception:
-                    return send_json(400, {"ok": False, "error": "Format data URL tidak valid"})
+            if upload is not None:
+                file_data = upload.data
+            else:
+                # Ambil base64 data (hilangkan prefix data:)
+                if isinstance(file_base64, str) and file_base64.startswith("data:"):
+                    try:
+                        file_base64 = file_base64.split(",", 1)[1]
+                    except Exception:
+                        return send_json(self, 400, {"ok": False, "error": "Format data URL tidak valid"})
 
-            # Decode
-            try:
-                file_data = base64.b64decode(file_base64)
-            except Exception as e:
-                return send_json(400, {"ok": False, "error": f"Gagal decode file: {e}"})
+                # Decode
+                try:
+                    file_data = base64.b64decode(file_base64)
+                except Exception as e:
+                    return send_json(self, 400, {"ok": False, "error": f"Gagal decode file: {e}"})
+                # The base64 string is no longer needed; drop it before compressing
+                file_base64 = raw = data = None
 
             print(f"[INFO] decoded bytes: {len(file_data)}")
 
@@ -165,7 +187,7 @@ class handler(BaseHTTPRequestHandler):
             allowed = ["jpg", "jpeg", "png", "pdf", "doc", "docx"]
             ext = (file_name.split(".")[-1] or "").lower()
             if ext not in allowed:
-                return send_json(400, {"ok": False, "error": f"Tipe file tidak diizinkan. Hanya: {', '.join(allowed)}"})
+                return send_json(self, 400, {"ok": False, "error": f"Tipe file tidak diizinkan. Hanya: {', '.join(allowed)}"})
 
             # Kompresi gambar berdasarkan flag alreadyCompressed dari client
             forced_mime = None
@@ -191,7 +213,7 @@ class handler(BaseHTTPRequestHandler):
 
             # Batas akhir server
             if len(file_data) > 5 * 1024 * 1024:
-                return send_json(400, {"ok": False, "error": "Ukuran file maksimal 5MB setelah kompres"})
+                return send_json(self, 400, {"ok": False, "error": "Ukuran file maksimal 5MB setelah kompres"})
 
             # Filename unik (gunakan file_name dari client, karena sudah diformat di client)
             unique_filename = f"{nisn}/{file_name}"
@@ -220,7 +242,7 @@ class handler(BaseHTTPRequestHandler):
                 public_url = supa.storage.from_("pendaftar-files").get_public_url(unique_filename)
                 print(f"[INFO] public url: {public_url}")
 
-                return send_json(200, {"ok": True, "url": public_url, "filename": unique_filename})
+                return send_json(self, 200, {"ok": True, "url": public_url, "filename": unique_filename})
             except Exception as e:
                 msg = str(e)
                 print(f"[ERR] upload error: {msg}")
@@ -228,16 +250,12 @@ class handler(BaseHTTPRequestHandler):
                     msg = "Storage bucket 'pendaftar-files' belum dibuat. Silakan buat bucket di Supabase Dashboard > Storage."
                 elif "duplicate" in msg.lower():
                     msg = "File dengan nama yang sama sudah ada."
-                return send_json(500, {"ok": False, "error": msg})
+                return send_json(self, 500, {"ok": False, "error": msg})
 
         except Exception as e:
             # last-resort error handler
             print(f"[FATAL] {e}")
-            return send_json(500, {"ok": False, "error": f"Internal error: {e}"})
+            return send_json(self, 500, {"ok": False, "error": f"Internal error: {e}"})
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['POST', 'OPTIONS'])
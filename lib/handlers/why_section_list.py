@@ -3,12 +3,18 @@ API Handler: GET /api/why_section_list
 Fetch Why Section content (narasi)
 """
 from http.server import BaseHTTPRequestHandler
-import json
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import send_json, send_cached_json, allow_cors
+
+CACHE_KEY = "why_section_list"
+CACHE_HEADERS = {"Cache-Control": "public, max-age=300, s-maxage=600, stale-while-revalidate=1800"}
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         try:
+            if send_cached_json(self, CACHE_KEY, CACHE_HEADERS):
+                return
+
             print("[WHY_SECTION_LIST] Fetching Why Section content...")
             
             # Get Supabase client
@@ -70,13 +76,7 @@ class handler(BaseHTTPRequestHandler):
                     raise db_error
             
             # Send success response
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.send_header("Cache-Control", "public, max-age=300, s-maxage=600, stale-while-revalidate=1800")
-            self.end_headers()
-            
-            self.wfile.write(json.dumps(response).encode())
+            send_json(self, 200, response, CACHE_HEADERS, cache_key=CACHE_KEY)
             print("[WHY_SECTION_LIST] ✅ Success")
             
         except Exception as e:
@@ -85,13 +85,7 @@ class handler(BaseHTTPRequestHandler):
             traceback.print_exc()
             
             # Send error response with default data as fallback
-            self.send_response(200)  # Return 200 with error flag instead of 500
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.send_header("Cache-Control", "public, max-age=60, s-maxage=120, stale-while-revalidate=300")
-            self.end_headers()
-            
-            # Return default content even on error (graceful degradation)
+            # Return 200 with error flag instead of 500, and default content even on error (graceful degradation)
             fallback_payload = {
                 "title": default_data["title"],
                 "subtitle": default_data["subtitle"],
@@ -101,15 +95,11 @@ class handler(BaseHTTPRequestHandler):
                 "content_en": default_data["content_en"]
             }
 
-            self.wfile.write(json.dumps({
+            send_json(self, 200, {
                 "ok": True,
                 "data": fallback_payload,
                 "error": str(e)  # Include error for debugging
-            }).encode())
+            }, {"Cache-Control": "public, max-age=60, s-maxage=120, stale-while-revalidate=300"})
     
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['GET', 'OPTIONS'])
@@ -5,6 +5,7 @@ Update Why Section content (narasi)
 from http.server import BaseHTTPRequestHandler
 import json
 from lib._supabase import supabase_client
+from lib.handlers._crud_helpers import invalidate_cache, allow_cors, send_json
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
@@ -53,20 +54,16 @@ class handler(BaseHTTPRequestHandler):
                 # Insert new record
                 result = supa.table("why_section").insert(update_data).execute()
                 print("[WHY_SECTION_UPDATE] ✅ Inserted new record")
+            invalidate_cache("why_section_list")
             
             # Send success response
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
             response = {
                 "ok": True,
                 "message": "Why Section berhasil diupdate",
                 "data": result.data[0] if result.data else update_data
             }
             
-            self.wfile.write(json.dumps(response).encode())
+            send_json(self, 200, response)
             print("[WHY_SECTION_UPDATE] ✅ Success")
             
         except Exception as e:
@@ -74,19 +71,10 @@ class handler(BaseHTTPRequestHandler):
             import traceback
             traceback.print_exc()
             
-            self.send_response(500)
-            self.send_header("Content-type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            
-            self.wfile.write(json.dumps({
+            send_json(self, 500, {
                 "ok": False,
                 "error": str(e)
-            }).encode())
+            })
     
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        allow_cors(self, ['POST', 'OPTIONS'])
@@ -0,0 +1,184 @@
+"""
+Cold-start import cost per router action (local tool, not an API handler).
+
+Runs `python -X importtime` in a fresh interpreter for each action, so every
+measurement is a true cold import, and lists the modules pulled in by that
+action's handler (on top of api/index.py itself), most expensive first.
+
+Usage (from the project root):
+    python -m lib.importtime_report                      # all actions
+    python -m lib.importtime_report locales pendaftar_cek_status
+    python -m lib.importtime_report locales --top 15 --budget-ms 250
+    python -m lib.importtime_report --no-client          # handler imports only
+
+`supabase` is imported lazily, on the first supabase_client() call, so a
+handler import alone hides the biggest cost a DB-backed action pays on a
+cold start. For every action whose handler pulls in lib/_supabase.py the
+probe therefore also builds a client (with placeholder credentials, no
+network) and reports that separately ("client"); it counts toward the
+total and the budget. --no-client measures the handler import only.
+
+With --budget-ms the exit code is 1 when any selected action's total
+cold-start cost goes over the budget, so it can gate a pre-deploy check.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+_MARKER = "--importtime-report-start--"
+_CLIENT_MARKER = "--importtime-report-client--"
+# Placeholders so supabase_client() can build a client; nothing is sent
+_PLACEHOLDER_ENV = {
+    "SUPABASE_URL": "http://127.0.0.1:9",
+    "SUPABASE_SERVICE_ROLE_KEY": "importtime.report.placeholder",
+}
+
+# Import the router first, then resolve a single action; only import lines
+# printed after the marker belong to the action's handler module. With
+# argv[2] == "1", a DB-backed action then builds its Supabase client: the
+# import lines after the client marker are the deferred imports, and the
+# marker's last line carries the factory's wall time in microseconds.
+_PROBE = (
+    "import sys, time\n"
+    "import api.index as router\n"
+    f"sys.stderr.write({_MARKER!r} + '\\n')\n"
+    "sys.stderr.flush()\n"
+    "router._resolve_handler(sys.argv[1])\n"
+    "if sys.argv[2] == '1' and 'lib._supabase' in sys.modules:\n"
+    f"    sys.stderr.write({_CLIENT_MARKER!r} + '\\n')\n"
+    "    sys.stderr.flush()\n"
+    "    started = time.perf_counter()\n"
+    "    sys.modules['lib._supabase'].supabase_client(service_role=True)\n"
+    "    elapsed_us = int((time.perf_counter() - started) * 1e6)\n"
+    f"    sys.stderr.write({_CLIENT_MARKER!r} + ' %d\\n' % elapsed_us)\n"
+)
+
+
+def _parse_importtime(lines: List[str]) -> List[Tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for the importtime lines."""
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            # Header line ("self [us] | cumulative | imported package")
+            continue
+        entries.append((parts[2].strip(), self_us, cumulative_us))
+    return entries
+
+
+def _split_probe_output(stderr: str) -> Tuple[List[str], List[str], Optional[int]]:
+    """(handler import lines, client import lines, client wall time in us or None)."""
+    lines = stderr.splitlines()
+    if _MARKER in lines:
+        lines = lines[lines.index(_MARKER) + 1:]
+    if _CLIENT_MARKER not in lines:
+        return lines, [], None
+    start = lines.index(_CLIENT_MARKER)
+    handler_lines, client_lines = lines[:start], lines[start + 1:]
+    client_us = None
+    for index, line in enumerate(client_lines):
+        if line.startswith(_CLIENT_MARKER + " "):
+            client_us = int(line.split()[-1])
+            client_lines = client_lines[:index]
+            break
+    return handler_lines, client_lines, client_us
+
+
+def _top_level_us(entries: List[Tuple[str, int, int]]) -> int:
+    # Top-level imports have no leading spaces in the package column, so
+    # their cumulative times add up without overlap.
+    return sum(cum for name, _, cum in entries if not name.startswith(" "))
+
+
+def measure_action(action: str, with_client: bool = True) -> Dict[str, object]:
+    """
+    Import one action's handler in a fresh interpreter and report its cost;
+    with_client also builds the Supabase client a DB-backed action needs.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH", "")])
+    )
+    env.update(_PLACEHOLDER_ENV)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, action, "1" if with_client else "0"],
+        cwd=str(PROJECT_ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    handler_lines, client_lines, client_us = _split_probe_output(proc.stderr)
+    entries = _parse_importtime(handler_lines)
+    client_entries = _parse_importtime(client_lines)
+    import_us = _top_level_us(entries)
+    # The factory's wall time covers its imports plus building the client
+    client_us = client_us if client_us is not None else _top_level_us(client_entries)
+    error = None
+    if proc.returncode != 0:
+        tail = [line for line in proc.stderr.splitlines() if line and not line.startswith("import time:")]
+        error = tail[-1] if tail else f"exit code {proc.returncode}"
+
+    return {
+        "action": action,
+        "total_ms": round((import_us + client_us) / 1000, 2),
+        "import_ms": round(import_us / 1000, 2),
+        "client_ms": round(client_us / 1000, 2),
+        "modules": sorted(
+            ((name.strip(), round(self_us / 1000, 2), round(cum / 1000, 2)) for name, self_us, cum in entries + client_entries),
+            key=lambda item: -item[2],
+        ),
+        "error": error,
+    }
+
+
+def main(argv=None) -> int:
+    sys.path.insert(0, str(PROJECT_ROOT))
+    from api.index import ACTIONS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("actions", nargs="*", help="actions to measure (default: all)")
+    parser.add_argument("--top", type=int, default=10, help="modules listed per action")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail when an action exceeds this")
+    parser.add_argument("--no-client", action="store_true", help="skip building the Supabase client (handler imports only)")
+    args = parser.parse_args(argv)
+
+    selected = args.actions or sorted(ACTIONS)
+    unknown = [action for action in selected if action not in ACTIONS]
+    if unknown:
+        parser.error(f"Unknown action(s): {', '.join(unknown)}")
+
+    reports = [measure_action(action, with_client=not args.no_client) for action in selected]
+    reports.sort(key=lambda report: -report["total_ms"])
+
+    over_budget = []
+    for report in reports:
+        print(
+            f"{report['action']:<28} {report['total_ms']:>9.2f} ms  "
+            f"(import {report['import_ms']:.2f} + client {report['client_ms']:.2f})  ({ACTIONS[report['action']][0]})"
+        )
+        if report["error"]:
+            print(f"    ! {report['error']}")
+        for name, self_ms, cum_ms in report["modules"][: args.top]:
+            print(f"    {cum_ms:>9.2f} ms cumulative {self_ms:>9.2f} ms self  {name}")
+        if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+            over_budget.append(report["action"])
+
+    if over_budget:
+        print(f"\nOver budget ({args.budget_ms} ms): {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
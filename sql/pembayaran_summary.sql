@@ -0,0 +1,48 @@
+-- =====================================================
+-- PAYMENT SUMMARY FOR /api/pembayaran_list
+-- Run this SQL in Supabase SQL Editor (after sql/search.sql)
+-- =====================================================
+--
+-- One grouped count (status_pembayaran, count(*)) instead of five count
+-- queries per page view. p_query is filtered the way the API filters the
+-- page (lib/handlers/_search_helpers.py): 10 digits = NISN, 16 digits =
+-- NIK, anything else a substring match on nama_lengkap / nisn / nik.
+-- NULL status counts as PENDING.
+
+CREATE OR REPLACE FUNCTION public.pembayaran_summary(p_query text DEFAULT NULL)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  WITH term AS (
+    SELECT
+      nullif(btrim(coalesce(p_query, '')), '') AS q,
+      public.search_like_escape(btrim(coalesce(p_query, ''))) AS esc
+  ),
+  grouped AS (
+    SELECT coalesce(b.status_pembayaran, 'PENDING') AS status, count(*) AS n
+    FROM public.pembayaran b
+    CROSS JOIN term t
+    WHERE t.q IS NULL
+       OR (t.q ~ '^\d{10}$' AND b.nisn = t.q)
+       OR (t.q ~ '^\d{16}$' AND b.nik = t.q)
+       OR (
+         t.q !~ '^(\d{10}|\d{16})$'
+         AND (
+           b.nama_lengkap ILIKE '%' || t.esc || '%'
+           OR b.nisn ILIKE '%' || t.esc || '%'
+           OR b.nik ILIKE '%' || t.esc || '%'
+         )
+       )
+    GROUP BY 1
+  )
+  SELECT jsonb_build_object(
+    'pending', coalesce(sum(n) FILTER (WHERE status = 'PENDING'), 0),
+    'verified', coalesce(sum(n) FILTER (WHERE status = 'VERIFIED'), 0),
+    'rejected', coalesce(sum(n) FILTER (WHERE status = 'REJECTED'), 0),
+    'total', coalesce(sum(n), 0)
+  )
+  FROM grouped;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.pembayaran_summary(text) TO service_role;
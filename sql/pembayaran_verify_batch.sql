@@ -0,0 +1,68 @@
+-- =====================================================
+-- BATCH PAYMENT VERIFICATION FOR /api/pembayaran_verify
+-- Run this SQL in Supabase SQL Editor
+-- =====================================================
+--
+-- Applies a whole batch of verify / reject decisions in one statement
+-- (the API has already resolved every NISN / NIK to a pembayaran id):
+--
+--   SELECT public.pembayaran_verify_batch(
+--     '[{"id": 12, "status": "VERIFIED", "catatan": ""},
+--       {"id": 15, "status": "REJECTED", "catatan": "Nominal kurang"}]',
+--     'admin'
+--   );
+--
+-- Applicants whose payment becomes VERIFIED are moved to DITERIMA in the
+-- same transaction, as the single-item path does.
+-- Returns {"updated": [payment ids], "pendaftar_updated": [nisn]}.
+
+CREATE OR REPLACE FUNCTION public.pembayaran_verify_batch(
+  p_items jsonb,
+  p_verified_by text DEFAULT 'admin'
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_updated jsonb;
+  v_verified text[];
+  v_pendaftar jsonb;
+BEGIN
+  WITH items AS (
+    SELECT DISTINCT ON (i.id) i.id, upper(i.status) AS status, coalesce(i.catatan, '') AS catatan
+    FROM jsonb_to_recordset(coalesce(p_items, '[]'::jsonb)) AS i(id bigint, status text, catatan text)
+    WHERE upper(i.status) IN ('VERIFIED', 'REJECTED')
+  ),
+  updated AS (
+    UPDATE public.pembayaran b
+    SET status_pembayaran = i.status,
+        verified_by = p_verified_by,
+        catatan_admin = i.catatan,
+        tanggal_verifikasi = now(),
+        updated_at = now()
+    FROM items i
+    WHERE b.id = i.id
+    RETURNING b.id, b.nisn, b.status_pembayaran
+  )
+  SELECT
+    coalesce(jsonb_agg(id ORDER BY id), '[]'::jsonb),
+    coalesce(array_agg(DISTINCT nisn) FILTER (WHERE status_pembayaran = 'VERIFIED'), '{}')
+  INTO v_updated, v_verified
+  FROM updated;
+
+  WITH accepted AS (
+    UPDATE public.pendaftar p
+    SET statusberkas = 'DITERIMA',
+        verifiedby = p_verified_by,
+        verifiedat = now(),
+        updatedat = now()
+    WHERE p.nisn = ANY (v_verified)
+    RETURNING p.nisn
+  )
+  SELECT coalesce(jsonb_agg(nisn), '[]'::jsonb) INTO v_pendaftar FROM accepted;
+
+  RETURN jsonb_build_object('updated', v_updated, 'pendaftar_updated', v_pendaftar);
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.pembayaran_verify_batch(jsonb, text) TO service_role;
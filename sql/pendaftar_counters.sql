@@ -0,0 +1,142 @@
+-- =====================================================
+-- REGISTRATION COUNTERS FOR THE ADMIN DASHBOARD
+-- Run this SQL in Supabase SQL Editor (before sql/pendaftar_stats.sql)
+-- =====================================================
+--
+-- One row per (gelombang, statusberkas, jeniskelamin, rencanatingkat,
+-- rencanaprogram, provinsi) combination with the number of applicants in
+-- it. A row trigger on pendaftar keeps it in step inside the same
+-- transaction as the insert (pendaftar_create), the status change
+-- (pendaftar_status) or any other write, so pendaftar_stats() reads
+-- O(dimensions) rows instead of scanning every applicant.
+-- NULLs are stored as '' so they can be part of the primary key.
+--
+-- Reconcile / rebuild (also POST /api/pendaftar_counters_rebuild):
+--   SELECT public.pendaftar_counters_rebuild(true);   -- report drift only
+--   SELECT public.pendaftar_counters_rebuild();       -- rewrite from pendaftar
+
+-- 1. Counters table
+CREATE TABLE IF NOT EXISTS public.pendaftar_counters (
+  gelombang text NOT NULL DEFAULT '',
+  statusberkas text NOT NULL DEFAULT '',
+  jeniskelamin text NOT NULL DEFAULT '',
+  rencanatingkat text NOT NULL DEFAULT '',
+  rencanaprogram text NOT NULL DEFAULT '',
+  provinsi text NOT NULL DEFAULT '',
+  n bigint NOT NULL DEFAULT 0,
+  updated_at timestamp with time zone NOT NULL DEFAULT now(),
+  CONSTRAINT pendaftar_counters_pkey PRIMARY KEY (
+    gelombang, statusberkas, jeniskelamin, rencanatingkat, rencanaprogram, provinsi
+  )
+);
+
+-- Service role only (the API reads it through pendaftar_stats())
+ALTER TABLE public.pendaftar_counters ENABLE ROW LEVEL SECURITY;
+
+-- 2. Apply +1 / -1 for one pendaftar row
+CREATE OR REPLACE FUNCTION public.pendaftar_counters_bump(p_row public.pendaftar, p_delta integer)
+RETURNS void
+LANGUAGE sql
+AS $$
+  INSERT INTO public.pendaftar_counters AS c (
+    gelombang, statusberkas, jeniskelamin, rencanatingkat, rencanaprogram, provinsi, n
+  )
+  VALUES (
+    coalesce(p_row.gelombang, ''), coalesce(p_row.statusberkas, ''), coalesce(p_row.jeniskelamin, ''),
+    coalesce(p_row.rencanatingkat, ''), coalesce(p_row.rencanaprogram, ''), coalesce(p_row.provinsi, ''),
+    p_delta
+  )
+  ON CONFLICT (gelombang, statusberkas, jeniskelamin, rencanatingkat, rencanaprogram, provinsi)
+  DO UPDATE SET n = c.n + EXCLUDED.n, updated_at = now();
+$$;
+
+-- 3. Row trigger: INSERT +1, DELETE -1, UPDATE moves the row between groups
+CREATE OR REPLACE FUNCTION public.pendaftar_counters_sync()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' AND (
+    OLD.gelombang, OLD.statusberkas, OLD.jeniskelamin,
+    OLD.rencanatingkat, OLD.rencanaprogram, OLD.provinsi
+  ) IS NOT DISTINCT FROM (
+    NEW.gelombang, NEW.statusberkas, NEW.jeniskelamin,
+    NEW.rencanatingkat, NEW.rencanaprogram, NEW.provinsi
+  ) THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.pendaftar_counters_bump(OLD, -1);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM public.pendaftar_counters_bump(NEW, 1);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS pendaftar_counters_sync ON public.pendaftar;
+CREATE TRIGGER pendaftar_counters_sync
+  AFTER INSERT OR DELETE OR UPDATE OF
+    gelombang, statusberkas, jeniskelamin, rencanatingkat, rencanaprogram, provinsi
+  ON public.pendaftar
+  FOR EACH ROW EXECUTE FUNCTION public.pendaftar_counters_sync();
+
+-- 4. Reconcile / rebuild from pendaftar
+CREATE OR REPLACE FUNCTION public.pendaftar_counters_rebuild(p_dry_run boolean DEFAULT false)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_drift bigint;
+  v_groups bigint;
+  v_total bigint;
+BEGIN
+  -- Block writers (not readers) so the snapshot and the rewrite agree
+  LOCK TABLE public.pendaftar IN SHARE ROW EXCLUSIVE MODE;
+
+  CREATE TEMP TABLE _pendaftar_counters_actual ON COMMIT DROP AS
+  SELECT
+    coalesce(gelombang, '') AS gelombang, coalesce(statusberkas, '') AS statusberkas,
+    coalesce(jeniskelamin, '') AS jeniskelamin, coalesce(rencanatingkat, '') AS rencanatingkat,
+    coalesce(rencanaprogram, '') AS rencanaprogram, coalesce(provinsi, '') AS provinsi,
+    count(*) AS n
+  FROM public.pendaftar
+  GROUP BY 1, 2, 3, 4, 5, 6;
+
+  SELECT count(*) INTO v_drift
+  FROM _pendaftar_counters_actual a
+  FULL JOIN public.pendaftar_counters c
+    USING (gelombang, statusberkas, jeniskelamin, rencanatingkat, rencanaprogram, provinsi)
+  WHERE coalesce(a.n, 0) <> coalesce(c.n, 0);
+
+  IF NOT p_dry_run THEN
+    DELETE FROM public.pendaftar_counters;
+    INSERT INTO public.pendaftar_counters (
+      gelombang, statusberkas, jeniskelamin, rencanatingkat, rencanaprogram, provinsi, n
+    )
+    SELECT gelombang, statusberkas, jeniskelamin, rencanatingkat, rencanaprogram, provinsi, n
+    FROM _pendaftar_counters_actual;
+  END IF;
+
+  SELECT count(*), coalesce(sum(n), 0) INTO v_groups, v_total FROM _pendaftar_counters_actual;
+
+  RETURN jsonb_build_object(
+    'ok', true,
+    'dry_run', p_dry_run,
+    'drift_groups', v_drift,
+    'groups', v_groups,
+    'total', v_total
+  );
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.pendaftar_counters_rebuild(boolean) TO service_role;
+
+-- 5. Initial fill
+SELECT public.pendaftar_counters_rebuild();
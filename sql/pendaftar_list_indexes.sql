@@ -0,0 +1,20 @@
+-- =====================================================
+-- INDEXES FOR /api/pendaftar_list
+-- Run this SQL in Supabase SQL Editor
+-- =====================================================
+
+-- 1. Keyset pagination: ORDER BY createdat DESC, id DESC with
+--    (createdat, id) < (cursor) reads straight off this index
+CREATE INDEX IF NOT EXISTS idx_pendaftar_createdat_id
+  ON public.pendaftar (createdat DESC, id DESC);
+
+-- 2. Same ordering within one status (status filter + paging + count)
+CREATE INDEX IF NOT EXISTS idx_pendaftar_status_createdat_id
+  ON public.pendaftar (statusberkas, createdat DESC, id DESC);
+
+-- 3. Exports (lib/handlers/_export_helpers.py): ORDER BY rencanaprogram,
+--    namalengkap, id, usually filtered to one gelombang
+CREATE INDEX IF NOT EXISTS idx_pendaftar_export_order
+  ON public.pendaftar (rencanaprogram, namalengkap, id);
+CREATE INDEX IF NOT EXISTS idx_pendaftar_gelombang_export_order
+  ON public.pendaftar (gelombang, rencanaprogram, namalengkap, id);
@@ -0,0 +1,133 @@
+-- =====================================================
+-- DASHBOARD AGGREGATES FOR /api/pendaftar_stats
+-- Run this SQL in Supabase SQL Editor (after sql/pendaftar_counters.sql)
+-- =====================================================
+--
+-- One round trip, exact at any table size: reads the trigger-maintained
+-- pendaftar_counters groups (weighted by n), not the applicants. Mirrors
+-- the classification in lib/handlers/pendaftar_stats.py (aggregate_rows),
+-- which stays as the fallback while this function is not installed:
+--   status   : lower(statusberkas), unknown/NULL counted as pending
+--   gender   : 'L' / 'P' contained in upper(trim(jeniskelamin))
+--   program  : "<rencanatingkat> - <rencanaprogram>"
+--   asrama   : rencanaprogram contains 'Asrama' (case-sensitive)
+--   province : trimmed provinsi, empty/NULL as 'Belum Diisi', top 10
+--   breakdown: PUTRA INDUK > TAHFIDZ > PUTRI > SEKOLAH/NON, per jenjang
+-- p_gelombang limits everything to one gelombang (NULL = all).
+
+DROP FUNCTION IF EXISTS public.pendaftar_stats();
+
+CREATE OR REPLACE FUNCTION public.pendaftar_stats(p_gelombang text DEFAULT NULL)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  WITH base AS (
+    SELECT
+      n,
+      coalesce(nullif(lower(statusberkas), ''), 'pending') AS status,
+      btrim(coalesce(rencanaprogram, ''), E' \t\r\n') AS prog,
+      upper(btrim(coalesce(rencanaprogram, ''), E' \t\r\n')) AS prog_upper,
+      btrim(coalesce(rencanatingkat, ''), E' \t\r\n') AS jenjang,
+      upper(btrim(coalesce(jeniskelamin, ''), E' \t\r\n')) AS jk,
+      coalesce(nullif(btrim(coalesce(provinsi, ''), E' \t\r\n'), ''), 'Belum Diisi') AS prov,
+      nullif(rencanaprogram, '') AS rencanaprogram,
+      nullif(rencanatingkat, '') AS rencanatingkat,
+      nullif(jeniskelamin, '') AS jeniskelamin
+    FROM public.pendaftar_counters
+    WHERE n > 0
+      AND (p_gelombang IS NULL OR gelombang = p_gelombang)
+  ),
+  classified AS (
+    SELECT
+      *,
+      jenjang IN ('MTs', 'MTS') AS is_mts,
+      jenjang = 'MA' AS is_ma,
+      jenjang IN ('Kuliah', 'KULIAH') AS is_kuliah,
+      position('L' IN jk) > 0 AS is_l,
+      position('P' IN jk) > 0 AS is_p,
+      CASE
+        WHEN position('PUTRA INDUK' IN prog_upper) > 0 THEN 'induk'
+        WHEN position('TAHFIDZ' IN prog_upper) > 0 THEN 'tahfidz'
+        WHEN position('PUTRI' IN prog_upper) > 0 THEN 'putri'
+        WHEN position('SEKOLAH' IN prog_upper) > 0 OR position('NON' IN prog_upper) > 0 THEN 'sekolah'
+      END AS kategori
+    FROM base
+  ),
+  totals AS (
+    SELECT
+      coalesce(sum(n), 0) AS total,
+      coalesce(sum(n) FILTER (WHERE status NOT IN ('diterima', 'ditolak', 'revisi')), 0) AS pending,
+      coalesce(sum(n) FILTER (WHERE status = 'diterima'), 0) AS diterima,
+      coalesce(sum(n) FILTER (WHERE status = 'ditolak'), 0) AS ditolak,
+      coalesce(sum(n) FILTER (WHERE status = 'revisi'), 0) AS revisi,
+      coalesce(sum(n) FILTER (WHERE is_l), 0) AS gender_l,
+      coalesce(sum(n) FILTER (WHERE NOT is_l AND is_p), 0) AS gender_p,
+      coalesce(sum(n) FILTER (WHERE position('Asrama' IN prog) > 0), 0) AS asrama,
+      coalesce(sum(n) FILTER (WHERE position('Asrama' IN prog) = 0), 0) AS non_asrama,
+      coalesce(sum(n) FILTER (WHERE kategori = 'induk' AND is_mts), 0) AS putra_induk_mts,
+      coalesce(sum(n) FILTER (WHERE kategori = 'induk' AND is_ma), 0) AS putra_induk_ma,
+      coalesce(sum(n) FILTER (WHERE kategori = 'induk' AND is_kuliah), 0) AS putra_induk_kuliah,
+      coalesce(sum(n) FILTER (WHERE kategori = 'induk'), 0) AS putra_induk_total,
+      coalesce(sum(n) FILTER (WHERE kategori = 'tahfidz' AND is_mts), 0) AS putra_tahfidz_mts,
+      coalesce(sum(n) FILTER (WHERE kategori = 'tahfidz' AND is_ma), 0) AS putra_tahfidz_ma,
+      coalesce(sum(n) FILTER (WHERE kategori = 'tahfidz' AND is_kuliah), 0) AS putra_tahfidz_kuliah,
+      coalesce(sum(n) FILTER (WHERE kategori = 'tahfidz'), 0) AS putra_tahfidz_total,
+      coalesce(sum(n) FILTER (WHERE kategori = 'putri' AND is_mts), 0) AS putri_mts,
+      coalesce(sum(n) FILTER (WHERE kategori = 'putri' AND is_ma), 0) AS putri_ma,
+      coalesce(sum(n) FILTER (WHERE kategori = 'putri' AND is_kuliah), 0) AS putri_kuliah,
+      coalesce(sum(n) FILTER (WHERE kategori = 'putri'), 0) AS putri_total,
+      coalesce(sum(n) FILTER (WHERE kategori = 'sekolah' AND is_mts AND is_l), 0) AS sekolah_mts_l,
+      coalesce(sum(n) FILTER (WHERE kategori = 'sekolah' AND is_mts AND is_p), 0) AS sekolah_mts_p,
+      coalesce(sum(n) FILTER (WHERE kategori = 'sekolah' AND is_mts), 0) AS sekolah_mts_total,
+      coalesce(sum(n) FILTER (WHERE kategori = 'sekolah' AND is_ma AND is_l), 0) AS sekolah_ma_l,
+      coalesce(sum(n) FILTER (WHERE kategori = 'sekolah' AND is_ma AND is_p), 0) AS sekolah_ma_p,
+      coalesce(sum(n) FILTER (WHERE kategori = 'sekolah' AND is_ma), 0) AS sekolah_ma_total
+    FROM classified
+  ),
+  programs AS (
+    SELECT jenjang || ' - ' || prog AS label, sum(n) AS n
+    FROM classified
+    GROUP BY 1
+  ),
+  provinces AS (
+    SELECT prov AS label, sum(n) AS n
+    FROM classified
+    GROUP BY 1
+    ORDER BY n DESC, label
+    LIMIT 10
+  )
+  SELECT jsonb_build_object(
+    'kpi', jsonb_build_object(
+      'total', t.total, 'pending', t.pending, 'diterima', t.diterima,
+      'ditolak', t.ditolak, 'revisi', t.revisi
+    ),
+    'gender', jsonb_build_object('L', t.gender_l, 'P', t.gender_p),
+    'asrama', jsonb_build_object('Asrama', t.asrama, 'Non-Asrama', t.non_asrama),
+    'program', coalesce((SELECT jsonb_object_agg(label, n) FROM programs), '{}'::jsonb),
+    'province', coalesce(
+      (SELECT jsonb_agg(jsonb_build_array(label, n) ORDER BY n DESC, label) FROM provinces),
+      '[]'::jsonb
+    ),
+    'breakdown', jsonb_build_object(
+      'putraIndukMts', t.putra_induk_mts, 'putraIndukMa', t.putra_induk_ma,
+      'putraIndukKuliah', t.putra_induk_kuliah, 'putraIndukTotal', t.putra_induk_total,
+      'putraTahfidzMts', t.putra_tahfidz_mts, 'putraTahfidzMa', t.putra_tahfidz_ma,
+      'putraTahfidzKuliah', t.putra_tahfidz_kuliah, 'putraTahfidzTotal', t.putra_tahfidz_total,
+      'putriMts', t.putri_mts, 'putriMa', t.putri_ma,
+      'putriKuliah', t.putri_kuliah, 'putriTotal', t.putri_total,
+      'hanyaSekolahMtsL', t.sekolah_mts_l, 'hanyaSekolahMtsP', t.sekolah_mts_p,
+      'hanyaSekolahMtsTotal', t.sekolah_mts_total,
+      'hanyaSekolahMaL', t.sekolah_ma_l, 'hanyaSekolahMaP', t.sekolah_ma_p,
+      'hanyaSekolahMaTotal', t.sekolah_ma_total
+    ),
+    'distinct', jsonb_build_object(
+      'programs', (SELECT coalesce(jsonb_agg(DISTINCT rencanaprogram), '[]'::jsonb) FROM base),
+      'jenjang', (SELECT coalesce(jsonb_agg(DISTINCT rencanatingkat), '[]'::jsonb) FROM base),
+      'gender', (SELECT coalesce(jsonb_agg(DISTINCT jeniskelamin), '[]'::jsonb) FROM base)
+    )
+  )
+  FROM totals t;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.pendaftar_stats(text) TO service_role;
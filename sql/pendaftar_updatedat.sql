@@ -0,0 +1,30 @@
+-- =====================================================
+-- KEEP pendaftar.updatedat CURRENT ON EVERY WRITE
+-- Run this SQL in Supabase SQL Editor
+-- =====================================================
+--
+-- The export cache (lib/_export_cache.py) fingerprints a set of applicants
+-- by count(*) + max(updatedat), so every update has to move updatedat,
+-- including writers that do not set it themselves (status changes, edits
+-- in the Table Editor).
+
+-- 1. Trigger function
+CREATE OR REPLACE FUNCTION public.pendaftar_touch_updatedat()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.updatedat := now();
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS pendaftar_touch_updatedat ON public.pendaftar;
+CREATE TRIGGER pendaftar_touch_updatedat
+  BEFORE UPDATE ON public.pendaftar
+  FOR EACH ROW EXECUTE FUNCTION public.pendaftar_touch_updatedat();
+
+-- 2. Backfill rows that never got a value
+UPDATE public.pendaftar
+SET updatedat = coalesce(createdat, now())
+WHERE updatedat IS NULL;
@@ -0,0 +1,112 @@
+-- =====================================================
+-- INDEXED APPLICANT SEARCH (pendaftar_list / pembayaran_list)
+-- Run this SQL in Supabase SQL Editor
+-- =====================================================
+--
+-- Trigram GIN indexes serve the ILIKE '%q%' filters the list endpoints
+-- send (no more sequential scan per keystroke), and the search_* functions
+-- return similarity-ranked matches with a limit for ?mode=search.
+-- 10/16-digit queries are routed to the NISN / NIK equality lookups by the
+-- API (lib/handlers/_search_helpers.py), so they use the btree indexes.
+
+-- 1. Extension
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 2. pendaftar: name, school, identifiers
+CREATE INDEX IF NOT EXISTS idx_pendaftar_namalengkap_trgm
+  ON public.pendaftar USING gin (namalengkap gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_pendaftar_sekolahdomisili_trgm
+  ON public.pendaftar USING gin (sekolahdomisili gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_pendaftar_nisn_trgm
+  ON public.pendaftar USING gin (nisn gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_pendaftar_nikcalon_trgm
+  ON public.pendaftar USING gin (nikcalon gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_pendaftar_nikcalon
+  ON public.pendaftar (nikcalon);
+
+-- 3. pembayaran: name, identifiers
+CREATE INDEX IF NOT EXISTS idx_pembayaran_nama_lengkap_trgm
+  ON public.pembayaran USING gin (nama_lengkap gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_pembayaran_nisn
+  ON public.pembayaran (nisn);
+CREATE INDEX IF NOT EXISTS idx_pembayaran_nik
+  ON public.pembayaran (nik);
+
+-- 4. Escape LIKE wildcards in user input
+CREATE OR REPLACE FUNCTION public.search_like_escape(p_text text)
+RETURNS text
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT replace(replace(replace(p_text, '\', '\\'), '%', '\%'), '_', '\_');
+$$;
+
+-- 5. Ranked applicant search: each row is the pendaftar record plus
+--    search_rank (1.0 for an identifier prefix, else trigram similarity)
+CREATE OR REPLACE FUNCTION public.search_pendaftar(
+  p_query text,
+  p_limit integer DEFAULT 20,
+  p_status text DEFAULT NULL
+)
+RETURNS SETOF jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  WITH term AS (
+    SELECT btrim(p_query) AS q, public.search_like_escape(btrim(p_query)) AS esc
+  )
+  SELECT to_jsonb(p) || jsonb_build_object('search_rank', round(r.rank::numeric, 4))
+  FROM public.pendaftar p
+  CROSS JOIN term t
+  CROSS JOIN LATERAL (
+    SELECT greatest(
+      CASE WHEN p.nisn LIKE t.esc || '%' OR p.nikcalon LIKE t.esc || '%' THEN 1.0 ELSE 0.0 END,
+      word_similarity(t.q, p.namalengkap),
+      similarity(t.q, p.namalengkap),
+      0.8 * word_similarity(t.q, coalesce(p.sekolahdomisili, ''))
+    ) AS rank
+  ) r
+  WHERE (p_status IS NULL OR p.statusberkas = p_status)
+    AND (
+      p.namalengkap ILIKE '%' || t.esc || '%'
+      OR t.q <% p.namalengkap
+      OR p.sekolahdomisili ILIKE '%' || t.esc || '%'
+      OR p.nisn LIKE t.esc || '%'
+      OR p.nikcalon LIKE t.esc || '%'
+    )
+  ORDER BY r.rank DESC, p.id DESC
+  LIMIT least(greatest(coalesce(p_limit, 20), 1), 100);
+$$;
+
+-- 6. Ranked payment search (name, NISN, NIK)
+CREATE OR REPLACE FUNCTION public.search_pembayaran(
+  p_query text,
+  p_limit integer DEFAULT 20
+)
+RETURNS SETOF jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  WITH term AS (
+    SELECT btrim(p_query) AS q, public.search_like_escape(btrim(p_query)) AS esc
+  )
+  SELECT to_jsonb(b) || jsonb_build_object('search_rank', round(r.rank::numeric, 4))
+  FROM public.pembayaran b
+  CROSS JOIN term t
+  CROSS JOIN LATERAL (
+    SELECT greatest(
+      CASE WHEN b.nisn LIKE t.esc || '%' OR coalesce(b.nik, '') LIKE t.esc || '%' THEN 1.0 ELSE 0.0 END,
+      word_similarity(t.q, b.nama_lengkap),
+      similarity(t.q, b.nama_lengkap)
+    ) AS rank
+  ) r
+  WHERE b.nama_lengkap ILIKE '%' || t.esc || '%'
+     OR t.q <% b.nama_lengkap
+     OR b.nisn LIKE t.esc || '%'
+     OR b.nik LIKE t.esc || '%'
+  ORDER BY r.rank DESC, b.id DESC
+  LIMIT least(greatest(coalesce(p_limit, 20), 1), 100);
+$$;
+
+GRANT EXECUTE ON FUNCTION public.search_pendaftar(text, integer, text) TO service_role;
+GRANT EXECUTE ON FUNCTION public.search_pembayaran(text, integer) TO service_role;